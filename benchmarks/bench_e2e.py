@@ -0,0 +1,311 @@
+"""
+End-to-end benchmark for the FastAPI app against a fake Anthropic API.
+
+Boots ``main:app`` under uvicorn in a scratch directory, pointed at a
+local ``FakeAnthropicServer``, then drives each scenario at increasing
+concurrency:
+
+    message        POST /api/v1/claude/message  (classify + strategy generation)
+    metrics        GET  /api/metrics
+    config_update  POST /api/v1/claude/message  (classify + JSON config rewrite)
+
+Every stage reports throughput and client-side latency percentiles plus,
+from the app itself, event-loop lag (``/api/latency``) and RSS growth of
+the server process. Save the JSON with ``--output`` and compare a later
+run against it with ``--baseline``.
+
+    python -m benchmarks.bench_e2e --levels 1,8,32 --requests 200 --output e2e-1.0.0.json
+    python -m benchmarks.bench_e2e --baseline e2e-1.0.0.json --latency-ms 300 --token-latency-ms 2
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+import aiohttp
+from .bench_startup import REPO_ROOT, _free_port
+from .fake_anthropic import FakeAnthropicConfig, FakeAnthropicServer
+from .load_freqtrade_client import run_load
+
+ADMIN_TOKEN = "benchmark-admin"
+
+# name -> (method, path, JSON body for the n-th request or None)
+SCENARIOS: Dict[str, Tuple[str, str, Optional[Callable[[int], Dict[str, Any]]]]] = {
+    "message": ("POST", "/api/v1/claude/message",
+                lambda n: {"content": f"Create an RSI strategy with a {10 + n % 40} candle trend filter"}),
+    "metrics": ("GET", "/api/metrics", None),
+    "config_update": ("POST", "/api/v1/claude/message",
+                      lambda n: {"content": f"Update the config stake amount to {10 + n % 90}"}),
+}
+
+FREQTRADE_CONFIG = {
+    "stake_currency": "USDT", "stake_amount": 10, "max_open_trades": 3, "dry_run": True,
+    "timeframe": "5m", "exchange": {"name": "binance", "pair_whitelist": ["BTC/USDT", "ETH/USDT"]},
+}
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of ``pid`` from /proc (Linux only)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def write_app_files(workdir: str, anthropic_url: str, max_tokens: int) -> None:
+    """Configs the app reads from its working directory; nothing in the repo is touched"""
+    shutil.copy(os.path.join(REPO_ROOT, "logging.conf"), workdir)
+    freqtrade_path = os.path.join(workdir, "freqtrade_config.json")
+    claude_config = {
+        "anthropic": {"api_key": "benchmark", "base_url": anthropic_url},
+        "freqtrade": {"config_path": freqtrade_path},
+        # Caches off and temperature 1 so every request reaches the (fake) model
+        "claude_integration": {"model_version": "claude-benchmark", "max_tokens": max_tokens,
+                               "temperature": 1, "semantic_cache": {"enabled": False}},
+        "server": {"workers": 1},
+        "market_screener": {"enabled": False},
+        "telegram": {"enabled": False},
+    }
+    for path, content in ((os.path.join(workdir, "claude_config.json"), claude_config),
+                          (freqtrade_path, FREQTRADE_CONFIG),
+                          (os.path.join(workdir, "config.json"), FREQTRADE_CONFIG)):
+        with open(path, "w") as f:
+            json.dump(content, f, indent=2)
+
+
+class AppProcess:
+    """``uvicorn main:app`` in a scratch directory, ready once /health reports the bot running"""
+
+    def __init__(self, anthropic_url: str, max_tokens: int = 1024, python: str = sys.executable):
+        self.anthropic_url = anthropic_url
+        self.max_tokens = max_tokens
+        self.python = python
+        self.port = _free_port()
+        self.workdir: Optional[str] = None
+        self.process: Optional[subprocess.Popen] = None
+        self._log = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def rss_mb(self) -> Optional[float]:
+        return read_rss_mb(self.process.pid) if self.process is not None else None
+
+    async def start(self, session: aiohttp.ClientSession, deadline: float = 60.0) -> float:
+        """Launch and wait until ready; returns the seconds it took"""
+        self.workdir = tempfile.mkdtemp(prefix="freqassistant-bench-")
+        write_app_files(self.workdir, self.anthropic_url, self.max_tokens)
+        env = dict(os.environ, ANTHROPIC_API_KEY="benchmark", ANTHROPIC_BASE_URL=self.anthropic_url,
+                   ADMIN_TOKEN=ADMIN_TOKEN, WEB_CONCURRENCY="1")
+        env.pop("TELEGRAM_BOT_TOKEN", None)
+        self._log = open(os.path.join(self.workdir, "server.log"), "wb")
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [self.python, "-m", "uvicorn", "main:app", "--app-dir", REPO_ROOT, "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=self.workdir, env=env, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        while time.perf_counter() - started < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {self.process.returncode}:\n{self.log_tail()}")
+            try:
+                async with session.get(f"{self.base_url}/health") as response:
+                    if response.status == 200 and (await response.json()).get("ready"):
+                        return time.perf_counter() - started
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+        raise TimeoutError(f"App was not ready within {deadline}s:\n{self.log_tail()}")
+
+    def log_tail(self, lines: int = 20) -> str:
+        try:
+            with open(os.path.join(self.workdir, "server.log"), errors="replace") as f:
+                return "".join(f.readlines()[-lines:])
+        except OSError:
+            return ""
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self.workdir is not None:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+
+def make_call(base_url: str, scenario: str) -> Callable[[aiohttp.ClientSession], Awaitable[None]]:
+    """One scenario request; HTTP errors and error replies from the controller both count as failures"""
+    method, path, body = SCENARIOS[scenario]
+    counter = itertools.count()
+    url = base_url + path
+
+    async def call(session: aiohttp.ClientSession) -> None:
+        payload = body(next(counter)) if body is not None else None
+        async with session.request(method, url, json=payload) as response:
+            result = await response.json()
+            if response.status != 200:
+                raise RuntimeError(f"{path} returned {response.status}")
+        reply = result.get("response", "") if isinstance(result, dict) else ""
+        if reply.startswith(("Error", "Unsupported")):
+            raise RuntimeError(reply)
+
+    return call
+
+
+async def _app_json(session: aiohttp.ClientSession, app: AppProcess, method: str, path: str) -> Dict[str, Any]:
+    async with session.request(method, app.base_url + path, headers={"X-Admin-Token": ADMIN_TOKEN}) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+async def run_stage(session: aiohttp.ClientSession, app: AppProcess, fake: Any, scenario: str,
+                    concurrency: int, requests: int) -> Dict[str, Any]:
+    await _app_json(session, app, "POST", "/api/latency/reset")
+    upstream_before = dict(fake.stats) if fake is not None else None
+    rss_before = app.rss_mb()
+    result = await run_load(session, make_call(app.base_url, scenario), concurrency, requests)
+    rss_after = app.rss_mb()
+    report = await _app_json(session, app, "GET", "/api/latency")
+    result = {"scenario": scenario, "concurrency": concurrency, **result,
+              "event_loop_lag_ms": {key: report["event_loop_lag"][key] for key in ("p50_ms", "p99_ms", "max_ms")},
+              "rss_mb": {"before": rss_before, "after": rss_after,
+                         "growth": round(rss_after - rss_before, 1) if rss_before and rss_after else None}}
+    if upstream_before is not None:
+        result["upstream"] = {key: fake.stats[key] - upstream_before[key]
+                              for key in ("requests", "errors", "cancelled", "output_tokens")}
+    return result
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """Stages whose throughput fell or whose p99 latency rose by more than ``tolerance``"""
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for stage in current["results"]:
+        before = previous.get((stage["scenario"], stage["concurrency"]))
+        if before is None:
+            continue
+        checks = (("throughput_rps", before["throughput_rps"], stage["throughput_rps"], -1),
+                  ("p99_ms", before["latency_ms"]["p99"], stage["latency_ms"]["p99"], 1))
+        for metric, old, new, direction in checks:
+            if old and direction * (new - old) / old > tolerance:
+                regressions.append({"scenario": stage["scenario"], "concurrency": stage["concurrency"],
+                                    "metric": metric, "baseline": old, "current": new})
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    fake_config = FakeAnthropicConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        token_latency_ms=args.token_latency_ms, output_tokens=args.output_tokens, error_rate=args.error_rate,
+    )
+    levels = [int(level) for level in args.levels.split(",")]
+    fake_server = None if args.anthropic_url else FakeAnthropicServer(fake_config)
+    if fake_server is not None:
+        await fake_server.start()
+    app = AppProcess(args.anthropic_url or fake_server.base_url, max_tokens=args.max_tokens)
+    connector = aiohttp.TCPConnector(limit=max(levels) + 4)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    results = []
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            ready_s = await app.start(session, deadline=args.deadline)
+            fake = fake_server.fake if fake_server is not None else None
+            for scenario in args.scenarios.split(","):
+                if args.warmup:
+                    await run_load(session, make_call(app.base_url, scenario), 1, args.warmup)
+                rss_start = app.rss_mb()
+                for concurrency in levels:
+                    results.append(await run_stage(session, app, fake, scenario, concurrency, args.requests))
+                    sys.stderr.write(f"{scenario} x{concurrency}: {results[-1]['throughput_rps']} req/s, "
+                                     f"p99 {results[-1]['latency_ms']['p99']} ms\n")
+                rss_end = app.rss_mb()
+                if rss_start and rss_end:
+                    results[-1]["rss_mb"]["scenario_growth"] = round(rss_end - rss_start, 1)
+    finally:
+        app.stop()
+        if fake_server is not None:
+            await fake_server.close()
+
+    return {
+        "meta": {
+            "commit": _git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "time_to_ready_s": round(ready_s, 3),
+            "levels": levels, "requests_per_stage": args.requests, "max_tokens": args.max_tokens,
+            "fake_anthropic": None if args.anthropic_url else asdict(fake_config),
+        },
+        "results": results,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-end FreqAssistant benchmark with a fake Anthropic API")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated, from: "
+                        + ", ".join(SCENARIOS))
+    parser.add_argument("--levels", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and level")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake time to first token")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--token-latency-ms", type=float, default=0.1, help="Fake generation time per token")
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--max-tokens", type=int, default=1024)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--anthropic-url", help="Use an already running fake instead of starting one")
+    parser.add_argument("--deadline", type=float, default=60.0, help="Seconds to wait for the app")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    result = asyncio.run(benchmark(args))
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["regressions"] = compare(json.load(f), result, args.tolerance)
+    report = json.dumps(result, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            f.write(report)
+    sys.stdout.write(report + "\n")
+    if result.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
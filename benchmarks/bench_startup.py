@@ -0,0 +1,120 @@
+"""
+Cold-start benchmark for the FastAPI app.
+
+Measures, in fresh interpreters, how long ``import main`` takes and how
+long it takes from launching uvicorn until ``/health`` first answers 200.
+The app's own startup report (``/api/startup``) from the last run is
+included so regressions can be traced to a specific import or init step.
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, Any, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = (
+    "import time, sys; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started); "
+    "print(','.join(m for m in ('anthropic', 'pandas', 'aiohttp', 'jinja2', 'numpy') if m in sys.modules))"
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(python: str = sys.executable) -> Dict[str, Any]:
+    """Seconds to ``import main`` in a fresh interpreter, and which heavy modules it pulled in"""
+    output = subprocess.run([python, "-c", IMPORT_PROBE], cwd=REPO_ROOT, capture_output=True,
+                            text=True, check=True).stdout.splitlines()
+    return {"seconds": float(output[0]), "heavy_modules": [m for m in output[1].split(",") if m]}
+
+
+def _get(url: str, timeout: float = 1.0) -> Optional[bytes]:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.read() if response.status == 200 else None
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+
+
+def measure_time_to_healthy(python: str = sys.executable, deadline: float = 30.0) -> Dict[str, Any]:
+    """Seconds from spawning uvicorn until /health returns 200"""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [python, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < deadline:
+            if _get(f"http://127.0.0.1:{port}/health", timeout=0.5) is not None:
+                elapsed = time.perf_counter() - started
+                report = _get(f"http://127.0.0.1:{port}/api/startup")
+                return {"seconds": elapsed, "startup_report": json.loads(report) if report else None}
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            time.sleep(0.01)
+        raise TimeoutError(f"/health did not answer within {deadline}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 1),
+        "min_ms": round(min(values) * 1000, 1),
+        "max_ms": round(max(values) * 1000, 1),
+    }
+
+
+def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    imports = [measure_import() for _ in range(args.runs)]
+    report: Dict[str, Any] = {
+        "runs": args.runs,
+        "import_main": _summary([run["seconds"] for run in imports]),
+        "heavy_modules_at_import": imports[-1]["heavy_modules"],
+    }
+    if not args.skip_server:
+        healthy = [measure_time_to_healthy(deadline=args.deadline) for _ in range(args.runs)]
+        report["time_to_healthy"] = _summary([run["seconds"] for run in healthy])
+        report["startup_report"] = healthy[-1]["startup_report"]
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark FreqAssistant cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--deadline", type=float, default=30.0, help="Seconds to wait for /health")
+    parser.add_argument("--skip-server", action="store_true", help="Only measure import time")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = json.dumps(benchmark(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    sys.stdout.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
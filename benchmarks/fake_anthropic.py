@@ -0,0 +1,270 @@
+"""
+Local stand-in for the Anthropic Messages API.
+
+Serves ``POST /v1/messages``, both plain and streamed (server-sent
+events), with configurable time to first token, per-token generation
+time, response size and error injection. Replies follow the prompts
+ClaudeFreqAIController sends: command classification, JSON config
+changes, and strategy code padded to ``output_tokens``. Point the SDK at
+it with ``base_url`` (or ``ANTHROPIC_BASE_URL``).
+
+    python -m benchmarks.fake_anthropic --port 8090 --latency-ms 300 --token-latency-ms 2
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple
+from aiohttp import web
+
+CHARS_PER_TOKEN = 4
+
+STRATEGY_CODE = '''```python
+from freqtrade.strategy import IStrategy
+import talib.abstract as ta
+
+
+class BenchmarkStrategy(IStrategy):
+    timeframe = "5m"
+    minimal_roi = {"0": 0.04, "30": 0.02, "60": 0}
+    stoploss = -0.08
+
+    def populate_indicators(self, dataframe, metadata):
+        dataframe["rsi"] = ta.RSI(dataframe, timeperiod=14)
+        return dataframe
+
+    def populate_entry_trend(self, dataframe, metadata):
+        dataframe.loc[dataframe["rsi"] < 30, "enter_long"] = 1
+        return dataframe
+
+    def populate_exit_trend(self, dataframe, metadata):
+        dataframe.loc[dataframe["rsi"] > 70, "exit_long"] = 1
+        return dataframe
+```
+'''
+
+FILLER = ("The strategy enters on oversold RSI and exits when momentum is exhausted; "
+          "tune the thresholds with hyperopt before trading it live. ")
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+@dataclass
+class FakeAnthropicConfig:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    token_latency_ms: float = 0.0
+    output_tokens: int = 200
+    chunk_tokens: int = 8
+    error_rate: float = 0.0
+    error_status: int = 529
+    seed: int = 42
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (about four characters per token, like English text)"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def classify(request: str) -> str:
+    """The action word ``_parse_command_type`` expects for a user request"""
+    lowered = request.lower()
+    if "config" in lowered or "stake" in lowered:
+        return "modify_config"
+    if "backtest" in lowered:
+        return "backtest"
+    if "market" in lowered:
+        return "market_analysis"
+    if any(word in lowered for word in ("start", "stop", "status")):
+        return "bot_control"
+    return "strategy"
+
+
+def reply_for(prompt: str, output_tokens: int) -> str:
+    """Canned answer shaped like what the controller expects for ``prompt``"""
+    if prompt.startswith("Convert this FreqTrade command"):
+        return classify(prompt.partition(":")[2])
+    if prompt.startswith("Convert this config modification request"):
+        numbers = _NUMBER.findall(prompt.partition(":")[2])
+        return json.dumps({"stake_amount": float(numbers[0]) if numbers else 10.0})
+    text = STRATEGY_CODE if "strategy" in prompt.lower() else ""
+    missing = output_tokens * CHARS_PER_TOKEN - len(text)
+    if missing > 0:
+        text += (FILLER * (missing // len(FILLER) + 1))[:missing]
+    return text
+
+
+def _prompt_text(body: Dict[str, Any]) -> Tuple[str, str]:
+    """(last user message, every prompt string) from a Messages API request body"""
+    parts: List[str] = []
+    system = body.get("system") or ""
+    parts.extend([system] if isinstance(system, str) else [b.get("text", "") for b in system])
+    last = ""
+    for message in body["messages"]:
+        content = message["content"]
+        if not isinstance(content, str):
+            content = "".join(block.get("text", "") for block in content)
+        parts.append(content)
+        if message["role"] == "user":
+            last = content
+    return last, "\n".join(parts)
+
+
+def _error(status: int, kind: str, message: str) -> web.Response:
+    return web.json_response({"type": "error", "error": {"type": kind, "message": message}}, status=status)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class FakeAnthropic:
+    """Request handler plus counters for what it served"""
+
+    def __init__(self, config: FakeAnthropicConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.stats = {"requests": 0, "streamed": 0, "errors": 0, "cancelled": 0,
+                      "input_tokens": 0, "output_tokens": 0}
+        self.prompts: List[str] = []
+
+    async def _first_token_delay(self) -> None:
+        config = self.config
+        if config.latency_ms or config.latency_jitter_ms:
+            delay = config.latency_ms + self.rng.uniform(0, config.latency_jitter_ms)
+            await asyncio.sleep(delay / 1000)
+
+    async def messages(self, request: web.Request) -> web.StreamResponse:
+        self.stats["requests"] += 1
+        if not request.headers.get("x-api-key") and not request.headers.get("Authorization"):
+            return _error(401, "authentication_error", "x-api-key header is required")
+        try:
+            body = await request.json()
+        except ConnectionResetError:
+            # Caller gave up (hedged or timed-out request) before sending the body
+            self.stats["cancelled"] += 1
+            return web.Response(status=499)
+        try:
+            model, max_tokens = body["model"], int(body["max_tokens"])
+            prompt, everything = _prompt_text(body)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            return _error(400, "invalid_request_error", f"Malformed request: {e}")
+        config = self.config
+        if config.error_rate and self.rng.random() < config.error_rate:
+            self.stats["errors"] += 1
+            return _error(config.error_status, "overloaded_error", "Overloaded")
+
+        self.prompts.append(prompt)
+        text = reply_for(prompt, config.output_tokens)
+        stop_reason = "end_turn"
+        if count_tokens(text) > max_tokens:
+            text, stop_reason = text[:max_tokens * CHARS_PER_TOKEN], "max_tokens"
+        usage = {"input_tokens": count_tokens(everything), "output_tokens": count_tokens(text)}
+        self.stats["input_tokens"] += usage["input_tokens"]
+        self.stats["output_tokens"] += usage["output_tokens"]
+        message = {
+            "id": f"msg_fake{self.stats['requests']:08d}", "type": "message", "role": "assistant",
+            "model": model, "content": [], "stop_reason": None, "stop_sequence": None,
+            "usage": {"input_tokens": usage["input_tokens"], "output_tokens": 1},
+        }
+        await self._first_token_delay()
+        if body.get("stream"):
+            self.stats["streamed"] += 1
+            return await self._stream(request, message, text, stop_reason, usage)
+        if config.token_latency_ms:
+            await asyncio.sleep(usage["output_tokens"] * config.token_latency_ms / 1000)
+        message.update(content=[{"type": "text", "text": text}], stop_reason=stop_reason, usage=usage)
+        return web.json_response(message)
+
+    async def _stream(self, request: web.Request, message: Dict[str, Any], text: str, stop_reason: str,
+                      usage: Dict[str, int]) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        await response.write(_sse("message_start", {"type": "message_start", "message": message}))
+        await response.write(_sse("content_block_start", {
+            "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}))
+        step = max(1, self.config.chunk_tokens) * CHARS_PER_TOKEN
+        for start in range(0, len(text), step):
+            chunk = text[start:start + step]
+            if self.config.token_latency_ms:
+                await asyncio.sleep(count_tokens(chunk) * self.config.token_latency_ms / 1000)
+            await response.write(_sse("content_block_delta", {
+                "type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": chunk}}))
+        await response.write(_sse("content_block_stop", {"type": "content_block_stop", "index": 0}))
+        await response.write(_sse("message_delta", {
+            "type": "message_delta", "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+            "usage": {"output_tokens": usage["output_tokens"]}}))
+        await response.write(_sse("message_stop", {"type": "message_stop"}))
+        await response.write_eof()
+        return response
+
+
+FAKE_KEY = web.AppKey("fake", FakeAnthropic)
+
+
+def create_app(config: Optional[FakeAnthropicConfig] = None) -> web.Application:
+    fake = FakeAnthropic(config or FakeAnthropicConfig())
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app[FAKE_KEY] = fake
+    app.add_routes([web.post("/v1/messages", fake.messages)])
+    return app
+
+
+class FakeAnthropicServer:
+    """Runs the fake API on a local port; ``base_url`` is ready for ``AsyncAnthropic(base_url=...)``"""
+
+    def __init__(self, config: Optional[FakeAnthropicConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.app = create_app(config)
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def fake(self) -> FakeAnthropic:
+        return self.app[FAKE_KEY]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeAnthropicServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Time to first token")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--token-latency-ms", type=float, default=0.0, help="Generation time per output token")
+    parser.add_argument("--output-tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    config = FakeAnthropicConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        token_latency_ms=args.token_latency_ms, output_tokens=args.output_tokens, error_rate=args.error_rate,
+    )
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Local stand-in for the freqtrade REST API.
+
+Serves the endpoints FreqtradeClient uses (token, status, start/stop,
+trades, trade, profit, balance, strategy deploy) with configurable latency,
+error injection and payload sizes, so the client layer can be exercised
+and benchmarked without a live bot.
+
+    python -m benchmarks.fake_freqtrade --port 8080 --latency-ms 5 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from aiohttp import web, BasicAuth
+
+PAIRS = ("BTC/USDT", "ETH/USDT", "SOL/USDT", "ADA/USDT", "XRP/USDT", "DOGE/USDT")
+
+
+@dataclass
+class FakeFreqtradeConfig:
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    open_trades: int = 3
+    closed_trades: int = 200
+    username: Optional[str] = None
+    password: Optional[str] = None
+    seed: int = 42
+
+
+def _make_trade(trade_id: int, is_open: bool, rng: random.Random) -> Dict[str, Any]:
+    open_ts = 1_700_000_000_000 + trade_id * 3_600_000
+    profit_ratio = round(rng.gauss(0.002, 0.02), 5)
+    open_rate = round(rng.uniform(0.5, 60_000), 4)
+    return {
+        "trade_id": trade_id,
+        "pair": PAIRS[trade_id % len(PAIRS)],
+        "is_open": is_open,
+        "open_timestamp": open_ts,
+        "close_timestamp": None if is_open else open_ts + rng.randint(60_000, 86_400_000),
+        "open_rate": open_rate,
+        "close_rate": None if is_open else round(open_rate * (1 + profit_ratio), 4),
+        "amount": round(rng.uniform(0.01, 10), 4),
+        "stake_amount": 100.0,
+        "profit_ratio": profit_ratio,
+        "profit_abs": round(profit_ratio * 100, 4),
+        "exit_reason": None if is_open else rng.choice(("roi", "stop_loss", "exit_signal")),
+        "strategy": "FakeStrategy",
+    }
+
+
+class FakeFreqtrade:
+    """Request handlers plus the in-memory bot state they serve"""
+
+    def __init__(self, config: FakeFreqtradeConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.running = True
+        self.request_count = 0
+        self.closed = [_make_trade(i, False, self.rng) for i in range(1, config.closed_trades + 1)]
+        first_open = config.closed_trades + 1
+        self.open = [_make_trade(i, True, self.rng)
+                     for i in range(first_open, first_open + config.open_trades)]
+        self.deployed: Dict[str, str] = {}
+        self._tokens = set()
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler):
+        self.request_count += 1
+        config = self.config
+        if config.latency_ms or config.latency_jitter_ms:
+            delay = config.latency_ms + self.rng.uniform(0, config.latency_jitter_ms)
+            await asyncio.sleep(delay / 1000)
+        if config.error_rate and self.rng.random() < config.error_rate:
+            return web.json_response({"detail": "injected error"}, status=config.error_status)
+        if config.username and not request.path.startswith("/api/v1/token"):
+            auth = request.headers.get("Authorization", "")
+            if auth.removeprefix("Bearer ") not in self._tokens:
+                return web.json_response({"detail": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    def _issue_token(self) -> str:
+        token = f"token-{len(self._tokens) + 1}-{time.monotonic_ns()}"
+        self._tokens.add(token)
+        return token
+
+    async def login(self, request: web.Request) -> web.Response:
+        auth = request.headers.get("Authorization", "")
+        expected = BasicAuth(self.config.username or "", self.config.password or "").encode()
+        if self.config.username and auth != expected:
+            return web.json_response({"detail": "Incorrect credentials"}, status=401)
+        return web.json_response({"access_token": self._issue_token(), "refresh_token": "refresh"})
+
+    async def refresh(self, request: web.Request) -> web.Response:
+        return web.json_response({"access_token": self._issue_token()})
+
+    async def ping(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "pong"})
+
+    async def status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.open)
+
+    async def start(self, request: web.Request) -> web.Response:
+        self.running = True
+        return web.json_response({"status": "starting trader ..."})
+
+    async def stop(self, request: web.Request) -> web.Response:
+        self.running = False
+        return web.json_response({"status": "stopping trader ..."})
+
+    async def trades(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 500))
+        offset = int(request.query.get("offset", 0))
+        page = self.closed[offset:offset + limit]
+        return web.json_response({
+            "trades": page, "trades_count": len(page),
+            "offset": offset, "total_trades": len(self.closed),
+        })
+
+    async def trade(self, request: web.Request) -> web.Response:
+        trade_id = int(request.match_info["trade_id"])
+        for trade in self.open + self.closed:
+            if trade["trade_id"] == trade_id:
+                return web.json_response(trade)
+        return web.json_response({"detail": "Trade not found"}, status=404)
+
+    async def profit(self, request: web.Request) -> web.Response:
+        profits: List[float] = [t["profit_abs"] for t in self.closed]
+        return web.json_response({
+            "profit_closed_coin": round(sum(profits), 4),
+            "profit_all_coin": round(sum(profits), 4),
+            "trade_count": len(self.closed) + len(self.open),
+            "closed_trade_count": len(self.closed),
+            "winning_trades": sum(1 for p in profits if p > 0),
+            "losing_trades": sum(1 for p in profits if p < 0),
+        })
+
+    async def balance(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "currencies": [{"currency": "USDT", "free": 900.0, "balance": 1000.0, "used": 100.0}],
+            "total": 1000.0, "stake": "USDT", "symbol": "USD", "value": 1000.0,
+        })
+
+    async def deploy_strategy(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        self.deployed[body["strategy_name"]] = body["strategy_code"]
+        return web.json_response({"status": "deployed", "strategy": body["strategy_name"]})
+
+
+FAKE_KEY = web.AppKey("fake", FakeFreqtrade)
+
+
+def create_app(config: Optional[FakeFreqtradeConfig] = None) -> web.Application:
+    fake = FakeFreqtrade(config or FakeFreqtradeConfig())
+    app = web.Application(middlewares=[fake.middleware])
+    app[FAKE_KEY] = fake
+    routes = [
+        web.post("/api/v1/token/login", fake.login),
+        web.post("/api/v1/token/refresh", fake.refresh),
+        web.get("/api/v1/ping", fake.ping),
+        web.get("/api/v1/status", fake.status),
+        web.post("/api/v1/start", fake.start),
+        web.post("/api/v1/stop", fake.stop),
+        web.get("/api/v1/trades", fake.trades),
+        web.get("/api/v1/trade/{trade_id}", fake.trade),
+        web.get("/api/v1/profit", fake.profit),
+        web.get("/api/v1/balance", fake.balance),
+        web.post("/api/v1/strategy/deploy", fake.deploy_strategy),
+    ]
+    app.add_routes(routes)
+    return app
+
+
+class FakeFreqtradeServer:
+    """Runs the fake API on a local port; ``base_url`` is ready for FreqtradeClient"""
+
+    def __init__(self, config: Optional[FakeFreqtradeConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.app = create_app(config)
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def fake(self) -> FakeFreqtrade:
+        return self.app[FAKE_KEY]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v1"
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeFreqtradeServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake freqtrade REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--open-trades", type=int, default=3)
+    parser.add_argument("--closed-trades", type=int, default=200)
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    args = parser.parse_args()
+    config = FakeFreqtradeConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate, open_trades=args.open_trades,
+        closed_trades=args.closed_trades, username=args.username, password=args.password,
+    )
+    web.run_app(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
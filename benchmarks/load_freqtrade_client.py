@@ -0,0 +1,142 @@
+"""
+Load driver for FreqtradeClient / FreqtradeFleetClient.
+
+Boots one or more fake freqtrade servers (or targets --base-url), runs N
+concurrent callers against a client method for a fixed number of requests
+and reports throughput and latency percentiles as JSON.
+
+    python -m benchmarks.load_freqtrade_client --concurrency 50 --requests 5000
+    python -m benchmarks.load_freqtrade_client --fleet 12 --call fleet_status
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from contextlib import AsyncExitStack
+from typing import Dict, Any, List, Callable, Awaitable, Optional
+from src.freqtrade_client import FreqtradeClient
+from src.freqtrade_fleet import FreqtradeFleetClient
+from .fake_freqtrade import FakeFreqtradeConfig, FakeFreqtradeServer
+
+CLIENT_CALLS: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+    "status": lambda client: client.get_status(),
+    "trades": lambda client: client.get_trades(limit=500),
+    "profit": lambda client: client.get_profit(),
+    "balance": lambda client: client.get_balance(),
+    "fleet_status": lambda fleet: fleet.get_status(),
+    "fleet_profit": lambda fleet: fleet.get_profit(),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p90": round(percentile(ordered, 90) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round((ordered[-1] if ordered else 0.0) * 1000, 3),
+        },
+    }
+
+
+async def run_load(target: Any, call: Callable[[Any], Awaitable[Any]],
+                   concurrency: int, requests: int) -> Dict[str, Any]:
+    """Drive ``requests`` calls through ``concurrency`` workers"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await call(target)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    config = FakeFreqtradeConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate, closed_trades=args.closed_trades,
+    )
+    async with AsyncExitStack() as stack:
+        base_urls: List[str] = [args.base_url] if args.base_url else []
+        for _ in range(0 if args.base_url else max(1, args.fleet)):
+            server = await stack.enter_async_context(FakeFreqtradeServer(config))
+            base_urls.append(server.base_url)
+
+        target: Optional[Any]
+        if args.call.startswith("fleet_"):
+            target = FreqtradeFleetClient(
+                [{"name": f"bot{i}", "base_url": url, "api_token": args.token}
+                 for i, url in enumerate(base_urls)],
+                cache_ttl=args.cache_ttl,
+            )
+        else:
+            target = FreqtradeClient(base_urls[0], api_token=args.token)
+        try:
+            if args.warmup:
+                await run_load(target, CLIENT_CALLS[args.call], args.concurrency, args.warmup)
+            result = await run_load(target, CLIENT_CALLS[args.call], args.concurrency, args.requests)
+        finally:
+            await target.close()
+
+    result.update({
+        "call": args.call, "concurrency": args.concurrency, "bots": len(base_urls),
+        "server_latency_ms": args.latency_ms, "error_rate": args.error_rate,
+    })
+    return result
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the freqtrade client layer")
+    parser.add_argument("--call", choices=sorted(CLIENT_CALLS), default="status")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--fleet", type=int, default=1, help="Fake bots to start")
+    parser.add_argument("--base-url", help="Target an existing freqtrade instead of a fake")
+    parser.add_argument("--token", default="benchmark")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--closed-trades", type=int, default=200)
+    parser.add_argument("--cache-ttl", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    result = asyncio.run(benchmark(args))
+    report = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    sys.stdout.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
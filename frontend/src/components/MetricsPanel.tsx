@@ -6,6 +6,24 @@ interface MetricsPanelProps {
     onError?: (error: string) => void;
 }
 
+const MAX_POINTS = 500;
+
+type MetricValues = Omit<Metrics, 'name'>;
+
+const mergeDelta = (target: Record<string, any>, delta: Record<string, any>): Record<string, any> => {
+    const merged = { ...target };
+    Object.entries(delta).forEach(([key, value]) => {
+        if (value === null) {
+            delete merged[key];
+        } else if (typeof value === 'object' && !Array.isArray(value)) {
+            merged[key] = mergeDelta(merged[key] || {}, value);
+        } else {
+            merged[key] = value;
+        }
+    });
+    return merged;
+};
+
 const MetricsPanel: React.FC<MetricsPanelProps> = ({ onError }) => {
     const [metricsData, setMetricsData] = React.useState<Metrics[]>([]);
 
@@ -27,6 +45,28 @@ const MetricsPanel: React.FC<MetricsPanelProps> = ({ onError }) => {
         };
 
         fetchMetricsData();
+
+        // Live updates are pushed by the backend instead of polled
+        const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        const socket = new WebSocket(`${protocol}://${window.location.host}/ws/metrics`);
+        let state: Record<string, any> = {};
+
+        socket.onmessage = (event: MessageEvent) => {
+            const frame = JSON.parse(event.data);
+            state = frame.type === 'snapshot' ? frame.data : mergeDelta(state, frame.data);
+            if (!frame.data.metrics) {
+                return;
+            }
+            const current = state.metrics as MetricValues;
+            const now = new Date();
+            setMetricsData(previous => [
+                ...previous.slice(-(MAX_POINTS - 1)),
+                { ...current, name: now.toISOString().replace('T', ' ').slice(0, 19), timestamp: now.getTime() / 1000 }
+            ]);
+        };
+        socket.onerror = () => handleError('Metrics stream disconnected');
+
+        return () => socket.close();
     }, [onError]);
 
     return (
@@ -11,4 +11,7 @@ export interface Metrics {
     name: string;
     accuracy: number;
     loss: number;
+    timestamp?: number;
+    sharpe_ratio?: number;
+    profit_factor?: number;
 }
@@ -1,20 +1,38 @@
+from src.startup import profiler, lazy_import
 import asyncio
+import atexit
 import logging
-import logging.config
 import os
 import json
+import time
 from typing import Dict, Any, Optional
-import uvicorn
-import anthropic
-from fastapi import FastAPI, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from src.bot import FreqtradeAI
-from src.freqai_integration import FreqAIIntegration
-from src.controllers.claude_controller import ClaudeFreqAIController
+
+with profiler.phase("import fastapi", kind="import"):
+    import uvicorn
+    from fastapi import FastAPI, HTTPException
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, FileResponse
+with profiler.phase("import src", kind="import"):
+    from src.bot import FreqtradeAI
+    from src.freqai_integration import FreqAIIntegration
+    from src.controllers.claude_controller import ClaudeFreqAIController
+    from src.api_route import router as api_router
+    from src.broadcaster import MetricsBroadcaster
+    from src.freqtrade_fleet import FreqtradeFleetClient
+    from src.trade_sync import TradeSyncEngine
+    from src.strategy_generator import StrategyGenerator
+    from src.strategy_sandbox import StrategySandbox
+    from src.shared_state import SharedStore, SessionStore, LeaderElector
+    from src.profiling import RequestMetrics, LatencyMiddleware, EventLoopLagMonitor
+    from src.log_pipeline import setup_logging, RequestIdMiddleware
+    from src.market_screener import MarketScreener, resolve_datadir
+    from src.telegram_bot import TelegramFrontend
 from dotenv import load_dotenv
 
+# Heavy SDKs load on first use, after the server is already answering /health
+anthropic = lazy_import("anthropic")
+
 load_dotenv()  # Load environment variables from .env file
 
 # Global bot instance for proper shutdown management
@@ -26,7 +44,16 @@ app = FastAPI(
     version="1.0.0",
     description="FastAPI backend for FreqAssistant"
 )
-logging.config.fileConfig('logging.conf')
+os.makedirs('logs', exist_ok=True)
+# Handlers run on a listener thread; 1 in 100 INFO lines from polled routes is kept.
+# Workers started with WEB_CONCURRENCY > 1 write (and rotate) their own files.
+log_pipeline = setup_logging(
+    'logging.conf',
+    queue_size=int(os.getenv('LOG_QUEUE_SIZE', 10000)),
+    sample_every={"/": 100, "/health": 100},
+    per_process=int(os.getenv('WEB_CONCURRENCY') or 1) > 1
+)
+atexit.register(log_pipeline.stop)
 logger = logging.getLogger(__name__)
 
 # Get CORS origins from environment variable
@@ -41,6 +68,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms, exported on /metrics and /api/latency
+request_metrics = RequestMetrics()
+app.add_middleware(LatencyMiddleware, metrics=request_metrics)
+app.add_middleware(RequestIdMiddleware)
+api_router.request_metrics = request_metrics
+loop_lag = EventLoopLagMonitor()
+api_router.loop_lag = loop_lag
+
+app.include_router(api_router)
+
 # Update the static files mounting
 frontend_path = os.path.join(os.getcwd(), "frontend", "build")
 if os.path.exists(frontend_path):
@@ -50,7 +87,7 @@ if os.path.exists(frontend_path):
 @app.get("/")
 async def root():
     """Root endpoint"""
-    logger.info("Root endpoint called")
+    logger.info("Root endpoint called", extra={"route": "/"})
     return {
         "message": "Welcome to FreqAssistant API",
         "version": "1.0.0",
@@ -61,8 +98,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    logger.info("Health check endpoint called")
-    return {"status": "healthy"}
+    logger.info("Health check endpoint called", extra={"route": "/health"})
+    profiler.mark("first_health_response")
+    return {"status": "healthy", "ready": bot is not None and bot.state.is_running}
 
 def validate_config(config: Dict[str, Any]) -> None:
     """Validate required configuration values"""
@@ -109,20 +147,131 @@ def load_config(config_path: str = "claude_config.json") -> Dict[str, Any]:
         logger.error(f"Error loading config: {e}")
         raise
 
+def configured_workers(config: Optional[Dict[str, Any]] = None) -> int:
+    """Server worker count: $WEB_CONCURRENCY (also read by uvicorn), then server.workers"""
+    workers = os.getenv('WEB_CONCURRENCY') or (config or {}).get('server', {}).get('workers') or 1
+    return max(1, int(workers))
+
 async def initialize_bot(config: Dict[str, Any]) -> Optional[FreqtradeAI]:
     """Initialize bot with configuration"""
     global bot
     try:
-        client = anthropic.Anthropic(api_key=config['anthropic']['api_key'])
-        bot = FreqtradeAI(
-            config['anthropic']['api_key'],
-            config['freqtrade']['config_path']
-        )
+        server_config = config.get('server', {})
+        cache_config = dict(config.get('cache', {}))
+        if configured_workers(config) > 1:
+            # Persistent cache regions are the ones worth sharing between workers
+            cache_config.setdefault('disk_path', server_config.get('shared_cache_path', 'cache.db'))
+        with profiler.phase("init shared state"):
+            shared_store = SharedStore(server_config.get('shared_state_path', 'shared_state.db'))
+            leader = LeaderElector(shared_store, ttl=server_config.get('leader_ttl', 15.0))
+        api_router.shared_store = shared_store
+        api_router.leader = leader
+        with profiler.phase("init anthropic client"):
+            # The controllers await messages.create; base_url points at a proxy or the benchmark fake
+            client = anthropic.AsyncAnthropic(api_key=config['anthropic']['api_key'],
+                                              base_url=config['anthropic'].get('base_url'))
+        with profiler.phase("init FreqtradeAI"):
+            bot = FreqtradeAI(
+                config['anthropic']['api_key'],
+                config['freqtrade']['config_path'],
+                cache_config=cache_config,
+                backtest_results_path=config.get('backtests', {}).get('results_path', 'backtest_results'),
+                shared_store=shared_store
+            )
         
-        claude_controller = ClaudeFreqAIController(config, client)
-        freqai_integration = FreqAIIntegration(config, client)
+        screener_config = dict(config.get('market_screener', {}))
+        if screener_config.pop('enabled', True):
+            datadir = screener_config.pop('datadir', None) or resolve_datadir(
+                bot.config_manager.read_config() or {}, config['freqtrade']['config_path'])
+            bot.market_screener = MarketScreener(datadir, cache=bot.cache, **screener_config)
+            api_router.market_screener = bot.market_screener
+
+        with profiler.phase("init controllers"):
+            claude_controller = ClaudeFreqAIController(config, client, bot.monitoring, bot.cache,
+                                                       recovery=bot.error_recovery,
+                                                       screener=bot.market_screener,
+                                                       sessions=SessionStore(shared_store),
+                                                       library=bot.strategy_library)
+            freqai_integration = FreqAIIntegration(config, client, bot.monitoring, bot.cache,
+                                                   claude_controller=claude_controller)
+        bot.freqai_manager.llm = claude_controller
+        bot.config_manager.llm = claude_controller
         
         bot.claude_controller = claude_controller
+        api_router.claude_controller = claude_controller
+        api_router.freqai_integration = freqai_integration
+        api_router.monitoring_system = bot.monitoring
+        bot.monitoring.register_collector(request_metrics)
+        bot.monitoring.register_collector(loop_lag)
+        bot.monitoring.register_source("logging", log_pipeline.stats)
+        api_router.cache = bot.cache
+        api_router.strategy_library = bot.strategy_library
+        api_router.backtest_store = bot.backtest_store
+        strategy_config = config.get('strategies', {})
+        api_router.strategy_generator = StrategyGenerator(
+            strategy_config.get('template_dir', 'templates'),
+            cache_dir=strategy_config.get('template_cache_dir')
+        )
+        sandbox_config = strategy_config.get('sandbox', {})
+        api_router.sandbox = StrategySandbox(
+            workers=sandbox_config.get('workers'),
+            max_tasks_per_worker=sandbox_config.get('max_tasks_per_worker', 50),
+            timeout=sandbox_config.get('timeout', 10.0),
+            memory_mb=sandbox_config.get('memory_mb', 512)
+        )
+
+        broadcaster = MetricsBroadcaster(interval=config.get('metrics', {}).get('push_interval', 1.0))
+        broadcaster.add_source("metrics", freqai_integration.get_current_metrics)
+        broadcaster.add_source("status", bot.get_status)
+        broadcaster.start()
+        api_router.broadcaster = broadcaster
+
+        fleet_bots = config['freqtrade'].get('bots')
+        if fleet_bots:
+            api_router.fleet = FreqtradeFleetClient(
+                fleet_bots,
+                timeout=config['freqtrade'].get('fleet_timeout', 5.0),
+                cache_ttl=config['freqtrade'].get('fleet_cache_ttl', 2.0)
+            )
+
+        sync_clients = dict(api_router.fleet.clients) if fleet_bots else {}
+        if not sync_clients and bot.freqtrade_client is not None:
+            sync_clients = {"default": bot.freqtrade_client}
+        if sync_clients:
+            # Every worker reads the mirror; only the elected leader writes to it
+            trade_sync = TradeSyncEngine(
+                sync_clients,
+                db_path=config['freqtrade'].get('trade_mirror_path', 'trades.db'),
+                on_sync=lambda summary: shared_store.put(
+                    "jobs", "trade_sync", {"worker": leader.holder, "finished_at": time.time(), "bots": summary})
+            )
+            api_router.trade_sync = trade_sync
+
+            async def start_trade_sync() -> None:
+                trade_sync.start(config['freqtrade'].get('trade_sync_interval', 60.0))
+
+            leader.on_elected(start_trade_sync)
+            leader.on_demoted(trade_sync.stop)
+            # Performance metrics are per process, so every worker replays the mirror;
+            # history is only charted for trades that close while we run
+            trade_sync.follow(lambda trade, replay: freqai_integration.record_trade(
+                trade.get('profit_ratio') or 0.0, trade.get('pair'),
+                ts=(trade.get('close_timestamp') or 0) / 1000 or None, history=not replay))
+        async def start_backtest_compaction() -> None:
+            bot.backtest_store.start_compaction(config.get('backtests', {}).get('compaction_interval', 3600.0))
+
+        leader.on_elected(start_backtest_compaction)
+        leader.on_demoted(bot.backtest_store.stop_compaction)
+        telegram_config = dict(config.get('telegram', {}))
+        telegram_config['token'] = telegram_config.get('token') or os.getenv('TELEGRAM_BOT_TOKEN')
+        if telegram_config.pop('enabled', True) and telegram_config['token']:
+            # Telegram allows one long-polling client per token, so only the leader polls
+            telegram = TelegramFrontend.from_config(telegram_config, bot.secure_commands)
+            api_router.telegram = telegram
+            bot.monitoring.register_source("telegram", telegram.status)
+            leader.on_elected(telegram.start)
+            leader.on_demoted(telegram.stop)
+        leader.start()
         return bot
     except Exception as e:
         logger.error(f"Failed to initialize bot: {e}")
@@ -138,8 +287,13 @@ async def main() -> None:
             raise ValueError("ANTHROPIC_API_KEY not found in environment or config")
             
         bot = await initialize_bot(config)
+        if bot is None:
+            return
         logger.info("Starting FreqAssistant...")
-        await bot.start()
+        with profiler.phase("start bot"):
+            await bot.start()
+        profiler.mark("bot_ready")
+        logger.info(f"FreqAssistant ready in {profiler.milestones['bot_ready']:.0f} ms")
         
     except ValueError as ve:
         logger.error(f"Configuration error: {ve}")
@@ -148,15 +302,52 @@ async def main() -> None:
         logger.error(f"System error: {e}")
         raise
 
+@app.on_event("startup")
+async def startup_event() -> None:
+    """Defer bot construction so the server binds and answers /health immediately"""
+    profiler.mark("server_started")
+    loop_lag.start()
+    app.state.init_task = asyncio.create_task(main())
+    # main() logs its own failures; retrieve them so they are not reported twice
+    app.state.init_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+@app.on_event("shutdown")
 async def shutdown_event() -> None:
     """Cleanup on shutdown"""
     logger.info("Shutting down FreqAssistant...")
+    init_task = getattr(app.state, "init_task", None)
+    if init_task is not None and not init_task.done():
+        init_task.cancel()
+    leader = getattr(api_router, "leader", None)
+    if leader is not None:
+        await leader.stop()
+    broadcaster = getattr(api_router, "broadcaster", None)
+    if broadcaster is not None:
+        await broadcaster.stop()
+    backtest_store = getattr(api_router, "backtest_store", None)
+    if backtest_store is not None:
+        await backtest_store.stop_compaction()
+    trade_sync = getattr(api_router, "trade_sync", None)
+    if trade_sync is not None:
+        await trade_sync.stop()
+        await trade_sync.unfollow()
+        trade_sync.close()
+    fleet = getattr(api_router, "fleet", None)
+    if fleet is not None:
+        await fleet.close()
+    sandbox = getattr(api_router, "sandbox", None)
+    if sandbox is not None:
+        sandbox.close()
     if bot is not None:
         try:
             await bot.shutdown()
             logger.info("Bot shutdown completed")
         except Exception as e:
             logger.error(f"Error during shutdown: {e}")
+    shared_store = getattr(api_router, "shared_store", None)
+    if shared_store is not None:
+        shared_store.close()
+    await loop_lag.stop()
 
 if __name__ == "__main__":
     try:
@@ -168,7 +359,18 @@ if __name__ == "__main__":
         # Try different ports if 8000 is in use
         port = int(os.getenv('PORT', 8000))
         max_port_attempts = 10
-        
+
+        try:
+            workers = configured_workers(load_config())
+        except Exception:
+            workers = configured_workers()
+        if workers > 1:
+            # Each worker imports main:app itself; state is shared through SharedStore
+            os.environ['WEB_CONCURRENCY'] = str(workers)
+            logger.info(f"Starting FreqAssistant with {workers} workers on port {port}...")
+            uvicorn.run("main:app", host="0.0.0.0", port=port, log_level=log_level, workers=workers)
+            max_port_attempts = 0
+
         for port_attempt in range(port, port + max_port_attempts):
             try:
                 config = uvicorn.Config(
@@ -181,26 +383,14 @@ if __name__ == "__main__":
                 
                 server = uvicorn.Server(config)
                 
-                # Add shutdown handler before starting
-                app.add_event_handler("shutdown", shutdown_event)
-                
                 # Create and run event loop
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
                 
                 try:
-                    # Create main task
-                    main_task = loop.create_task(main())
-                    
-                    # Run server with main task
+                    # The startup hook initializes the bot once the server is up
                     logger.info(f"Starting FreqAssistant server and bot on port {port_attempt}...")
-                    loop.run_until_complete(
-                        asyncio.gather(
-                            server.serve(),
-                            main_task,
-                            return_exceptions=True
-                        )
-                    )
+                    loop.run_until_complete(server.serve())
                     break  # If successful, exit the port attempt loop
                 except OSError as e:
                     if e.errno == 98:  # Address already in use
@@ -212,8 +402,6 @@ if __name__ == "__main__":
                     
             except KeyboardInterrupt:
                 logger.info("Received shutdown signal...")
-                if main_task and not main_task.done():
-                    main_task.cancel()
                 break
                 
     except Exception as e:
@@ -1,9 +1,27 @@
+import asyncio
+import hmac
 import logging
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+import os
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from .controllers.claude_controller import ClaudeFreqAIController
+from typing import Dict, Any, Optional, List
+from .controllers.claude_controller import ClaudeFreqAIController, DEFAULT_SESSION
+from .freqai_integration import FreqAIIntegration
+from .monitoring import MonitoringSystem, OPENMETRICS_CONTENT_TYPE
+from .broadcaster import MetricsBroadcaster
+from .freqtrade_fleet import FreqtradeFleetClient
+from .trade_sync import TradeSyncEngine
+from .strategy_library import StrategyLibrary, METRIC_COLUMNS
+from .strategy_generator import StrategyGenerator, grid_size
+from .strategy_validator import extract_code, validate_strategy
+from .strategy_sandbox import StrategySandbox
+from .cache import CacheManager
+from .startup import profiler
+from .shared_state import SharedStore, LeaderElector, worker_id
+from .profiling import RequestMetrics, SamplingProfiler
+from .market_screener import MarketScreener
+from .backtest_store import BacktestStore, GROUP_KEYS
 
 logger = logging.getLogger(__name__)
 
@@ -11,15 +29,112 @@ router = APIRouter()
 
 class MessageRequest(BaseModel):
     content: str
+    session_id: Optional[str] = None
+
+class ClearHistoryRequest(BaseModel):
+    session_id: Optional[str] = None
+
+class GenerateRequest(BaseModel):
+    template: str
+    grid: Dict[str, List[Any]] = {}
+
+MAX_GRID_SIZE = 2000
+
+class ValidateRequest(BaseModel):
+    code: str
 
 class MetricsResponse(BaseModel):
     accuracy: float
     loss: float
 
-def get_claude_controller():
-    if not hasattr(router, "claude_controller"):
-        router.claude_controller = ClaudeFreqAIController()
-    return router.claude_controller
+def get_claude_controller() -> ClaudeFreqAIController:
+    controller = getattr(router, "claude_controller", None)
+    if controller is None:
+        raise HTTPException(status_code=503, detail="Claude controller not initialized")
+    return controller
+
+def get_freqai_integration() -> FreqAIIntegration:
+    integration = getattr(router, "freqai_integration", None)
+    if integration is None:
+        raise HTTPException(status_code=503, detail="FreqAI integration not initialized")
+    return integration
+
+def get_monitoring_system() -> MonitoringSystem:
+    monitoring = getattr(router, "monitoring_system", None)
+    if monitoring is None:
+        raise HTTPException(status_code=503, detail="Monitoring not initialized")
+    return monitoring
+
+def get_fleet() -> FreqtradeFleetClient:
+    fleet = getattr(router, "fleet", None)
+    if fleet is None:
+        raise HTTPException(status_code=404, detail="No freqtrade fleet configured")
+    return fleet
+
+def get_trade_sync() -> TradeSyncEngine:
+    trade_sync = getattr(router, "trade_sync", None)
+    if trade_sync is None:
+        raise HTTPException(status_code=404, detail="Trade mirror not configured")
+    return trade_sync
+
+def get_strategy_library() -> StrategyLibrary:
+    library = getattr(router, "strategy_library", None)
+    if library is None:
+        raise HTTPException(status_code=503, detail="Strategy library not initialized")
+    return library
+
+def get_sandbox() -> StrategySandbox:
+    sandbox = getattr(router, "sandbox", None)
+    if sandbox is None:
+        raise HTTPException(status_code=503, detail="Strategy sandbox not initialized")
+    return sandbox
+
+def get_cache() -> CacheManager:
+    cache = getattr(router, "cache", None)
+    if cache is None:
+        raise HTTPException(status_code=503, detail="Cache not initialized")
+    return cache
+
+def get_shared_store() -> SharedStore:
+    store = getattr(router, "shared_store", None)
+    if store is None:
+        raise HTTPException(status_code=404, detail="Shared state not configured")
+    return store
+
+def get_market_screener() -> MarketScreener:
+    screener = getattr(router, "market_screener", None)
+    if screener is None:
+        raise HTTPException(status_code=404, detail="Market screener not configured")
+    return screener
+
+def get_backtest_store() -> BacktestStore:
+    store = getattr(router, "backtest_store", None)
+    if store is None:
+        raise HTTPException(status_code=503, detail="Backtest store not initialized")
+    return store
+
+def get_request_metrics() -> RequestMetrics:
+    metrics = getattr(router, "request_metrics", None)
+    if metrics is None:
+        raise HTTPException(status_code=503, detail="Request metrics not enabled")
+    return metrics
+
+def get_sampling_profiler() -> SamplingProfiler:
+    if not hasattr(router, "sampling_profiler"):
+        router.sampling_profiler = SamplingProfiler()
+    return router.sampling_profiler
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def get_strategy_generator() -> StrategyGenerator:
+    if not hasattr(router, "strategy_generator"):
+        router.strategy_generator = StrategyGenerator()
+    return router.strategy_generator
 
 @router.post("/api/v1/claude/message")
 async def handle_message(
@@ -27,12 +142,31 @@ async def handle_message(
     controller: ClaudeFreqAIController = Depends(get_claude_controller)
 ) -> Dict[str, str]:
     try:
-        response = await controller.handle_command(message.content)
+        response = await controller.handle_command(message.content, message.session_id or DEFAULT_SESSION)
         return {"response": response}
     except Exception as e:
         logger.error(f"Message handling failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/api/v1/claude/resilience")
+async def resilience_status(
+    controller: ClaudeFreqAIController = Depends(get_claude_controller)
+) -> Dict[str, Any]:
+    return controller.resilience.status()
+
+@router.get("/api/v1/claude/semantic-cache")
+async def semantic_cache_status(
+    controller: ClaudeFreqAIController = Depends(get_claude_controller)
+) -> Dict[str, Any]:
+    return controller.semantic_cache.snapshot()
+
+@router.delete("/api/v1/claude/semantic-cache", dependencies=[Depends(require_admin)])
+async def clear_semantic_cache(
+    controller: ClaudeFreqAIController = Depends(get_claude_controller)
+) -> Dict[str, str]:
+    controller.semantic_cache.clear()
+    return {"status": "cleared"}
+
 @router.get("/api/v1/claude/metrics")
 async def get_metrics(
     controller: ClaudeFreqAIController = Depends(get_claude_controller)
@@ -48,10 +182,11 @@ async def get_metrics(
 
 @router.post("/api/v1/claude/clear-history")
 async def clear_history(
+    request: Optional[ClearHistoryRequest] = None,
     controller: ClaudeFreqAIController = Depends(get_claude_controller)
 ) -> Dict[str, str]:
     try:
-        await controller.clear_history()
+        await controller.clear_history((request and request.session_id) or DEFAULT_SESSION)
         return {"status": "success"}
     except Exception as e:
         logger.error(f"History clear failed: {e}")
@@ -69,21 +204,264 @@ async def start_training(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/api/metrics")
-async def get_metrics():
-    # Connect to FreqAIIntegration metrics
-    return freqai_integration.get_current_metrics()
-
-@router.post("/api/message")
-async def send_message(message: str):
-    # Forward to ClaudeFreqAIController
-    return await claude_controller.handle_command(message)
-
-@router.post("/api/clear-history")
-async def clear_history():
-    # Clear chat history
-    return {"status": "success"}
-
-@router.post("/api/start-training")
-async def start_training():
-    # Trigger FreqAI training
-    return {"status": "success"}
\ No newline at end of file
+async def get_metrics_history(
+    start: Optional[float] = Query(None, description="Range start, epoch seconds"),
+    end: Optional[float] = Query(None, description="Range end, epoch seconds"),
+    points: int = Query(300, ge=1, le=5000, description="Maximum points returned"),
+    freqai_integration: FreqAIIntegration = Depends(get_freqai_integration)
+) -> List[Dict[str, Any]]:
+    return freqai_integration.get_metrics_history(start, end, points)
+
+@router.get("/api/metrics/current")
+async def get_current_metrics(
+    pair: Optional[str] = None,
+    freqai_integration: FreqAIIntegration = Depends(get_freqai_integration)
+) -> Dict[str, float]:
+    return freqai_integration.get_current_metrics(pair)
+
+@router.get("/metrics")
+async def metrics_exposition(
+    monitoring: MonitoringSystem = Depends(get_monitoring_system)
+) -> Response:
+    return Response(content=monitoring.render(), media_type=OPENMETRICS_CONTENT_TYPE)
+
+@router.websocket("/ws/metrics")
+async def metrics_socket(websocket: WebSocket):
+    broadcaster: Optional[MetricsBroadcaster] = getattr(router, "broadcaster", None)
+    if broadcaster is None:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+    subscriber = broadcaster.subscribe()
+
+    async def wait_closed() -> None:
+        # Clients only listen; reading notices a disconnect while no frames are due
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        except Exception:
+            pass
+
+    closed = asyncio.ensure_future(wait_closed())
+    try:
+        while True:
+            frame = asyncio.ensure_future(subscriber.queue.get())
+            await asyncio.wait({frame, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                frame.cancel()
+                break
+            await websocket.send_text(frame.result())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Metrics socket closed: {e}")
+    finally:
+        closed.cancel()
+        broadcaster.unsubscribe(subscriber)
+
+@router.get("/api/fleet/status")
+async def fleet_status(fleet: FreqtradeFleetClient = Depends(get_fleet)) -> Dict[str, Any]:
+    return await fleet.get_status()
+
+@router.get("/api/fleet/trades")
+async def fleet_trades(
+    limit: int = Query(100, ge=1, le=1000),
+    fleet: FreqtradeFleetClient = Depends(get_fleet)
+) -> Dict[str, Any]:
+    return await fleet.get_trades(limit)
+
+@router.get("/api/fleet/profit")
+async def fleet_profit(fleet: FreqtradeFleetClient = Depends(get_fleet)) -> Dict[str, Any]:
+    return await fleet.get_profit()
+
+@router.get("/api/fleet/balance")
+async def fleet_balance(fleet: FreqtradeFleetClient = Depends(get_fleet)) -> Dict[str, Any]:
+    return await fleet.get_balance()
+
+@router.get("/api/trades")
+async def mirrored_trades(
+    limit: int = Query(50, ge=1, le=1000),
+    bot: Optional[str] = None,
+    pair: Optional[str] = None,
+    trade_sync: TradeSyncEngine = Depends(get_trade_sync)
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(trade_sync.recent_trades, limit, bot, pair)
+
+@router.get("/api/trades/summary")
+async def mirrored_trade_summary(
+    bot: Optional[str] = None,
+    since: Optional[int] = Query(None, description="Close time lower bound, epoch ms"),
+    trade_sync: TradeSyncEngine = Depends(get_trade_sync)
+) -> Dict[str, Any]:
+    return await asyncio.to_thread(trade_sync.profit_summary, bot, since)
+
+@router.get("/api/market/screen")
+async def market_screen(
+    timeframe: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=1000),
+    screener: MarketScreener = Depends(get_market_screener)
+) -> Dict[str, Any]:
+    timeframe = timeframe or screener.timeframes[0]
+    if timeframe not in screener.timeframes:
+        raise HTTPException(status_code=400, detail=f"Timeframe not screened: {timeframe}")
+    scan = await asyncio.to_thread(screener.scan, timeframe)
+    return {**scan, "pairs": scan["pairs"][:limit], "total_pairs": len(scan["pairs"])}
+
+@router.get("/api/strategies/search")
+async def search_strategies(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=200),
+    library: StrategyLibrary = Depends(get_strategy_library)
+) -> List[Dict[str, Any]]:
+    return await library.search(q, limit)
+
+@router.get("/api/strategies/top")
+async def top_strategies(
+    metric: str = Query("sharpe", regex="^(" + "|".join(METRIC_COLUMNS) + ")$"),
+    limit: int = Query(20, ge=1, le=200),
+    min_trades: int = Query(0, ge=0),
+    library: StrategyLibrary = Depends(get_strategy_library)
+) -> List[Dict[str, Any]]:
+    return await library.top(metric, limit, min_trades)
+
+@router.post("/api/strategies/generate", dependencies=[Depends(require_admin)])
+async def generate_strategies(
+    request: GenerateRequest,
+    generator: StrategyGenerator = Depends(get_strategy_generator),
+    library: StrategyLibrary = Depends(get_strategy_library)
+) -> Dict[str, Any]:
+    if request.template not in generator.list_templates():
+        raise HTTPException(status_code=404, detail=f"Unknown template: {request.template}")
+    size = grid_size(request.grid)
+    if size > MAX_GRID_SIZE:
+        raise HTTPException(status_code=400, detail=f"Grid expands to {size} strategies (max {MAX_GRID_SIZE})")
+    result = await generator.add_to_library(library, request.template, request.grid)
+    return {"template": request.template, "combinations": size, **result}
+
+@router.post("/api/strategies/validate")
+async def validate_strategy_code(request: ValidateRequest) -> Dict[str, Any]:
+    return validate_strategy(extract_code(request.code)).to_dict()
+
+@router.post("/api/strategies/smoke-test", dependencies=[Depends(require_admin)])
+async def smoke_test_strategy(
+    request: ValidateRequest,
+    sandbox: StrategySandbox = Depends(get_sandbox)
+) -> Dict[str, Any]:
+    result = await sandbox.run(extract_code(request.code))
+    return result.to_dict()
+
+@router.get("/api/backtests/runs")
+async def backtest_runs(
+    strategy: Optional[str] = None,
+    config_hash: Optional[str] = None,
+    since: Optional[int] = Query(None, description="Run start lower bound, epoch ms"),
+    until: Optional[int] = Query(None, description="Run start upper bound, epoch ms"),
+    order_by: str = Query("started_at", regex="^(started_at|profit_total|profit_abs|sharpe|winrate|max_drawdown)$"),
+    limit: int = Query(100, ge=1, le=10000),
+    store: BacktestStore = Depends(get_backtest_store)
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(store.runs, strategy, config_hash, since, until, None, order_by, limit)
+
+@router.get("/api/backtests/trades")
+async def backtest_trades(
+    run_id: Optional[str] = None,
+    strategy: Optional[str] = None,
+    pair: Optional[str] = None,
+    config_hash: Optional[str] = None,
+    since: Optional[int] = Query(None, description="Close time lower bound, epoch ms"),
+    until: Optional[int] = Query(None, description="Close time upper bound, epoch ms"),
+    limit: int = Query(1000, ge=1, le=100000),
+    store: BacktestStore = Depends(get_backtest_store)
+) -> List[Dict[str, Any]]:
+    return await asyncio.to_thread(store.trades, run_id, strategy, pair, config_hash, since, until, None, limit)
+
+@router.get("/api/backtests/aggregate")
+async def backtest_aggregate(
+    by: List[str] = Query(["strategy"]),
+    run_id: Optional[str] = None,
+    strategy: Optional[str] = None,
+    pair: Optional[str] = None,
+    config_hash: Optional[str] = None,
+    since: Optional[int] = Query(None, description="Close time lower bound, epoch ms"),
+    until: Optional[int] = Query(None, description="Close time upper bound, epoch ms"),
+    store: BacktestStore = Depends(get_backtest_store)
+) -> List[Dict[str, Any]]:
+    unknown = [key for key in by if key not in GROUP_KEYS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Cannot group by {unknown}")
+    return await asyncio.to_thread(store.aggregate, by, run_id, strategy, pair, config_hash, since, until)
+
+@router.get("/api/strategies/{name}")
+async def get_strategy(
+    name: str,
+    library: StrategyLibrary = Depends(get_strategy_library)
+) -> Dict[str, Any]:
+    strategy = await library.get(name)
+    if strategy is None:
+        raise HTTPException(status_code=404, detail=f"Unknown strategy: {name}")
+    return strategy
+
+@router.get("/api/startup")
+async def startup_report() -> Dict[str, Any]:
+    return profiler.report()
+
+@router.get("/api/cluster")
+async def cluster_status(store: SharedStore = Depends(get_shared_store)) -> Dict[str, Any]:
+    elector: Optional[LeaderElector] = getattr(router, "leader", None)
+    return {
+        "worker": worker_id(),
+        "is_leader": elector is not None and elector.is_leader,
+        "leader": store.lease_holder(elector.name) if elector is not None else None,
+        "jobs": store.items("jobs"),
+    }
+
+@router.get("/api/latency")
+async def latency_report(metrics: RequestMetrics = Depends(get_request_metrics)) -> Dict[str, Any]:
+    report = metrics.snapshot()
+    loop_lag = getattr(router, "loop_lag", None)
+    if loop_lag is not None:
+        report["event_loop_lag"] = loop_lag.snapshot()
+    return report
+
+@router.post("/api/latency/reset", dependencies=[Depends(require_admin)])
+async def reset_latency(metrics: RequestMetrics = Depends(get_request_metrics)) -> Dict[str, str]:
+    metrics.reset()
+    loop_lag = getattr(router, "loop_lag", None)
+    if loop_lag is not None:
+        loop_lag.reset()
+    return {"status": "reset"}
+
+@router.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0, le=120, description="Sampling duration"),
+    interval: float = Query(0.005, ge=0.001, le=0.1, description="Seconds between samples"),
+    sampler: SamplingProfiler = Depends(get_sampling_profiler)
+) -> Response:
+    """Sample all threads for ``seconds`` and return collapsed stacks for flamegraph tools"""
+    if sampler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        result = await asyncio.to_thread(sampler.profile, seconds, interval)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(sampler.collapse(result["stacks"]), headers={
+        "X-Profile-Samples": str(result["samples"]),
+        "X-Profile-Duration": f"{result['duration']:.3f}",
+    })
+
+@router.get("/api/cache/stats")
+async def cache_stats(cache: CacheManager = Depends(get_cache)) -> Dict[str, Any]:
+    return cache.stats()
+
+@router.post("/api/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_cache(
+    region: Optional[str] = None,
+    tag: Optional[str] = None,
+    cache: CacheManager = Depends(get_cache)
+) -> Dict[str, Any]:
+    if tag:
+        return {"tag": tag, "removed": cache.invalidate_tag(tag)}
+    if region not in cache.regions:
+        raise HTTPException(status_code=404, detail=f"Unknown cache region: {region}")
+    cache.invalidate(region)
+    return {"region": region, "cleared": True}
@@ -0,0 +1,402 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+import glob
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Sequence, Iterable, Callable
+from .cache import make_key
+from .shared_state import file_lock
+from .startup import lazy_import
+
+pa = lazy_import("pyarrow")
+pc = lazy_import("pyarrow.compute")
+ds = lazy_import("pyarrow.dataset")
+pq = lazy_import("pyarrow.parquet")
+
+logger = logging.getLogger(__name__)
+
+# Run-level metrics; freqtrade's backtest result keys are accepted as aliases
+RUN_METRICS = ("profit_total", "profit_abs", "max_drawdown", "sharpe", "winrate",
+               "total_trades", "wins", "losses")
+_RUN_ALIASES = {
+    "profit": "profit_total", "profit_total_abs": "profit_abs",
+    "max_drawdown_account": "max_drawdown", "trade_count": "total_trades",
+}
+GROUP_KEYS = ("strategy", "pair", "config_hash", "run_id", "exit_reason")
+
+_PARTITION_VALUE_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """Short stable hash identifying a strategy/FreqAI configuration"""
+    return make_key(config)[:16]
+
+
+def _timestamp():
+    return pa.timestamp("ms", tz="UTC")
+
+
+def _run_schema():
+    return pa.schema([
+        ("run_id", pa.string()), ("strategy", pa.string()), ("config_hash", pa.string()),
+        ("started_at", _timestamp()), ("timeframe", pa.string()),
+        ("timerange_start", _timestamp()), ("timerange_end", _timestamp()),
+        ("profit_total", pa.float64()), ("profit_abs", pa.float64()), ("max_drawdown", pa.float64()),
+        ("sharpe", pa.float64()), ("winrate", pa.float64()),
+        ("total_trades", pa.int64()), ("wins", pa.int64()), ("losses", pa.int64()),
+        ("config", pa.string()),
+    ])
+
+
+def _trade_schema():
+    return pa.schema([
+        ("run_id", pa.string()), ("strategy", pa.string()), ("config_hash", pa.string()),
+        ("month", pa.string()), ("pair", pa.string()), ("is_short", pa.bool_()),
+        ("open_date", _timestamp()), ("close_date", _timestamp()),
+        ("open_rate", pa.float64()), ("close_rate", pa.float64()),
+        ("profit_ratio", pa.float64()), ("profit_abs", pa.float64()), ("exit_reason", pa.string()),
+    ])
+
+
+RUN_PARTITIONS = ("strategy",)
+TRADE_PARTITIONS = ("strategy", "month")
+
+
+def _file_schema(schema, partition_by: Sequence[str]):
+    """``schema`` without the partition columns, which live in directory names"""
+    return pa.schema([f for f in schema if f.name not in partition_by])
+
+
+def _partitioning(*names: str):
+    return ds.partitioning(pa.schema([(name, pa.string()) for name in names]), flavor="hive")
+
+
+def _epoch_ms(value: Any) -> Optional[int]:
+    """Epoch ms from epoch seconds/ms, a datetime or an ISO date string (UTC unless stated)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    value = float(value)
+    return int(value * 1000 if value < 1e11 else value)
+
+
+def _month(ms: Optional[int]) -> str:
+    return time.strftime("%Y-%m", time.gmtime((ms or 0) / 1000))
+
+
+def _rows(table) -> List[Dict[str, Any]]:
+    """Rows as dicts with timestamps as epoch ms, like the trade mirror's API"""
+    columns = {}
+    for name in table.column_names:
+        column = table.column(name)
+        if pa.types.is_timestamp(column.type):
+            column = column.cast(pa.int64())
+        columns[name] = column
+    return pa.table(columns).to_pylist() if columns else []
+
+
+class BacktestStore:
+    """
+    Backtest runs and their trades as hive-partitioned Parquet datasets.
+
+    ``runs/strategy=<name>/`` holds one row per run (metrics plus the
+    config and its hash); ``trades/strategy=<name>/month=<close month>/``
+    holds the individual trades. Queries go through ``pyarrow.dataset``
+    so only the requested columns are read and strategy, month and
+    row-group statistics prune files before decoding. Opening files
+    dominates small queries, so partitions are merged once they hold
+    ``max_files_per_partition`` files and ``compact`` (run periodically
+    by ``start_compaction``) folds each back into a single file.
+
+    Several workers may share the directory. Writers serialise on
+    ``.write.lock``; swapping merged files in takes ``.swap.lock``
+    exclusively while queries hold it shared, so a query never sees both
+    a merged file and its inputs.
+    """
+
+    def __init__(self, root: str = "backtest_results", max_files_per_partition: int = 16):
+        self.root = root
+        self.runs_path = os.path.join(root, "runs")
+        self.trades_path = os.path.join(root, "trades")
+        self.max_files_per_partition = max_files_per_partition
+        self._lock = threading.Lock()
+        self._write_lock_path = os.path.join(root, ".write.lock")
+        self._swap_lock_path = os.path.join(root, ".swap.lock")
+        self._compaction_task: Optional[asyncio.Task] = None
+
+    def record(self, strategy: str, results: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+               trades: Iterable[Dict[str, Any]] = (), run_id: Optional[str] = None,
+               started_at: Optional[float] = None) -> str:
+        """Persist one backtest run and its trades; returns the run id"""
+        run_id = run_id or uuid.uuid4().hex[:12]
+        strategy = _PARTITION_VALUE_RE.sub("_", strategy) or "unknown"
+        config = config or {}
+        digest = config_hash(config)
+        trades = list(trades)
+        metrics = {_RUN_ALIASES.get(k, k): v for k, v in results.items()}
+        if trades:
+            profits = [t.get("profit_ratio") or 0.0 for t in trades]
+            metrics.setdefault("total_trades", len(trades))
+            metrics.setdefault("wins", sum(p > 0 for p in profits))
+            metrics.setdefault("losses", sum(p <= 0 for p in profits))
+            metrics.setdefault("profit_abs", sum(t.get("profit_abs") or 0.0 for t in trades))
+        if metrics.get("total_trades") and "winrate" not in metrics and "wins" in metrics:
+            metrics["winrate"] = metrics["wins"] / metrics["total_trades"]
+
+        trade_rows = []
+        for trade in trades:
+            close_ms = _epoch_ms(trade.get("close_timestamp", trade.get("close_date")))
+            trade_rows.append({
+                "run_id": run_id, "strategy": strategy, "config_hash": digest, "month": _month(close_ms),
+                "pair": trade.get("pair"), "is_short": bool(trade.get("is_short", False)),
+                "open_date": _epoch_ms(trade.get("open_timestamp", trade.get("open_date"))),
+                "close_date": close_ms,
+                "open_rate": trade.get("open_rate"), "close_rate": trade.get("close_rate"),
+                "profit_ratio": trade.get("profit_ratio"), "profit_abs": trade.get("profit_abs"),
+                "exit_reason": trade.get("exit_reason"),
+            })
+        run_row = {
+            "run_id": run_id, "strategy": strategy, "config_hash": digest,
+            "started_at": int((started_at or time.time()) * 1000),
+            "timeframe": results.get("timeframe") or config.get("timeframe"),
+            "timerange_start": _epoch_ms(results.get("backtest_start")),
+            "timerange_end": _epoch_ms(results.get("backtest_end")),
+            **{name: metrics.get(name) for name in RUN_METRICS},
+            "config": json.dumps(config, sort_keys=True, default=str),
+        }
+        by_month: Dict[str, List[Dict[str, Any]]] = {}
+        for row in trade_rows:
+            by_month.setdefault(row.pop("month"), []).append(row)
+        with self._writing():
+            # Trades first, so a visible run always has its trades
+            for month, rows in by_month.items():
+                self._append(self._partition_dir(self.trades_path, strategy=strategy, month=month),
+                             pa.Table.from_pylist(rows, schema=_file_schema(_trade_schema(), TRADE_PARTITIONS)),
+                             self.max_files_per_partition)
+            self._append(self._partition_dir(self.runs_path, strategy=strategy),
+                         pa.Table.from_pylist([run_row], schema=_file_schema(_run_schema(), RUN_PARTITIONS)),
+                         self.max_files_per_partition)
+        logger.info(f"Recorded backtest run {run_id} ({strategy}, {len(trade_rows)} trades)")
+        return run_id
+
+    @staticmethod
+    def _partition_dir(path: str, **values: str) -> str:
+        return os.path.join(path, *(f"{name}={value}" for name, value in values.items()))
+
+    @contextmanager
+    def _writing(self):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, file_lock(self._write_lock_path):
+            yield
+
+    def _reading(self, read: Callable[[], Any]) -> Any:
+        """Run a query against a stable set of files"""
+        if not os.path.isdir(self.root):
+            return read()
+        for attempt in range(3):
+            try:
+                with file_lock(self._swap_lock_path, shared=True):
+                    return read()
+            except FileNotFoundError:
+                # Removed by a writer that does not take the swap lock (older
+                # version, manual cleanup): discover the files again
+                if attempt == 2:
+                    raise
+                logger.debug("Backtest file vanished during a query, retrying")
+
+    def _append(self, directory: str, table, max_files: int) -> int:
+        """
+        Add ``table`` to a partition directory, merging the existing files into
+        the new one when there would be more than ``max_files``. Files are
+        written under a dot-prefixed name (ignored by dataset discovery)
+        and swapped in under the swap lock. Returns the number of files
+        replaced. Callers hold the write lock.
+        """
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(glob.glob(os.path.join(glob.escape(directory), "*.parquet")))
+        merged = existing if len(existing) + (table is not None) > max_files else []
+        tables = [pq.read_table(path) for path in merged] + ([table] if table is not None else [])
+        if not tables:
+            return 0
+        name = f"{uuid.uuid4().hex}.parquet"
+        staging = os.path.join(directory, f".{name}")
+        pq.write_table(pa.concat_tables(tables) if len(tables) > 1 else tables[0], staging)
+        with file_lock(self._swap_lock_path):
+            os.replace(staging, os.path.join(directory, name))
+            for path in merged:
+                os.remove(path)
+        return len(merged)
+
+    def _dataset(self, path: str, schema, partition_by: Sequence[str]):
+        if not os.path.isdir(path):
+            return None
+        schema = pa.schema(list(_file_schema(schema, partition_by)) +
+                           [pa.field(name, pa.string()) for name in partition_by])
+        return ds.dataset(path, schema=schema, format="parquet", partitioning=_partitioning(*partition_by))
+
+    @staticmethod
+    def _filter(conditions: List[Any]):
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def runs(self, strategy: Optional[str] = None, config_hash: Optional[str] = None,
+             since: Optional[int] = None, until: Optional[int] = None,
+             columns: Optional[Sequence[str]] = None, order_by: str = "started_at",
+             limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Runs matching the filters (``since``/``until`` bound ``started_at`` in epoch ms), best first"""
+        if not os.path.isdir(self.runs_path):
+            return []
+        conditions = []
+        if strategy is not None:
+            conditions.append(ds.field("strategy") == strategy)
+        if config_hash is not None:
+            conditions.append(ds.field("config_hash") == config_hash)
+        if since is not None:
+            conditions.append(ds.field("started_at") >= pa.scalar(since, _timestamp()))
+        if until is not None:
+            conditions.append(ds.field("started_at") < pa.scalar(until, _timestamp()))
+        columns = list(columns) if columns else [n for n in _run_schema().names if n != "config"]
+        if order_by not in columns:
+            columns.append(order_by)
+        table = self._reading(lambda: self._dataset(self.runs_path, _run_schema(), RUN_PARTITIONS).to_table(
+            columns=columns, filter=self._filter(conditions)))
+        table = table.sort_by([(order_by, "descending")])
+        if limit is not None:
+            table = table.slice(0, limit)
+        return _rows(table)
+
+    def _trade_conditions(self, run_id: Optional[str], strategy: Optional[str], pair: Optional[str],
+                          config_hash: Optional[str], since: Optional[int], until: Optional[int]) -> List[Any]:
+        conditions = []
+        if run_id is not None:
+            conditions.append(ds.field("run_id") == run_id)
+        if strategy is not None:
+            conditions.append(ds.field("strategy") == strategy)
+        if pair is not None:
+            conditions.append(ds.field("pair") == pair)
+        if config_hash is not None:
+            conditions.append(ds.field("config_hash") == config_hash)
+        # The month partition lets date ranges skip whole directories
+        if since is not None:
+            conditions.append(ds.field("month") >= _month(since))
+            conditions.append(ds.field("close_date") >= pa.scalar(since, _timestamp()))
+        if until is not None:
+            conditions.append(ds.field("month") <= _month(until))
+            conditions.append(ds.field("close_date") < pa.scalar(until, _timestamp()))
+        return conditions
+
+    def trades(self, run_id: Optional[str] = None, strategy: Optional[str] = None, pair: Optional[str] = None,
+               config_hash: Optional[str] = None, since: Optional[int] = None, until: Optional[int] = None,
+               columns: Optional[Sequence[str]] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Trades matching the filters (``since``/``until`` bound ``close_date`` in epoch ms)"""
+        if not os.path.isdir(self.trades_path):
+            return []
+        conditions = self._trade_conditions(run_id, strategy, pair, config_hash, since, until)
+
+        def read():
+            scanner = self._dataset(self.trades_path, _trade_schema(), TRADE_PARTITIONS).scanner(
+                columns=list(columns) if columns else None, filter=self._filter(conditions))
+            return scanner.head(limit) if limit is not None else scanner.to_table()
+        table = self._reading(read)
+        return _rows(table.sort_by([("close_date", "ascending")]) if "close_date" in table.column_names
+                     else table)
+
+    def aggregate(self, by: Sequence[str] = ("strategy",), run_id: Optional[str] = None,
+                  strategy: Optional[str] = None, pair: Optional[str] = None,
+                  config_hash: Optional[str] = None, since: Optional[int] = None,
+                  until: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Trade statistics grouped by any of ``GROUP_KEYS``, most profitable group first"""
+        by = list(by)
+        unknown = [key for key in by if key not in GROUP_KEYS]
+        if unknown:
+            raise ValueError(f"Cannot group by {unknown}; choose from {GROUP_KEYS}")
+        if not os.path.isdir(self.trades_path):
+            return []
+        conditions = self._trade_conditions(run_id, strategy, pair, config_hash, since, until)
+        table = self._reading(lambda: self._dataset(self.trades_path, _trade_schema(), TRADE_PARTITIONS).to_table(
+            columns=by + ["profit_ratio", "profit_abs"], filter=self._filter(conditions)))
+        if not table.num_rows:
+            return []
+        table = table.append_column("win", pc.cast(pc.greater(table.column("profit_ratio"), 0), pa.int64()))
+        grouped = table.group_by(by).aggregate([
+            ("profit_ratio", "count"), ("profit_ratio", "mean"), ("profit_ratio", "sum"),
+            ("profit_abs", "sum"), ("win", "sum"),
+        ])
+        rows = []
+        for row in grouped.to_pylist():
+            trades = row["profit_ratio_count"]
+            rows.append({
+                **{key: row[key] for key in by},
+                "trades": trades,
+                "profit_mean": row["profit_ratio_mean"],
+                "profit_total": row["profit_ratio_sum"],
+                "profit_abs": row["profit_abs_sum"],
+                "winrate": row["win_sum"] / trades if trades else 0.0,
+            })
+        return sorted(rows, key=lambda r: r["profit_abs"] or 0.0, reverse=True)
+
+    def summary(self, strategy: Optional[str] = None, limit: int = 10) -> str:
+        """Recent runs as compact text for prompts"""
+        runs = self.runs(strategy=strategy, limit=limit,
+                         columns=["run_id", "strategy", "config_hash", "started_at", "profit_total",
+                                  "total_trades", "winrate", "max_drawdown"])
+        if not runs:
+            return "No recorded backtests."
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else "n/a"
+        return "\n".join(
+            f"- {r['run_id']} {r['strategy']} cfg {r['config_hash']}: profit {fmt(r['profit_total'], '+.2%')}, "
+            f"{r['total_trades'] or 0} trades, winrate {fmt(r['winrate'], '.0%')}, "
+            f"drawdown {fmt(r['max_drawdown'], '.2%')}"
+            for r in runs
+        )
+
+    def compact(self) -> Dict[str, int]:
+        """Rewrite every partition as a single file; returns files before compaction per table"""
+        counts = {}
+        with self._writing():
+            for name, path, depth in (("runs", self.runs_path, 1), ("trades", self.trades_path, 2)):
+                counts[name] = 0
+                pattern = os.path.join(glob.escape(path), *("*=*" for _ in range(depth)))
+                for directory in glob.glob(pattern):
+                    counts[name] += len(glob.glob(os.path.join(glob.escape(directory), "*.parquet")))
+                    self._append(directory, None, 1)
+        return counts
+
+    def start_compaction(self, interval: float = 3600.0) -> None:
+        """Compact every ``interval`` seconds in a background thread; one worker is enough"""
+        if self._compaction_task is None or self._compaction_task.done():
+            self._compaction_task = asyncio.get_running_loop().create_task(self._compact_periodically(interval))
+
+    async def stop_compaction(self) -> None:
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            try:
+                await self._compaction_task
+            except asyncio.CancelledError:
+                pass
+            self._compaction_task = None
+
+    async def _compact_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                counts = await asyncio.to_thread(self.compact)
+                logger.debug(f"Compacted backtest results: {counts}")
+            except Exception as e:
+                logger.error(f"Backtest compaction failed: {e}")
@@ -1,13 +1,19 @@
+import asyncio
 import logging
 from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
-from anthropic import Anthropic
 from .config_manager import FreqtradeConfigManager
 from .freqai_manager import FreqAIManager
 from .secure_commands import SecureCommands
 from .error_handler import ErrorRecoveryManager
-from .freqai_integration import MonitoringSystem
-from cachetools import TTLCache
+from .monitoring import MonitoringSystem
+from .freqtrade_client import FreqtradeClient
+from .state_manager import StateManager
+from .strategy_library import StrategyLibrary
+from .cache import CacheManager
+from .shared_state import SharedStore
+from .market_screener import MarketScreener
+from .backtest_store import BacktestStore
 from .controllers.claude_controller import ClaudeFreqAIController
 
 logger = logging.getLogger(__name__)
@@ -18,31 +24,90 @@ class SystemState:
     current_model_description: str = ""
     last_prediction: Dict[str, Any] = field(default_factory=dict)
     performance: Dict[str, Any] = field(default_factory=dict)
-    cache: TTLCache = field(default_factory=lambda: TTLCache(maxsize=100, ttl=60))
 
 @dataclass
 class FreqtradeAI:
     api_key: str
     config_path: str
+    state_db_path: str = "freqtrade_ai.db"
+    cache_config: Dict[str, Any] = field(default_factory=dict)
+    backtest_results_path: str = "backtest_results"
+    shared_store: Optional[SharedStore] = None
     config_manager: FreqtradeConfigManager = field(init=False)
     freqai_manager: FreqAIManager = field(init=False)
     secure_commands: SecureCommands = field(init=False)
     claude_controller: Optional[ClaudeFreqAIController] = field(default=None, init=False)
+    freqtrade_client: Optional[FreqtradeClient] = field(default=None, init=False)
+    market_screener: Optional[MarketScreener] = field(default=None, init=False)
 
     def __post_init__(self):
         self.state = SystemState()
-        self.config_manager = FreqtradeConfigManager(self.api_key, self.config_path)
-        self.freqai_manager = FreqAIManager()
+        self.cache = CacheManager(self.cache_config.get('regions'), self.cache_config.get('disk_path'))
+        self.state_manager = StateManager(self.state_db_path)
+        self.strategy_library = StrategyLibrary(self.state_manager)
+        self.config_manager = FreqtradeConfigManager(self.api_key, self.config_path, self.cache)
+        self.backtest_store = BacktestStore(self.backtest_results_path)
+        self.freqai_manager = FreqAIManager(self.cache, results_store=self.backtest_store,
+                                            library=self.strategy_library)
         self.secure_commands = SecureCommands(self)
+        self.error_recovery = ErrorRecoveryManager(self.state_manager)
         self.claude_controller = None
         self.monitoring = MonitoringSystem()
+        self.monitoring.register_source("assistant", self.get_status)
+        # Per-region hit rates, sizes and evictions as cache.<region>.<stat>
+        self.monitoring.register_source("cache", self.cache.stats)
+        self.freqtrade_client = self._create_freqtrade_client()
+        if self.freqtrade_client is not None:
+            self.monitoring.register_source("freqtrade", self._freqtrade_status)
+
+    def _create_freqtrade_client(self) -> Optional[FreqtradeClient]:
+        """Build a REST client from the freqtrade config's api_server section"""
+        config = self.config_manager.read_config() or {}
+        api_server = config.get('api_server', {})
+        if not api_server.get('enabled'):
+            return None
+        host = api_server.get('listen_ip_address', '127.0.0.1')
+        if host in ('0.0.0.0', '::'):
+            host = '127.0.0.1'
+        return FreqtradeClient(
+            f"http://{host}:{api_server.get('listen_port', 8080)}/api/v1",
+            username=api_server.get('username'),
+            password=api_server.get('password')
+        )
+
+    async def _freqtrade_status(self) -> Dict[str, Any]:
+        open_trades = await self.cache.get_or_load("freqtrade", "status", self.freqtrade_client.get_status)
+        return {"open_trades": len(open_trades)}
+
+    def get_status(self) -> Dict[str, Any]:
+        """Compact assistant status for monitoring and push updates"""
+        return {
+            "running": self.state.is_running,
+            "cache_entries": self.cache.total_entries(),
+        }
+
+    async def save_snapshot(self) -> None:
+        """Persist the current system state without blocking the event loop"""
+        try:
+            await self.state_manager.save_state_async(self.state)
+        except Exception as e:
+            logger.error(f"Failed to save state snapshot: {e}")
 
     async def start(self):
         """Start the FreqTrade AI assistant"""
+        saved = await self.state_manager.load_state_async()
+        self.state.current_model_description = saved.get('current_model_description', '')
         self.state.is_running = True
+        self.monitoring.start()
         logger.info("FreqTrade AI Assistant started")
         
     async def shutdown(self):
         """Shutdown the FreqTrade AI assistant"""
         self.state.is_running = False
+        await self.monitoring.stop()
+        if self.freqtrade_client is not None:
+            await self.freqtrade_client.close()
+        await self.save_snapshot()
+        await asyncio.to_thread(self.state_manager.close)
+        self.cache.close()
         logger.info("FreqTrade AI Assistant shutdown")
\ No newline at end of file
@@ -0,0 +1,141 @@
+import asyncio
+import inspect
+import json
+import logging
+from typing import Dict, Any, Optional, Callable, Set
+
+logger = logging.getLogger(__name__)
+
+_REMOVED = None  # value sent in a delta for keys that disappeared
+_MISSING = object()
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursive dict delta; removed keys map to None"""
+    delta: Dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key, _MISSING)
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = diff_state(previous, value)
+            if nested:
+                delta[key] = nested
+        elif previous is _MISSING or previous != value:
+            delta[key] = value
+    for key in old:
+        if key not in new:
+            delta[key] = _REMOVED
+    return delta
+
+
+class Subscriber:
+    """One connected client's bounded frame queue"""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+
+class MetricsBroadcaster:
+    """
+    Single producer pushing metric/status deltas to WebSocket subscribers.
+
+    Each tick polls the registered sources once, diffs against the previous
+    state and serialises the delta once for every client. A client whose
+    queue is full has its pending frames dropped and replaced by a full
+    snapshot, so slow clients skip intermediate frames but never end up
+    with an inconsistent view.
+    """
+
+    def __init__(self, interval: float = 1.0, queue_size: int = 8):
+        self.interval = interval
+        self.queue_size = queue_size
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self._subscribers: Set[Subscriber] = set()
+        self._state: Dict[str, Any] = {}
+        self._seq = 0
+        self._snapshot_frame: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add_source(self, name: str, fn: Callable[[], Any]) -> None:
+        """Register a callable (sync or async) returning a JSON-serialisable dict"""
+        self._sources[name] = fn
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        if self._state:
+            subscriber.queue.put_nowait(self._snapshot())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def _snapshot(self) -> str:
+        if self._snapshot_frame is None:
+            self._snapshot_frame = json.dumps({"type": "snapshot", "seq": self._seq, "data": self._state})
+        return self._snapshot_frame
+
+    async def _poll_sources(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {}
+        for name, fn in self._sources.items():
+            try:
+                result = fn()
+                if inspect.isawaitable(result):
+                    result = await result
+                state[name] = result
+            except Exception as e:
+                logger.warning(f"Broadcast source {name} failed: {e}")
+                state[name] = self._state.get(name)
+        return state
+
+    async def tick(self) -> None:
+        """Poll sources once and fan the delta out to every subscriber"""
+        if not self._subscribers:
+            # Nothing to send; the next subscriber gets a fresh snapshot
+            self._state = {}
+            self._snapshot_frame = None
+            return
+
+        state = await self._poll_sources()
+        delta = diff_state(self._state, state)
+        if not delta:
+            return
+        self._state = state
+        self._seq += 1
+        self._snapshot_frame = None
+        frame = json.dumps({"type": "delta", "seq": self._seq, "data": delta})
+
+        for subscriber in list(self._subscribers):
+            queue = subscriber.queue
+            if queue.full():
+                while not queue.empty():
+                    queue.get_nowait()
+                    subscriber.dropped += 1
+                queue.put_nowait(self._snapshot())
+            else:
+                queue.put_nowait(frame)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Broadcast tick failed: {e}")
+            await asyncio.sleep(self.interval)
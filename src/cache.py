@@ -0,0 +1,312 @@
+import asyncio
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, Optional, Callable, Awaitable, Iterable, Hashable, Set, Tuple
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Regions used by the assistant; anything in config['cache']['regions'] overrides these
+DEFAULT_REGIONS: Dict[str, Dict[str, Any]] = {
+    "config": {"maxsize": 16, "ttl": 300},
+    "freqtrade": {"maxsize": 256, "ttl": 2},
+    "predictions": {"maxsize": 256, "ttl": 5},
+    "screener": {"maxsize": 32, "ttl": 3600},
+    "llm": {"maxsize": 1000, "ttl": 3600, "persist": True},
+}
+
+
+def make_key(*parts: Any) -> str:
+    """Stable string key for arbitrary JSON-serialisable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class RegionStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    load_errors: int = 0
+    coalesced: int = 0
+    sets: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+@dataclass
+class CacheRegion:
+    name: str
+    maxsize: int = 256
+    ttl: float = 60.0
+    persist: bool = False
+    memory: TTLCache = field(init=False, repr=False)
+    stats: RegionStats = field(default_factory=RegionStats)
+
+    def __post_init__(self):
+        self.memory = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+
+
+class _DiskTier:
+    """Pickled entries in one SQLite table, shared by all persistent regions"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    region TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    tags TEXT NOT NULL DEFAULT '',
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (region, key)
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries (expires_at)")
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+
+    def get(self, region: str, key: str) -> Tuple[Any, Tuple[str, ...], float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, tags, expires_at FROM cache_entries WHERE region = ? AND key = ? AND expires_at >= ?",
+                (region, key, time.time())).fetchone()
+        if row is None:
+            return _MISSING, (), 0.0
+        return pickle.loads(row[0]), tuple(t for t in row[1].split(",") if t), row[2]
+
+    def set(self, region: str, key: str, value: Any, tags: Iterable[str], ttl: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (region, key, value, tags, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (region, key, blob, ",".join(tags), time.time() + ttl))
+
+    def delete(self, region: str, key: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            if key is None:
+                self._conn.execute("DELETE FROM cache_entries WHERE region = ?", (region,))
+            else:
+                self._conn.execute("DELETE FROM cache_entries WHERE region = ? AND key = ?", (region, key))
+
+    def delete_tag(self, tag: str) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM cache_entries WHERE ',' || tags || ',' LIKE ?", (f"%,{tag},%",)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CacheManager:
+    """
+    Cache subsystem shared by the assistant's read paths.
+
+    Each named region has its own size/TTL policy and statistics. Lookups
+    hit an in-memory ``TTLCache`` first and, for regions marked ``persist``,
+    fall back to a SQLite tier that survives restarts. ``get_or_load``
+    coalesces concurrent misses for the same key into one loader call, and
+    entries can carry tags so related keys are invalidated together.
+    """
+
+    def __init__(self, regions: Optional[Dict[str, Dict[str, Any]]] = None, disk_path: Optional[str] = None):
+        self.regions: Dict[str, CacheRegion] = {}
+        self._lock = threading.RLock()
+        self._tags: Dict[str, Set[Tuple[str, Hashable]]] = {}
+        self._tag_refs = 0
+        self._inflight: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self._disk = _DiskTier(disk_path) if disk_path else None
+        for name, policy in {**DEFAULT_REGIONS, **(regions or {})}.items():
+            self.region(name, **policy)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "CacheManager":
+        cache_config = config.get("cache", {})
+        return cls(cache_config.get("regions"), cache_config.get("disk_path"))
+
+    def region(self, name: str, maxsize: int = 256, ttl: float = 60.0, persist: bool = False) -> CacheRegion:
+        """Create a region (or return the existing one with that name)"""
+        with self._lock:
+            if name not in self.regions:
+                self.regions[name] = CacheRegion(name, maxsize, ttl, persist)
+            return self.regions[name]
+
+    def _region(self, name: str) -> CacheRegion:
+        region = self.regions.get(name)
+        if region is None:
+            raise KeyError(f"Unknown cache region: {name}")
+        return region
+
+    def get(self, region_name: str, key: Hashable, default: Any = None) -> Any:
+        value = self._lookup(self._region(region_name), key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, region: CacheRegion, key: Hashable) -> Any:
+        with self._lock:
+            value = region.memory.get(key, _MISSING)
+            if value is not _MISSING:
+                region.stats.hits += 1
+                return value
+        if region.persist and self._disk is not None:
+            value, tags, _ = self._disk.get(region.name, str(key))
+            if value is not _MISSING:
+                with self._lock:
+                    region.stats.disk_hits += 1
+                    region.memory[key] = value
+                    self._index_tags(region.name, key, tags)
+                return value
+        with self._lock:
+            region.stats.misses += 1
+        return _MISSING
+
+    def set(self, region_name: str, key: Hashable, value: Any, tags: Iterable[str] = ()) -> None:
+        region = self._region(region_name)
+        tags = tuple(tags)
+        with self._lock:
+            region.memory[key] = value
+            region.stats.sets += 1
+            if tags:
+                self._index_tags(region.name, key, tags)
+                self._tag_refs += len(tags)
+                if self._tag_refs > 4 * sum(r.maxsize for r in self.regions.values()):
+                    self._prune_tags()
+                    self._tag_refs = sum(len(refs) for refs in self._tags.values())
+        if region.persist and self._disk is not None:
+            try:
+                self._disk.set(region.name, str(key), value, tags, region.ttl)
+            except (pickle.PicklingError, TypeError, AttributeError, sqlite3.Error) as e:
+                logger.warning(f"Cache region {region.name}: not persisting {key!r}: {e}")
+
+    def _index_tags(self, region_name: str, key: Hashable, tags: Tuple[str, ...]) -> None:
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add((region_name, key))
+
+    def get_or_compute(self, region_name: str, key: Hashable, compute: Callable[[], Any],
+                       tags: Iterable[str] = ()) -> Any:
+        """Synchronous read-through for cheap loaders; ``None`` results are not cached"""
+        region = self._region(region_name)
+        value = self._lookup(region, key)
+        if value is not _MISSING:
+            return value
+        region.stats.loads += 1
+        value = compute()
+        if value is not None:
+            self.set(region_name, key, value, tags)
+        return value
+
+    async def get_or_load(self, region_name: str, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                          tags: Iterable[str] = ()) -> Any:
+        """
+        Read-through for async loaders. Concurrent misses for the same key
+        share a single ``loader()`` call; loader errors propagate to every
+        waiter and are not cached. If the caller running the loader is
+        cancelled, one of the waiters takes over the load.
+        """
+        region = self._region(region_name)
+        flight_key = (region_name, key)
+        while True:
+            value = self._lookup(region, key)
+            if value is not _MISSING:
+                return value
+
+            pending = self._inflight.get(flight_key)
+            if pending is None:
+                break
+            region.stats.coalesced += 1
+            value = await asyncio.shield(pending)
+            if value is not _MISSING:  # _MISSING: the loading caller was cancelled, retry
+                return value
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        region.stats.loads += 1
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            self._inflight.pop(flight_key, None)
+            future.set_result(_MISSING)
+            raise
+        except Exception as e:
+            region.stats.load_errors += 1
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; silence "never retrieved"
+            raise
+        else:
+            if value is not None:
+                self.set(region_name, key, value, tags)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(flight_key) is future:
+                del self._inflight[flight_key]
+
+    def invalidate(self, region_name: str, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or the whole region when ``key`` is omitted"""
+        region = self._region(region_name)
+        with self._lock:
+            if key is None:
+                region.memory.clear()
+            else:
+                region.memory.pop(key, None)
+            region.stats.invalidations += 1
+        if region.persist and self._disk is not None:
+            self._disk.delete(region.name, None if key is None else str(key))
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry tagged ``tag`` in all regions; returns the number removed"""
+        removed = 0
+        with self._lock:
+            for region_name, key in self._tags.pop(tag, set()):
+                region = self.regions.get(region_name)
+                if region is not None and region.memory.pop(key, _MISSING) is not _MISSING:
+                    region.stats.invalidations += 1
+                    removed += 1
+        if self._disk is not None:
+            removed += self._disk.delete_tag(tag)
+        return removed
+
+    def _prune_tags(self) -> None:
+        # Entries that expired or were evicted leave stale references behind
+        self._tags = {
+            tag: live for tag, live in (
+                (tag, {(name, key) for name, key in refs if key in self.regions[name].memory})
+                for tag, refs in self._tags.items()
+            ) if live
+        }
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "size": len(region.memory), "maxsize": region.maxsize, "ttl": region.ttl,
+                    "persist": region.persist, "hit_rate": round(region.stats.hit_rate, 4),
+                    **asdict(region.stats),
+                }
+                for name, region in self.regions.items()
+            }
+
+    def total_entries(self) -> int:
+        with self._lock:
+            return sum(len(region.memory) for region in self.regions.values())
+
+    def close(self) -> None:
+        if self._disk is not None:
+            self._disk.close()
+            self._disk = None
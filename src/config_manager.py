@@ -1,17 +1,72 @@
+import asyncio
 import logging
-from anthropic import Anthropic
 import json
 import os
 import re
-from typing import Dict, Any, Optional, Union
+import tempfile
+from typing import Dict, Any, Optional, Union, Callable
+from .cache import CacheManager
+from .shared_state import file_lock
 
 logger = logging.getLogger(__name__)
 
+def _write_private(path: str, text: str) -> None:
+    """Atomically replace ``path`` through a temp file in the same directory, keeping it 0600"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                     prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file 0600, which the config (API keys) and its backup need
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+def _replace_config(path: str, config: Dict[str, Any]) -> None:
+    """Back up ``path`` and swap in ``config``"""
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            _write_private(f"{path}.backup", f.read())
+    _write_private(path, json.dumps(config, indent=4))
+
+def merge_config(config: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply ``changes`` to ``config`` in place, merging nested sections key by key"""
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            merge_config(config[key], value)
+        else:
+            config[key] = value
+    return config
+
+def update_config_file(path: str, update: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Read-modify-write ``path`` under a lock shared by every worker and
+    thread (``<path>.lock``), replacing the file atomically so readers
+    never see a partial or missing config. Returns the written config.
+    """
+    with file_lock(f"{path}.lock"):
+        with open(path, 'r') as f:
+            config = update(json.load(f))
+        _replace_config(path, config)
+        return config
+
+def write_config_file(path: str, config: Dict[str, Any]) -> None:
+    """Replace ``path`` with ``config`` under the same lock as ``update_config_file``"""
+    with file_lock(f"{path}.lock"):
+        _replace_config(path, config)
+
 class FreqtradeConfigManager:
-    def __init__(self, api_key: str, config_path: str = "config.json"):
+    def __init__(self, api_key: str, config_path: str = "config.json", cache: Optional[CacheManager] = None,
+                 llm: Optional[Any] = None):
         self.api_key = api_key
+        self.cache = cache
         self.config_path = config_path
-        self.claude = Anthropic(api_key=api_key)
+        # Anything with ``async complete(messages) -> str``; the Claude controller
+        # provides retries, hedging, model fallback and call metrics
+        self.llm = llm
         self.config_path = os.path.abspath(config_path)
         self.config = None
         
@@ -19,11 +74,18 @@ class FreqtradeConfigManager:
         os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
 
     def read_config(self) -> Optional[Dict[str, Any]]:
-        """Reads the configuration file."""
+        """Reads the configuration file. The result is shared; copy it before mutating."""
         try:
-            with open(self.config_path, 'r') as f:
-                self.config = json.load(f)
+            if self.cache is None:
+                self.config = self._load_config()
                 return self.config
+            # Keyed on mtime and size so edits made outside the assistant are picked up
+            stat = os.stat(self.config_path)
+            self.config = self.cache.get_or_compute(
+                "config", (self.config_path, stat.st_mtime_ns, stat.st_size), self._load_config,
+                tags=(f"config:{self.config_path}",)
+            )
+            return self.config
         except FileNotFoundError:
             logger.error(f"Config file not found at {self.config_path}")
             return None
@@ -34,25 +96,23 @@ class FreqtradeConfigManager:
             logger.error(f"Error reading config file: {e}")
             return None
 
+    def _load_config(self) -> Dict[str, Any]:
+        with open(self.config_path, 'r') as f:
+            return json.load(f)
+
     def write_config(self, config: Dict[str, Any]) -> bool:
-        """Writes the configuration file, creating a backup."""
+        """Writes the configuration file atomically, creating a backup."""
         if config is None:
             logger.error("Cannot write None to config file.")
             return False
 
-        backup_path = f"{self.config_path}.backup"
+        if self.cache is not None:
+            self.cache.invalidate_tag(f"config:{self.config_path}")
         try:
-            if os.path.exists(self.config_path):
-                os.replace(self.config_path, backup_path)
-
-            with open(self.config_path, 'w') as f:
-                json.dump(config, f, indent=4)
-            os.chmod(self.config_path, 0o600)  # Secure file permissions
+            write_config_file(self.config_path, config)
             return True
         except Exception as e:
             logger.error(f"Error writing config file: {e}")
-            if os.path.exists(backup_path):
-                os.replace(backup_path, self.config_path)
             return False
 
     def validate_config(self, config: Dict[str, Any]) -> bool:
@@ -95,17 +155,26 @@ class FreqtradeConfigManager:
             logger.error(f"Config validation error: {e}")
             return None
 
+    def apply_changes(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge ``changes`` into the config file under the cross-worker lock; returns the new config"""
+        if self.cache is not None:
+            self.cache.invalidate_tag(f"config:{self.config_path}")
+        return update_config_file(self.config_path, lambda current: merge_config(current, changes))
+
     async def update_config(self, request: str) -> Union[str, Dict[str, Any]]:
         """Updates the configuration based on a user request."""
         current_config = self.read_config()
         if current_config is None:
             return "Error: Could not read current configuration."
 
-        claude_config = current_config.get('claude_integration', {})
-        
+        if self.llm is None:
+            return "Error: No LLM client configured."
+
+        # Only the changes come back: they are merged into the file as it is
+        # when written, so updates made while the model answers are kept
         prompt = f"""
         Update the configuration based on the user's request.
-        Provide ONLY the modified JSON configuration.
+        Provide ONLY a JSON object with the keys that change (nested sections may be partial).
 
         Current config:
         ```json
@@ -115,32 +184,22 @@ class FreqtradeConfigManager:
         User request: {request}
         """
         try:
-            response = await self.claude.messages.create(
-                model=claude_config.get('model_version', 'claude-3-5-sonnet-20241022'),
-                max_tokens=claude_config.get('max_tokens', 4096),
-                temperature=claude_config.get('temperature', 0.7),
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            response_text = response.content[0].text
-            match = re.search(r"``[json\n(.*)\n](http://_vscodecontentref_/1)``", response_text, re.DOTALL)
+            response_text = await self.llm.complete([{"role": "user", "content": prompt}])
+            match = re.search(r"```(?:json)?\s*\n(.*?)\n```", response_text, re.DOTALL)
             if match:
                 json_string = match.group(1)
             else:
                 json_string = response_text
 
             try:
-                new_config = json.loads(json_string)
-                if not isinstance(new_config, dict):
+                changes = json.loads(json_string)
+                if not isinstance(changes, dict):
                     logger.error("Invalid configuration format received")
                     return "Error: Invalid configuration format."
 
-                if self.write_config(new_config):
-                    logger.info("Configuration updated successfully")
-                    return "Config updated successfully."
-                else:
-                    logger.error("Failed to write updated configuration")
-                    return "Error: Failed to write updated configuration."
+                await asyncio.to_thread(self.apply_changes, changes)
+                logger.info("Configuration updated successfully")
+                return "Config updated successfully."
 
             except json.JSONDecodeError as e:
                 logger.error(f"Error parsing configuration: {e}")
@@ -152,13 +211,13 @@ class FreqtradeConfigManager:
 
     async def update_freqai_config(self, params: Dict[str, Any]) -> str:
         """Updates the FreqAI section of the configuration file."""
-        config = self.read_config()
-        if config:
-            try:
-                config['freqai'] = params
-                if self.write_config(config):
-                    return "FreqAI configuration updated successfully."
-                return "Error writing configuration."
-            except Exception as e:
-                return f"Error updating config: {e}"
-        return "Configuration not loaded."
\ No newline at end of file
+        if self.cache is not None:
+            self.cache.invalidate_tag(f"config:{self.config_path}")
+        try:
+            await asyncio.to_thread(update_config_file, self.config_path,
+                                    lambda current: {**current, 'freqai': params})
+            return "FreqAI configuration updated successfully."
+        except FileNotFoundError:
+            return "Configuration not loaded."
+        except Exception as e:
+            return f"Error updating config: {e}"
@@ -1,11 +1,20 @@
+import asyncio
 import logging
 import json
-import os
+import time
 from typing import Dict, Any, Optional
-from anthropic import Anthropic
+from ..strategy_validator import extract_code, validate_strategy
+from ..cache import CacheManager, make_key
+from ..config_manager import update_config_file
+from ..resilience import ResilientCaller
+from ..semantic_cache import SemanticCache
+from ..shared_state import SessionStore
+from ..strategy_library import StrategyLibrary
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SESSION = "default"
+
 class APIError(Exception):
     """Custom exception for API related errors"""
     pass
@@ -38,6 +47,21 @@ class ClaudeFreqAIController:
     Return ONLY valid JSON for config changes.
     """
 
+    # Handlers whose answers only depend on the request text; never config or bot control
+    SEMANTIC_CACHEABLE = ("strategy", "backtest")
+    # Messages (user and assistant) kept per session
+    HISTORY_LIMIT = 40
+
+    MARKET_TEMPLATE = """
+    Answer this market question using ONLY the screener results below:
+    {request}
+
+    Screener results (computed from local candle data):
+    {summary}
+
+    Name specific pairs and the numbers behind each point. Do not invent prices.
+    """
+
     BACKTEST_TEMPLATE = """
     Convert this backtest request into FreqTrade CLI arguments:
     {request}
@@ -45,9 +69,21 @@ class ClaudeFreqAIController:
     Return ONLY the argument string.
     """
 
-    def __init__(self, config: Dict[str, Any], client: Anthropic):
+    def __init__(self, config: Dict[str, Any], client: "anthropic.Anthropic", monitoring: Optional[Any] = None,
+                 cache: Optional[CacheManager] = None, resilience: Optional[ResilientCaller] = None,
+                 recovery: Optional[Any] = None, screener: Optional[Any] = None,
+                 sessions: Optional[SessionStore] = None, library: Optional[StrategyLibrary] = None):
         self.config = config
         self.client = client
+        self.monitoring = monitoring
+        self.cache = cache
+        self.recovery = recovery
+        self.screener = screener
+        # Shared across server workers when set; otherwise kept in this process
+        self.sessions = sessions
+        self._histories: Dict[str, list] = {}
+        # Valid generated strategies are deduplicated and stored here
+        self.library = library
 
         # Initialize with system prompt
         self.system_prompt = """You are an AI assistant specialized in managing and optimizing the FreqTrade cryptocurrency trading bot platform. Your core function is to serve as an intelligent interface between users and the FreqTrade system, translating natural language requests into concrete actions and providing expert guidance on trading strategies, configuration, and system management."""
@@ -56,52 +92,134 @@ class ClaudeFreqAIController:
         self.model_version = config['claude_integration'].get('model_version', "claude-3-5-sonnet-latest")
         self.max_tokens = config['claude_integration'].get('max_tokens', 8192)
         self.temperature = config['claude_integration'].get('temperature', 1)
+        # Identical prompts only give identical answers at temperature 0
+        self.cache_responses = config['claude_integration'].get('cache_responses', self.temperature == 0)
+        # Breakers, hedging and fallback tiers (claude_integration.fallback_models / .resilience)
+        self.resilience = resilience or ResilientCaller.from_config(self.model_version, config['claude_integration'])
+        # Serves answers to near-identical rephrasings (claude_integration.semantic_cache)
+        self.semantic_cache = SemanticCache.from_config(config['claude_integration'].get('semantic_cache', {}))
 
         self.base_config_path = "config.json"
-        self.conversation_history = []
         self.current_metrics = {"accuracy": 0.0, "loss": 0.0}
 
     async def _call_claude_api(self, messages: list) -> str:
+        if self.cache is None or not self.cache_responses:
+            return await self._request_completion(messages)
+        key = make_key(self.model_version, self.max_tokens, self.temperature, self.system_prompt, messages)
+        return await self.cache.get_or_load("llm", key, lambda: self._request_completion(messages),
+                                            tags=(f"model:{self.model_version}",))
+
+    async def complete(self, messages: list) -> str:
+        """Completion for other components, with the same caching and failover"""
+        return await self._call_claude_api(messages)
+
+    async def _request_completion(self, messages: list) -> str:
+        try:
+            return await self.resilience.call(lambda model: self._create(model, messages))
+        except Exception as e:
+            logger.error(f"Claude API call failed: {str(e)}", exc_info=True)
+            raise
+
+    async def _create(self, model: str, messages: list) -> str:
+        started = time.perf_counter()
         try:
             response = await self.client.messages.create(
-                model=self.model_version,
+                model=model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
                 system=self.system_prompt,
                 messages=messages
             )
-            return response.content[0].text
-        except Exception as e:
-            logger.error(f"Claude API call failed: {str(e)}", exc_info=True)
+        except asyncio.CancelledError:
+            # A hedge loser or an abandoned request, not a failed call
+            raise
+        except Exception:
+            self._record_call(model, started, False)
             raise
+        self._record_call(model, started, True)
+        return response.content[0].text
 
-    async def handle_command(self, user_input: str) -> str:
+    def _record_call(self, model: str, started: float, success: bool) -> None:
+        if self.monitoring is not None:
+            self.monitoring.record_llm_call(model, time.perf_counter() - started, success)
+
+    async def handle_command(self, user_input: str, session_id: str = DEFAULT_SESSION) -> str:
         """
         Process natural language commands and convert to FreqTrade actions
         """
+        response = await self._handle_command(user_input)
+        await self._remember(session_id, user_input, response)
+        return response
+
+    @property
+    def conversation_history(self) -> list:
+        """History of the default session in this process (see ``history`` for shared sessions)"""
+        return list(self._histories.get(DEFAULT_SESSION, []))
+
+    async def history(self, session_id: str = DEFAULT_SESSION) -> list:
+        if self.sessions is None:
+            return list(self._histories.get(session_id, []))
+        data = await asyncio.to_thread(self.sessions.get, self._session_key(session_id))
+        return (data or {}).get("history", [])
+
+    @staticmethod
+    def _session_key(session_id: str) -> str:
+        return f"claude:{session_id}"
+
+    async def _remember(self, session_id: str, user_input: str, response: str) -> None:
+        exchange = [{"role": "user", "content": user_input}, {"role": "assistant", "content": response}]
+        if self.sessions is None:
+            history = self._histories.get(session_id, []) + exchange
+            self._histories[session_id] = history[-self.HISTORY_LIMIT:]
+            return
         try:
-            logger.info(f"Processing command: {user_input}")
+            history = await self.history(session_id) + exchange
+            await asyncio.to_thread(self.sessions.update, self._session_key(session_id),
+                                    {"history": history[-self.HISTORY_LIMIT:]})
+        except Exception as e:
+            logger.warning(f"Could not store conversation history: {e}")
+
+    async def _handle_command(self, user_input: str) -> str:
+        try:
+            # Full input can be long and sensitive; keep it out of INFO logs
+            logger.info(f"Processing command ({len(user_input)} chars)")
+            logger.debug(f"Command input: {user_input}")
             response = await self._call_claude_api([{
                 "role": "user", 
                 "content": f"Convert this FreqTrade command to specific action: {user_input}"
             }])
             
             command_type = self._parse_command_type(response)
+            # A rephrasing only shares an answer with requests of the same kind
+            cache_namespace = f"{self.model_version}:{command_type}"
+            if command_type in self.SEMANTIC_CACHEABLE:
+                cached = self.semantic_cache.lookup(cache_namespace, user_input)
+                if cached is not None:
+                    logger.info(f"Semantic cache hit (similarity {cached[1]:.2f})")
+                    return cached[0]
             
             handlers = {
                 "modify_config": self._handle_config_modification,
                 "strategy": self._handle_strategy_command,
                 "backtest": self._handle_backtest,
+                "market_analysis": self._handle_market_analysis,
                 "bot_control": self._handle_bot_control
             }
             
             handler = handlers.get(command_type)
             if handler:
-                return await handler(user_input)
+                result = await handler(user_input)
+                if command_type in self.SEMANTIC_CACHEABLE and not result.startswith("Error"):
+                    self.semantic_cache.store(cache_namespace, user_input, result)
+                return result
             return f"Unsupported command type: {command_type}"
                 
         except Exception as e:
             logger.error(f"Command failed: {str(e)}", exc_info=True)
+            if self.recovery is not None:
+                fallback = await self.recovery.handle_error(e, {"component": "claude_controller"})
+                if fallback is not None:
+                    return fallback
             return f"Error processing command: {str(e)}"
 
     async def _handle_config_modification(self, user_input: str) -> str:
@@ -112,18 +230,12 @@ class ClaudeFreqAIController:
             }])
             
             config_changes = json.loads(response)
-            
-            with open(self.base_config_path, 'r') as f:
-                current_config = json.load(f)
-                
-            self._update_nested_dict(current_config, config_changes)
-            
-            backup_path = f"{self.base_config_path}.backup"
-            os.rename(self.base_config_path, backup_path)
-            
-            with open(self.base_config_path, 'w') as f:
-                json.dump(current_config, f, indent=4)
-                
+
+            # Locked across workers and replaced atomically, so concurrent
+            # updates neither lose changes nor see a missing file
+            await asyncio.to_thread(update_config_file, self.base_config_path,
+                                    lambda current: self._update_nested_dict(current, config_changes))
+
             return "Configuration updated successfully"
             
         except Exception as e:
@@ -136,7 +248,13 @@ class ClaudeFreqAIController:
                 "role": "user",
                 "content": f"Create a FreqTrade strategy based on this description: {user_input}"
             }])
-            return response
+            code = extract_code(response)
+            result = validate_strategy(code)
+            if not result.valid:
+                logger.warning(f"Generated strategy failed validation: {[str(i) for i in result.errors]}")
+            elif self.library is not None:
+                return f"{response}\n\n{result.summary()}\n{await self.library.save_generated(code, user_input)}"
+            return f"{response}\n\n{result.summary()}"
         except Exception as e:
             logger.error(f"Strategy command failed: {str(e)}", exc_info=True)
             return f"Error processing strategy command: {str(e)}"
@@ -152,6 +270,23 @@ class ClaudeFreqAIController:
             logger.error(f"Backtest command failed: {str(e)}", exc_info=True)
             return f"Error processing backtest command: {str(e)}"
 
+    async def analyze_market(self, question: str) -> str:
+        """Answer ``question`` from the screener's precomputed summary rather than model recall"""
+        if self.screener is None:
+            return "Market screener is not configured"
+        summary = await asyncio.to_thread(self.screener.summary)
+        return await self._call_claude_api([{
+            "role": "user",
+            "content": self.MARKET_TEMPLATE.format(request=question, summary=summary)
+        }])
+
+    async def _handle_market_analysis(self, user_input: str) -> str:
+        try:
+            return await self.analyze_market(user_input)
+        except Exception as e:
+            logger.error(f"Market analysis failed: {str(e)}", exc_info=True)
+            return f"Error processing market analysis: {str(e)}"
+
     async def _handle_bot_control(self, user_input: str) -> str:
         try:
             response = await self._call_claude_api([{
@@ -179,12 +314,16 @@ class ClaudeFreqAIController:
             return "strategy"
         elif "backtest" in claude_response.lower():
             return "backtest"
+        elif "market" in claude_response.lower():
+            return "market_analysis"
         elif any(cmd in claude_response.lower() for cmd in ["start", "stop", "status"]):
             return "bot_control"
         return "unknown"
 
-    async def clear_history(self) -> None:
-        self.conversation_history = []
+    async def clear_history(self, session_id: str = DEFAULT_SESSION) -> None:
+        self._histories.pop(session_id, None)
+        if self.sessions is not None:
+            await asyncio.to_thread(self.sessions.delete, self._session_key(session_id))
 
     def get_current_accuracy(self) -> float:
         return self.current_metrics["accuracy"]
@@ -1,26 +1,32 @@
-from typing import Callable, Dict, Type, Any
+from typing import Callable, Dict, Type, Any, Optional
 import logging
+import time
 import traceback
+from .resilience import CircuitOpenError
 
-class ErrorRecoveryManager:
-    def __init__(self, state_manager=None):
-        pass
-
-    async def handle_error(self, error, context):
-        pass
+logger = logging.getLogger(__name__)
 
 class ErrorHandler:
     """Centralized error handling and recovery"""
     def __init__(self):
-        pass
+        self.handlers: Dict[Type[Exception], Callable] = {}
+        self.logger = logger
 
     def register(self, exception_type: Type[Exception], handler: Callable):
         """Register an error handler for a specific exception type"""
         self.handlers[exception_type] = handler
 
+    def find_handler(self, error: Exception) -> Optional[Callable]:
+        """Most specific registered handler for ``error``, following its MRO"""
+        for cls in type(error).__mro__:
+            handler = self.handlers.get(cls)
+            if handler is not None:
+                return handler
+        return None
+
     async def handle(self, error: Exception, context: Dict[str, Any] = None) -> Any:
         """Handle an error using registered handlers"""
-        handler = self.handlers.get(type(error))
+        handler = self.find_handler(error)
         if handler:
             try:
                 return await handler(error, context)
@@ -29,4 +35,36 @@ class ErrorHandler:
                 raise
         else:
             self.logger.error(f"Unhandled error: {error}\n{traceback.format_exc()}")
-            raise
\ No newline at end of file
+            raise error
+
+class ErrorRecoveryManager:
+    """
+    Turns failures into user-facing fallbacks and keeps per-component
+    error counts. Returns ``None`` when there is no recovery, so the
+    caller keeps its own error message.
+    """
+    def __init__(self, state_manager=None):
+        self.state_manager = state_manager
+        self.handler = ErrorHandler()
+        self.error_counts: Dict[str, int] = {}
+        self.last_error: Dict[str, Dict[str, Any]] = {}
+        self.handler.register(CircuitOpenError, self._degraded)
+
+    async def _degraded(self, error: Exception, context: Dict[str, Any]) -> str:
+        return ("Claude is temporarily unavailable (all model tiers are failing). "
+                "Please retry in a minute.")
+
+    async def handle_error(self, error: Exception, context: Optional[Dict[str, Any]] = None) -> Optional[Any]:
+        context = context or {}
+        component = context.get("component", "unknown")
+        self.error_counts[component] = self.error_counts.get(component, 0) + 1
+        self.last_error[component] = {"type": type(error).__name__, "message": str(error), "at": time.time()}
+        if self.handler.find_handler(error) is None:
+            return None
+        try:
+            return await self.handler.handle(error, context)
+        except Exception:
+            return None
+
+    def summary(self) -> Dict[str, Any]:
+        return {"error_counts": dict(self.error_counts), "last_error": dict(self.last_error)}
@@ -1,27 +1,42 @@
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, List
 from .controllers.claude_controller import ClaudeFreqAIController
+from .metrics_tracker import PerformanceTracker
+from .timeseries_store import MetricsTimeSeriesStore
+from .monitoring import MonitoringSystem
+from .cache import CacheManager
 
 logger = logging.getLogger(__name__)
 
-class MonitoringSystem:
-    def __init__(self):
-        pass
-        
-    async def collect_metrics(self):
-        pass
+# Trade-derived only: nothing feeds resolved FreqAI predictions yet, so
+# prediction accuracy/loss would always read 0
+HISTORY_METRICS = ("sharpe_ratio", "profit_factor")
 
 class FreqAIIntegration:
     """
     Integration layer between FreqTrade's FreqAI and Claude AI.
     Handles command processing and metric tracking.
     """
-    def __init__(self, config: Dict[str, Any], client: Any):
+    def __init__(self, config: Dict[str, Any], client: Any,
+                 monitoring_system: Optional[MonitoringSystem] = None,
+                 cache: Optional[CacheManager] = None,
+                 claude_controller: Optional[ClaudeFreqAIController] = None):
         self.config = config
         self.client = client
-        self.claude_controller = ClaudeFreqAIController(config, client)
         self.metrics_cache: Dict[str, float] = {}
-        self.monitoring_system = MonitoringSystem()
+        self.monitoring_system = monitoring_system or MonitoringSystem()
+        # Share the app's controller so both paths use the same breakers and budgets
+        self.claude_controller = claude_controller or ClaudeFreqAIController(
+            config, client, self.monitoring_system, cache)
+        metrics_config = config.get('metrics', {})
+        self.performance = PerformanceTracker(
+            window=metrics_config.get('rolling_window', 500),
+            annualization=metrics_config.get('sharpe_annualization', 1.0)
+        )
+        self.metrics_history = MetricsTimeSeriesStore()
+        self._history_ts = 0.0
+        self.monitoring_system.register_source("freqai", self.performance.snapshot)
         
     async def handle_command(self, command: str) -> str:
         """
@@ -32,58 +47,64 @@ class FreqAIIntegration:
             Response from Claude controller
         """
         try:
-            logger.info(f"Processing command: {command}")
+            logger.info(f"Processing command ({len(command)} chars)")
             return await self.claude_controller.handle_command(command)
         except Exception as e:
             logger.error(f"Error handling command: {str(e)}")
             return f"Error processing command: {str(e)}"
         
-    def get_current_metrics(self) -> Dict[str, float]:
+    def record_trade(self, profit_ratio: float, pair: Optional[str] = None, ts: Optional[float] = None,
+                     history: bool = True) -> None:
+        """
+        Feed a closed trade's profit ratio into the running metrics. ``ts``
+        (epoch seconds, default now) stamps the history sample; replayed
+        trades pass ``history=False`` so old trades don't land in one burst.
+        """
+        self.performance.record_trade(profit_ratio, pair)
+        if history:
+            self._record_history(ts)
+
+    def _record_history(self, ts: Optional[float] = None) -> None:
+        snapshot = self.performance.snapshot()
+        # The tiers aggregate in time order; a late sample joins the latest bucket
+        ts = max(time.time() if ts is None else ts, self._history_ts)
+        self._history_ts = ts
+        self.metrics_history.append_many({name: snapshot[name] for name in HISTORY_METRICS}, ts)
+
+    def get_metrics_history(self, start: Optional[float] = None, end: Optional[float] = None,
+                            points: int = 300) -> List[Dict[str, Any]]:
+        """Downsampled metric history for charting"""
+        try:
+            return self.metrics_history.query_frame(HISTORY_METRICS, start, end, points)
+        except Exception as e:
+            logger.error(f"Error getting metrics history: {str(e)}")
+            return []
+
+    def get_current_metrics(self, pair: Optional[str] = None) -> Dict[str, float]:
         """Get current model performance metrics"""
         try:
+            snapshot = self.performance.snapshot(pair)
             self.metrics_cache = {
-                "accuracy": self._get_current_accuracy(),
-                "loss": self._get_current_loss(),
-                "sharpe_ratio": self._get_sharpe_ratio(),
-                "profit_factor": self._get_profit_factor()
+                "sharpe_ratio": self._get_sharpe_ratio(snapshot),
+                "profit_factor": self._get_profit_factor(snapshot)
             }
             return self.metrics_cache
         except Exception as e:
             logger.error(f"Error getting metrics: {str(e)}")
             return self.metrics_cache or {"error": 1.0}
         
-    def _get_current_accuracy(self) -> float:
-        """Calculate current model accuracy"""
+    def _get_sharpe_ratio(self, snapshot: Dict[str, float]) -> float:
+        """Per-trade Sharpe ratio from the running mean/variance of returns"""
         try:
-            # Implement actual accuracy calculation here
-            return 0.85
-        except Exception as e:
-            logger.error(f"Error calculating accuracy: {str(e)}")
-            return 0.0
-        
-    def _get_current_loss(self) -> float:
-        """Calculate current model loss"""
-        try:
-            # Implement actual loss calculation here
-            return 0.15
-        except Exception as e:
-            logger.error(f"Error calculating loss: {str(e)}")
-            return 1.0
-
-    def _get_sharpe_ratio(self) -> float:
-        """Calculate Sharpe ratio"""
-        try:
-            # Implement Sharpe ratio calculation
-            return 1.5
+            return snapshot.get("sharpe_ratio", 0.0)
         except Exception as e:
             logger.error(f"Error calculating Sharpe ratio: {str(e)}")
             return 0.0
 
-    def _get_profit_factor(self) -> float:
-        """Calculate profit factor"""
+    def _get_profit_factor(self, snapshot: Dict[str, float]) -> float:
+        """Gross profit over gross loss of closed trades"""
         try:
-            # Implement profit factor calculation
-            return 1.25
+            return snapshot.get("profit_factor", 0.0)
         except Exception as e:
             logger.error(f"Error calculating profit factor: {str(e)}")
-            return 0.0
\ No newline at end of file
+            return 0.0
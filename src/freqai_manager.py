@@ -1,11 +1,16 @@
 import logging
-from anthropic import Anthropic
 import json
 import time
 import asyncio
 import re
 from typing import Dict, Any, Union, Optional
-import pandas as pd
+from .strategy_validator import extract_code, validate_strategy
+from .cache import CacheManager
+from .backtest_store import BacktestStore
+from .strategy_library import StrategyLibrary
+from .startup import lazy_import
+
+pd = lazy_import("pandas")
 
 logger = logging.getLogger(__name__)
 
@@ -14,19 +19,24 @@ class ModelManager:
         pass
 
 class FreqAIManager:
-    def __init__(self):
-        pass
+    def __init__(self, cache: Optional[CacheManager] = None, llm: Optional[Any] = None,
+                 results_store: Optional[BacktestStore] = None, library: Optional[StrategyLibrary] = None):
+        self.cache = cache
+        # Anything with ``async complete(messages) -> str``; the Claude controller
+        # provides retries, hedging and model fallback
+        self.llm = llm
+        self.results_store = results_store
+        # Generated strategies and their backtest metrics (for /api/strategies/top)
+        self.library = library
+
+    async def _complete(self, prompt: str) -> str:
+        if self.llm is None:
+            raise RuntimeError("No LLM client configured")
+        return await self.llm.complete([{"role": "user", "content": prompt}])
 
     async def optimize_strategy(self, description: str) -> str:
         try:
-            response = await self.claude.messages.create(
-                model="claude-3-5-sonnet-latest",
-                messages=[{
-                    "role": "user",
-                    "content": f"Create a trading strategy for: {description}"
-                }]
-            )
-            return response.content[0].text
+            return await self._complete(f"Create a trading strategy for: {description}")
         except Exception as e:
             return f"Strategy generation error: {e}"
 
@@ -38,13 +48,7 @@ class FreqAIManager:
         Respond with ONLY the JSON for the 'freqai' section of the Freqtrade config.
         """
         try:
-            response = await self.claude.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=4096,
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            response_text = response.content[0].text
+            response_text = await self._complete(prompt)
             match = re.search(r"```json\n(.*)\n```", response_text, re.DOTALL)
             if match:
                 json_string = match.group(1)
@@ -63,7 +67,8 @@ class FreqAIManager:
         except Exception as e:
             return f"Claude error: {e}"
 
-    async def _test_strategy(self, config: Dict[str, Any]) -> Union[str, Dict[str, Any]]:
+    async def _test_strategy(self, config: Dict[str, Any], strategy: str = "FreqAIStrategy"
+                             ) -> Union[str, Dict[str, Any]]:
         """Performs a simulated backtest of the FreqAI strategy."""
         try:
             #  In a real implementation, you'd use Freqtrade's backtesting.
@@ -71,6 +76,12 @@ class FreqAIManager:
             print("Performing simulated backtest...")
             await asyncio.sleep(2)  # Simulate some delay
             simulated_results = {"profit": 0.1}  # Placeholder for actual backtest results
+            if self.results_store is not None:
+                simulated_results["run_id"] = await asyncio.to_thread(
+                    self.results_store.record, strategy, simulated_results, config,
+                    simulated_results.get("trades", ()))
+            if self.library is not None and not await self.library.record_backtest(strategy, simulated_results):
+                logger.debug(f"{strategy} is not in the strategy library; metrics kept in the results store only")
             return simulated_results
         except Exception as e:
             return f"Strategy testing failed: {e}"
@@ -78,6 +89,7 @@ class FreqAIManager:
     async def _refine_strategy(self, config: Dict[str, Any], results: Dict[str, Any], original_description: str) -> Union[str, Dict[str, Any]]:
         """Refines the FreqAI strategy using Claude based on backtest results."""
         if results['profit'] < 0:
+            history = await asyncio.to_thread(self._run_history)
             prompt = f"""
             The FreqAI strategy (description: {original_description}) had negative profit.
 
@@ -91,16 +103,13 @@ class FreqAIManager:
             {json.dumps(results, indent=4)}
             ```
 
+            Earlier runs:
+            {history}
+
             Suggest improvements (ONLY JSON for 'freqai' section of Freqtrade config).
             """
             try:
-                response = await self.claude.messages.create(
-                    model="claude-3-opus-20240229",
-                    max_tokens=4096,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-
-                response_text = response.content[0].text
+                response_text = await self._complete(prompt)
                 match = re.search(r"``[json\n(.*)\n](http://_vscodecontentref_/3)``", response_text, re.DOTALL)
                 if match:
                     json_string = match.group(1)
@@ -124,8 +133,21 @@ class FreqAIManager:
         else:
             return config
 
+    def _run_history(self, limit: int = 10) -> str:
+        if self.results_store is None:
+            return "No recorded backtests."
+        try:
+            return self.results_store.summary(limit=limit)
+        except Exception as e:
+            logger.warning(f"Could not read backtest history: {e}")
+            return "No recorded backtests."
+
     async def get_live_predictions(self) -> Union[str, Dict[str, Any]]:
         """Gets real-time predictions from the FreqAI model."""
+        if self.cache is not None:
+            cached = self.cache.get("predictions", "latest")
+            if cached is not None:
+                return cached
         try:
             predictions_df = self.freqai.predict(pd.DataFrame())
 
@@ -133,7 +155,7 @@ class FreqAIManager:
                 return "No predictions available."
 
             latest_prediction = predictions_df.iloc[-1]
-            return {
+            prediction = {
                 "pair": latest_prediction["pair"],
                 "buy_signal": latest_prediction.get("predicted_buy", 0.0) > 0.7,
                 "sell_signal": latest_prediction.get("predicted_sell", 0.0) > 0.7,
@@ -141,6 +163,9 @@ class FreqAIManager:
                 "confidence_sell": latest_prediction.get("confidence_sell"),
                 "timestamp": time.time(),
             }
+            if self.cache is not None:
+                self.cache.set("predictions", "latest", prediction)
+            return prediction
         except Exception as e:
             return f"Error getting predictions: {e}"
 
@@ -157,14 +182,20 @@ class FreqAIManager:
             Return ONLY valid Python code.
             """
             
-            response = await self.claude.messages.create(
-                model="claude-3-sonnet-20240229",
-                messages=[{"role": "user", "content": template_prompt}]
-            )
-            
-            strategy_code = response.content[0].text
-            return self._process_strategy_code(strategy_code)
+            strategy_code = self._process_strategy_code(await self._complete(template_prompt))
+            if self.library is not None and not strategy_code.startswith("Error"):
+                logger.info(await self.library.save_generated(strategy_code, description))
+            return strategy_code
             
         except Exception as e:
             logger.error(f"Strategy generation failed: {e}")
             return f"Error generating strategy: {e}"
+
+    def _process_strategy_code(self, response_text: str) -> str:
+        """Extracts the strategy code and rejects it if static validation fails."""
+        strategy_code = extract_code(response_text).strip()
+        result = validate_strategy(strategy_code)
+        if not result.valid:
+            logger.warning(f"Rejected generated strategy: {[str(i) for i in result.errors]}")
+            return f"Error: {result.summary()}"
+        return strategy_code
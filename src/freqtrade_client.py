@@ -1,24 +1,156 @@
 # src/freqtrade_client.py
-import aiohttp
+import asyncio
 import json
+import logging
+import random
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+from .startup import lazy_import
+
+aiohttp = lazy_import("aiohttp")
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
 
 class FreqtradeClient:
-    """Handles communication with FreqTrade REST API"""
-    def __init__(self, base_url: str, api_token: str):
-        pass
+    """
+    Handles communication with FreqTrade REST API.
 
-    async def _request(self, method: str, endpoint: str, data: Optional[Dict] = None) -> Dict[str, Any]:
-        url = f"{self.base_url}/{endpoint}"
-        async with aiohttp.ClientSession() as session:
-            async with session.request(method, url, headers=self.headers, json=data) as response:
+    A single pooled ``aiohttp`` session is created lazily and reused for all
+    calls. With ``username``/``password`` the client logs in for a JWT and
+    refreshes it on 401; idempotent requests are retried with jittered
+    exponential backoff on timeouts, connection errors and 429/5xx.
+    """
+    def __init__(self, base_url: str, api_token: Optional[str] = None,
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 timeout: float = 10.0, max_retries: int = 3, backoff: float = 0.2,
+                 pool_size: int = 100, pool_size_per_host: int = 20):
+        self.base_url = base_url.rstrip('/')
+        self.api_token = api_token
+        self.username = username
+        self.password = password
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=min(timeout, 5.0))
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.headers = {'Accept': 'application/json'}
+        if api_token:
+            self.headers['Authorization'] = f'Bearer {api_token}'
+        self._refresh_token: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._auth_lock: Optional[asyncio.Lock] = None
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the pooled session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> 'FreqtradeClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _authenticate(self, stale_token: Optional[str] = None) -> None:
+        """Obtain or refresh the JWT access token (one refresh at a time)"""
+        if not (self.username and self.password):
+            return
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if self.api_token and self.api_token != stale_token:
+                return  # another caller already refreshed it
+            session = self._get_session()
+            if self._refresh_token:
+                async with session.post(
+                    f"{self.base_url}/token/refresh",
+                    headers={'Authorization': f'Bearer {self._refresh_token}'}
+                ) as response:
+                    if response.status == 200:
+                        self._set_token((await response.json())['access_token'])
+                        return
+                    logger.info("Freqtrade token refresh failed, logging in again")
+            async with session.post(
+                f"{self.base_url}/token/login",
+                auth=aiohttp.BasicAuth(self.username, self.password)
+            ) as response:
                 response.raise_for_status()
-                return await response.json()
+                tokens = await response.json()
+                self._refresh_token = tokens.get('refresh_token')
+                self._set_token(tokens['access_token'])
+
+    def _set_token(self, token: str) -> None:
+        self.api_token = token
+        self.headers['Authorization'] = f'Bearer {token}'
+
+    def _retry_delay(self, attempt: int) -> float:
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def _request(self, method: str, endpoint: str, data: Optional[Dict] = None,
+                       params: Optional[Dict] = None) -> Any:
+        url = f"{self.base_url}/{endpoint}"
+        if self.api_token is None:
+            await self._authenticate()
+        retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+        reauthenticated = False
+        attempt = 0
+        while True:
+            token = self.api_token
+            try:
+                async with self._get_session().request(
+                    method, url, headers=self.headers, json=data, params=params
+                ) as response:
+                    if response.status == 401 and not reauthenticated and self.username:
+                        reauthenticated = True
+                        await self._authenticate(stale_token=token)
+                        continue
+                    if response.status in RETRY_STATUSES and attempt < retries:
+                        logger.debug(f"Freqtrade {method} {endpoint} returned {response.status}, retrying")
+                    else:
+                        response.raise_for_status()
+                        return await response.json()
+            except aiohttp.ClientConnectorError:
+                # Connection never established, so the request is safe to resend
+                if attempt >= self.max_retries:
+                    raise
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            await asyncio.sleep(self._retry_delay(attempt))
+            attempt += 1
 
-    async def get_status(self) -> Dict[str, Any]:
+    async def get_status(self) -> List[Dict[str, Any]]:
         return await self._request('GET', 'status')
 
+    async def get_trades(self, limit: int = 500, offset: int = 0) -> Dict[str, Any]:
+        return await self._request('GET', 'trades', params={'limit': limit, 'offset': offset})
+
+    async def get_trade(self, trade_id: int) -> Dict[str, Any]:
+        return await self._request('GET', f'trade/{trade_id}')
+
+    async def get_profit(self) -> Dict[str, Any]:
+        return await self._request('GET', 'profit')
+
+    async def get_balance(self) -> Dict[str, Any]:
+        return await self._request('GET', 'balance')
+
     async def start_bot(self) -> Dict[str, Any]:
         return await self._request('POST', 'start')
 
@@ -30,4 +162,4 @@ class FreqtradeClient:
             'strategy_name': strategy_name,
             'strategy_code': strategy_code
         }
-        return await self._request('POST', 'strategy/deploy', data)
\ No newline at end of file
+        return await self._request('POST', 'strategy/deploy', data)
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple, Union
+from .freqtrade_client import FreqtradeClient
+
+logger = logging.getLogger(__name__)
+
+# Absolute /profit fields that can be summed across bots (ratios cannot)
+SUMMABLE_PROFIT_FIELDS = (
+    'profit_closed_coin', 'profit_all_coin', 'profit_closed_fiat', 'profit_all_fiat',
+    'trade_count', 'closed_trade_count', 'winning_trades', 'losing_trades',
+)
+
+
+@dataclass
+class BotEndpoint:
+    name: str
+    base_url: str
+    api_token: Optional[str] = None
+    username: Optional[str] = None
+    password: Optional[str] = None
+
+
+class FreqtradeFleetClient:
+    """
+    Fans REST calls out to several freqtrade bots concurrently.
+
+    Every call returns ``{"bots": {name: result}, "errors": {name: message}}``
+    plus an aggregated view, so one slow or dead bot only costs its own
+    timeout. Results are cached for ``cache_ttl`` seconds and concurrent
+    callers of the same view share a single fan-out.
+    """
+
+    def __init__(self, bots: List[Union[BotEndpoint, Dict[str, Any]]], timeout: float = 5.0,
+                 cache_ttl: float = 2.0, **client_kwargs):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.clients: Dict[str, FreqtradeClient] = {}
+        for bot in bots:
+            if isinstance(bot, dict):
+                bot = BotEndpoint(**bot)
+            self.clients[bot.name] = FreqtradeClient(
+                bot.base_url, api_token=bot.api_token, username=bot.username,
+                password=bot.password, timeout=timeout, **client_kwargs
+            )
+        self._cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    async def close(self) -> None:
+        await asyncio.gather(*(client.close() for client in self.clients.values()))
+
+    async def _call_one(self, name: str, call: Callable[[FreqtradeClient], Awaitable[Any]]) -> Any:
+        return await asyncio.wait_for(call(self.clients[name]), timeout=self.timeout)
+
+    async def _fan_out(self, call: Callable[[FreqtradeClient], Awaitable[Any]]) -> Dict[str, Any]:
+        names = list(self.clients)
+        results = await asyncio.gather(*(self._call_one(name, call) for name in names),
+                                       return_exceptions=True)
+        bots: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                errors[name] = str(result) or type(result).__name__
+                logger.warning(f"Fleet call to {name} failed: {errors[name]}")
+            else:
+                bots[name] = result
+        return {"bots": bots, "errors": errors}
+
+    async def _cached(self, key: Tuple, build: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        while True:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            result = await asyncio.shield(inflight)
+            if result is not None:  # None: the building caller was cancelled, build again
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await build()
+            self._cache[key] = (time.monotonic() + self.cache_ttl, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            del self._inflight[key]
+            future.set_result(None)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unawaited failure is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+
+    async def get_status(self) -> Dict[str, Any]:
+        async def build():
+            view = await self._fan_out(lambda client: client.get_status())
+            open_trades = [
+                {**trade, "bot": name}
+                for name, trades in view["bots"].items() for trade in trades or []
+            ]
+            view["open_trades"] = open_trades
+            view["open_trade_count"] = len(open_trades)
+            return view
+        return await self._cached(("status",), build)
+
+    async def get_trades(self, limit: int = 100) -> Dict[str, Any]:
+        async def build():
+            view = await self._fan_out(lambda client: client.get_trades(limit=limit))
+            trades = [
+                {**trade, "bot": name}
+                for name, result in view["bots"].items() for trade in result.get("trades", [])
+            ]
+            trades.sort(key=lambda t: t.get("close_timestamp") or t.get("open_timestamp") or 0,
+                        reverse=True)
+            view["trades"] = trades[:limit]
+            return view
+        return await self._cached(("trades", limit), build)
+
+    async def get_profit(self) -> Dict[str, Any]:
+        async def build():
+            view = await self._fan_out(lambda client: client.get_profit())
+            totals = {field: 0.0 for field in SUMMABLE_PROFIT_FIELDS}
+            for result in view["bots"].values():
+                for field in SUMMABLE_PROFIT_FIELDS:
+                    value = result.get(field)
+                    if isinstance(value, (int, float)):
+                        totals[field] += value
+            view["total"] = totals
+            return view
+        return await self._cached(("profit",), build)
+
+    async def get_balance(self) -> Dict[str, Any]:
+        async def build():
+            view = await self._fan_out(lambda client: client.get_balance())
+            by_stake: Dict[str, float] = {}
+            for result in view["bots"].values():
+                stake = result.get("stake", "UNKNOWN")
+                by_stake[stake] = by_stake.get(stake, 0.0) + float(result.get("total", 0.0) or 0.0)
+            view["total"] = by_stake
+            return view
+        return await self._cached(("balance",), build)
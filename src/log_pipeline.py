@@ -0,0 +1,224 @@
+import contextvars
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request id and extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp the caller's request id on the record before it leaves the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep one in ``every`` records below WARNING for each configured route.
+    Records carry their route via ``extra={"route": ...}``; others pass.
+    """
+
+    def __init__(self, every: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.every = dict(every or {})
+        self.sampled_out = 0
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        route = getattr(record, "route", None)
+        every = self.every.get(route) if route is not None else None
+        if not every or every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            seen = self._seen[route] = self._seen.get(route, 0) + 1
+            if seen % every == 1:
+                return True
+            self.sampled_out += 1
+        return False
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a bounded queue without blocking the caller.
+
+    When the queue is full, records below WARNING are dropped immediately
+    and counted; warnings and errors wait up to ``block_timeout`` first.
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_timeout: float = 0.05):
+        super().__init__(log_queue)
+        self.block_timeout = block_timeout
+        self.enqueued = 0
+        self.dropped: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so exc_info can travel as is;
+        # only freeze the message so later mutation of args cannot change it
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            with self._lock:
+                self.dropped[record.levelname] = self.dropped.get(record.levelname, 0) + 1
+
+
+class LogPipeline:
+    """
+    Moves the root logger's handlers behind a queue.
+
+    Callers only format the message and enqueue; a ``QueueListener`` thread
+    performs console and file I/O (including rotation), so a slow disk no
+    longer stalls the event loop.
+    """
+
+    def __init__(self, queue_size: int = 10000, sample_every: Optional[Dict[str, int]] = None):
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.handler = BoundedQueueHandler(self.queue)
+        self.sampler = SamplingFilter(sample_every)
+        self.handler.addFilter(self.sampler)
+        self.handler.addFilter(ContextFilter())
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.handlers: List[logging.Handler] = []
+
+    def install(self, root: Optional[logging.Logger] = None) -> None:
+        """Replace ``root``'s handlers with the queue handler and start the listener"""
+        root = root or logging.getLogger()
+        self.handlers = [h for h in root.handlers if h is not self.handler]
+        for handler in self.handlers:
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+
+    def stop(self, root: Optional[logging.Logger] = None) -> None:
+        """Flush the queue and restore the original handlers"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+        root = root or logging.getLogger()
+        root.removeHandler(self.handler)
+        for handler in self.handlers:
+            root.addHandler(handler)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "enqueued": self.handler.enqueued,
+            "dropped": dict(self.handler.dropped),
+            "dropped_total": sum(self.handler.dropped.values()),
+            "sampled_out": self.sampler.sampled_out,
+        }
+
+
+def per_process_files(root: Optional[logging.Logger] = None) -> None:
+    """
+    Point ``root``'s file handlers at ``<name>.<pid><ext>``. Rotating one
+    file from several processes loses or duplicates records, since each
+    process renames the file without the others knowing.
+    """
+    root = root or logging.getLogger()
+    for handler in root.handlers:
+        if not isinstance(handler, logging.FileHandler):
+            continue
+        base, ext = os.path.splitext(handler.baseFilename)
+        handler.acquire()
+        try:
+            if handler.stream is not None:
+                handler.stream.close()
+                handler.stream = None  # reopened at the new path on the next record
+            handler.baseFilename = f"{base}.{os.getpid()}{ext}"
+        finally:
+            handler.release()
+
+
+def setup_logging(config_path: str = "logging.conf", queue_size: int = 10000,
+                  sample_every: Optional[Dict[str, int]] = None, per_process: bool = False) -> LogPipeline:
+    """
+    Load ``config_path`` and route the root logger's handlers through a
+    ``LogPipeline``; ``per_process`` gives each server worker its own log files.
+    """
+    logging.config.fileConfig(config_path, disable_existing_loggers=False)
+    if per_process:
+        per_process_files()
+    pipeline = LogPipeline(queue_size, sample_every)
+    pipeline.install()
+    return pipeline
+
+
+class RequestIdMiddleware:
+    """Pure ASGI middleware that binds ``X-Request-ID`` (or a new id) to the request's context"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER.encode():
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        header = (REQUEST_ID_HEADER.encode(), request_id.encode("latin-1"))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + [header]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,268 @@
+from __future__ import annotations
+import glob
+import json
+import logging
+import os
+import time
+from typing import Dict, Any, Optional, List, Tuple, Sequence
+from .cache import CacheManager
+from .resampling import OHLCV_COLUMNS, Resampler, stack_ohlcv, timeframe_seconds
+from .startup import lazy_import
+
+np = lazy_import("numpy")
+pa = lazy_import("pyarrow")
+feather = lazy_import("pyarrow.feather")
+pq = lazy_import("pyarrow.parquet")
+
+logger = logging.getLogger(__name__)
+
+DATA_FORMATS = ("feather", "parquet", "json")
+
+
+def resolve_datadir(ft_config: Dict[str, Any], config_path: str) -> str:
+    """freqtrade's datadir: explicit ``datadir`` or ``<user_data>/data/<exchange>``"""
+    if ft_config.get("datadir"):
+        return ft_config["datadir"]
+    exchange = ft_config.get("exchange", {}).get("name", "binance")
+    return os.path.join(os.path.dirname(os.path.abspath(config_path)), "data", exchange)
+
+
+def _pair_from_filename(stem: str) -> str:
+    # freqtrade writes BTC/USDT as BTC_USDT; the quote currency never contains "_"
+    base, _, quote = stem.rpartition("_")
+    return f"{base}/{quote}" if base else stem
+
+
+def _timestamps_ms(column) -> "np.ndarray":
+    unit = getattr(column.type, "unit", "ms")
+    values = column.cast(pa.int64()).to_numpy()
+    if unit == "s":
+        return values * 1000
+    return values // {"ms": 1, "us": 1000, "ns": 1_000_000}[unit]
+
+
+def load_ohlcv_file(path: str, rows: Optional[int] = None) -> Dict[str, "np.ndarray"]:
+    """Read the last ``rows`` candles of a freqtrade data file as float64 columns (ms timestamps)"""
+    if path.endswith(".json"):
+        with open(path) as f:
+            data = json.load(f)
+        if rows:
+            data = data[-rows:]
+        array = np.asarray(data, dtype=np.float64).reshape(-1, 6)
+        return {name: array[:, i] for i, name in enumerate(OHLCV_COLUMNS)}
+    reader = feather.read_table if path.endswith(".feather") else pq.read_table
+    table = reader(path, columns=list(OHLCV_COLUMNS))
+    if rows and table.num_rows > rows:
+        table = table.slice(table.num_rows - rows)
+    columns = {"date": _timestamps_ms(table.column("date")).astype(np.float64)}
+    for name in OHLCV_COLUMNS[1:]:
+        columns[name] = table.column(name).to_numpy().astype(np.float64)
+    return columns
+
+
+def discover_pairs(datadir: str, timeframe: str) -> Dict[str, str]:
+    """Map pair -> data file for every spot pair with ``timeframe`` candles in ``datadir``"""
+    found: Dict[str, str] = {}
+    for data_format in DATA_FORMATS:
+        for path in glob.glob(os.path.join(glob.escape(datadir), f"*-{timeframe}.{data_format}")):
+            stem = os.path.basename(path)[:-len(f"-{timeframe}.{data_format}")]
+            found.setdefault(_pair_from_filename(stem), path)
+    return found
+
+
+def screen(stacked: Dict[str, "np.ndarray"], trend_window: int = 50, vol_window: int = 50,
+           rsi_period: int = 14) -> Dict[str, "np.ndarray"]:
+    """
+    Score every pair at once. Each metric is a vector over the pairs axis:
+
+    - ``trend``: least-squares slope of log close over ``trend_window`` bars (% per bar)
+    - ``trend_r2``: how well that line fits (0-1)
+    - ``volatility``: stdev of log returns over ``vol_window`` bars (% per bar)
+    - ``atr_pct``: mean true range over ``rsi_period`` bars relative to close (%)
+    - ``volume_spike``: last volume / median of the previous ``vol_window`` volumes
+    - ``rsi``: ``rsi_period`` RSI using simple averages (Cutler's RSI)
+    - ``change_pct``: close-to-close change over ``trend_window`` bars (%)
+    """
+    close, high, low, volume = stacked["close"], stacked["high"], stacked["low"], stacked["volume"]
+    log_close = np.log(close[:, -trend_window:])
+    x = np.arange(trend_window, dtype=np.float64)
+    x -= x.mean()
+    y = log_close - log_close.mean(axis=1, keepdims=True)
+    sxx = (x * x).sum()
+    syy = (y * y).sum(axis=1)
+    slope = (y * x).sum(axis=1) / sxx
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(syy > 0, slope * slope * sxx / syy, 0.0)
+
+        returns = np.diff(np.log(close[:, -(vol_window + 1):]), axis=1)
+        previous_close = close[:, -(rsi_period + 1):-1]
+        true_range = np.maximum(high[:, -rsi_period:], previous_close) - np.minimum(low[:, -rsi_period:],
+                                                                                    previous_close)
+        baseline = np.median(volume[:, -(vol_window + 1):-1], axis=1)
+        spike = np.where(baseline > 0, volume[:, -1] / baseline, 0.0)
+
+        delta = np.diff(close[:, -(rsi_period + 1):], axis=1)
+        gain = np.clip(delta, 0, None).mean(axis=1)
+        loss = np.clip(-delta, 0, None).mean(axis=1)
+        rsi = np.where(loss > 0, 100 - 100 / (1 + gain / np.where(loss > 0, loss, 1)), 100.0)
+        rsi = np.where((gain == 0) & (loss == 0), 50.0, rsi)
+
+    return {
+        "trend": slope * 100,
+        "trend_r2": r2,
+        "volatility": returns.std(axis=1) * 100,
+        "atr_pct": true_range.mean(axis=1) / close[:, -1] * 100,
+        "volume_spike": spike,
+        "rsi": rsi,
+        "change_pct": (close[:, -1] / close[:, -trend_window] - 1) * 100,
+    }
+
+
+def _zscore(values: "np.ndarray") -> "np.ndarray":
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+def score(metrics: Dict[str, "np.ndarray"]) -> Tuple["np.ndarray", List[List[str]]]:
+    """Composite interest score plus human-readable flags per pair"""
+    trend_strength = np.abs(metrics["trend"]) * metrics["trend_r2"]
+    rsi_extremity = np.clip(np.abs(metrics["rsi"] - 50) - 20, 0, None) / 10
+    spike = np.clip(np.log2(np.maximum(metrics["volume_spike"], 1e-9)), 0, None)
+    volatility_z = _zscore(metrics["volatility"])
+    composite = _zscore(trend_strength) + rsi_extremity + spike + np.clip(volatility_z, 0, None) * 0.5
+    flags: List[List[str]] = []
+    for i in range(len(composite)):
+        pair_flags = []
+        if metrics["trend_r2"][i] >= 0.5:
+            pair_flags.append("uptrend" if metrics["trend"][i] > 0 else "downtrend")
+        if metrics["rsi"][i] >= 70:
+            pair_flags.append("overbought")
+        elif metrics["rsi"][i] <= 30:
+            pair_flags.append("oversold")
+        if metrics["volume_spike"][i] >= 3:
+            pair_flags.append("volume_spike")
+        if volatility_z[i] >= 2:
+            pair_flags.append("high_volatility")
+        flags.append(pair_flags)
+    return composite, flags
+
+
+class MarketScreener:
+    """
+    Screens every pair in the local freqtrade data directory.
+
+    Candles for all pairs are stacked into ``pairs x time`` arrays and
+    scored in one vectorised pass per timeframe. Results are cached until
+    the next candle closes, so repeated ``/market_analysis`` calls only
+    re-read the data once per candle. Higher timeframes without data files
+    are resampled from the smallest screened timeframe. ``summary``
+    renders the top pairs and market breadth as a few lines for grounding
+    an LLM prompt.
+    """
+
+    def __init__(self, datadir: str, timeframes: Sequence[str] = ("5m", "1h"), window: int = 100,
+                 trend_window: int = 50, vol_window: int = 50, rsi_period: int = 14,
+                 pairs: Optional[Sequence[str]] = None, cache: Optional[CacheManager] = None,
+                 derive_timeframes: bool = True):
+        self.datadir = datadir
+        self.timeframes = list(timeframes)
+        base = min(self.timeframes, key=timeframe_seconds)
+        # Higher timeframes missing on disk are resampled from the smallest one
+        self.resampler = Resampler(base, [tf for tf in self.timeframes
+                                          if timeframe_seconds(tf) % timeframe_seconds(base) == 0]
+                                   ) if derive_timeframes else None
+        self.window = max(window, trend_window, vol_window + 1, rsi_period + 1)
+        self.trend_window = trend_window
+        self.vol_window = vol_window
+        self.rsi_period = rsi_period
+        self.pairs = list(pairs) if pairs else None
+        self.cache = cache
+
+    def _discover(self, timeframe: str) -> Dict[str, str]:
+        files = discover_pairs(self.datadir, timeframe)
+        if self.pairs is not None:
+            files = {pair: path for pair, path in files.items() if pair in self.pairs}
+        return files
+
+    def _derive(self, timeframe: str, exclude: Sequence[str]) -> Dict[str, Dict[str, "np.ndarray"]]:
+        """``timeframe`` candles resampled from base candles for pairs without their own file"""
+        base = self.resampler.base_timeframe
+        rows = (self.window + 2) * (timeframe_seconds(timeframe) // timeframe_seconds(base))
+        frames = {}
+        for pair, path in self._discover(base).items():
+            if pair in exclude:
+                continue
+            try:
+                self.resampler.update(pair, load_ohlcv_file(path, rows))
+            except Exception as e:
+                logger.warning(f"Skipping {pair} {base}: {e}")
+                continue
+            frames[pair] = self.resampler.get(pair, timeframe)
+        return frames
+
+    def _scan(self, timeframe: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        files = self._discover(timeframe)
+        frames = {}
+        for pair, path in files.items():
+            try:
+                frames[pair] = load_ohlcv_file(path, self.window)
+            except Exception as e:
+                logger.warning(f"Skipping {pair} {timeframe}: {e}")
+        if self.resampler is not None and timeframe in self.resampler.timeframes:
+            frames.update(self._derive(timeframe, list(files)))
+        pairs, stacked, skipped = stack_ohlcv(frames, self.window)
+        rows: List[Dict[str, Any]] = []
+        if pairs:
+            metrics = screen(stacked, self.trend_window, self.vol_window, self.rsi_period)
+            composite, flags = score(metrics)
+            for i in np.argsort(-composite):
+                rows.append({
+                    "pair": pairs[i], "score": round(float(composite[i]), 3), "flags": flags[i],
+                    "close": float(stacked["close"][i, -1]),
+                    **{name: round(float(values[i]), 4) for name, values in metrics.items()},
+                })
+        return {
+            "timeframe": timeframe,
+            "candle_time": int(stacked["date"][0, -1]) if pairs else None,
+            "pairs": rows,
+            "skipped": sorted(skipped),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def scan(self, timeframe: str) -> Dict[str, Any]:
+        """Screen one timeframe; cached until that timeframe's next candle close"""
+        if self.cache is None:
+            return self._scan(timeframe)
+        candle = int(time.time() // timeframe_seconds(timeframe))
+        return self.cache.get_or_compute("screener", (self.datadir, timeframe, candle),
+                                         lambda: self._scan(timeframe))
+
+    def scan_all(self) -> Dict[str, Dict[str, Any]]:
+        return {timeframe: self.scan(timeframe) for timeframe in self.timeframes}
+
+    def summary(self, top: int = 10) -> str:
+        """Compact text digest of the latest scan across all timeframes"""
+        scans = self.scan_all()
+        lines: List[str] = []
+        primary = scans[self.timeframes[0]]
+        if not primary["pairs"]:
+            return f"No {self.timeframes[0]} candle data found in {self.datadir}."
+        trends = {tf: {row["pair"]: row for row in scan["pairs"]} for tf, scan in scans.items()}
+        for tf, scan in scans.items():
+            rows = scan["pairs"]
+            if not rows:
+                continue
+            up = sum("uptrend" in r["flags"] for r in rows)
+            down = sum("downtrend" in r["flags"] for r in rows)
+            median_rsi = float(np.median([r["rsi"] for r in rows]))
+            lines.append(f"{tf}: {len(rows)} pairs, {up} uptrend, {down} downtrend, median RSI {median_rsi:.0f}")
+        lines.append(f"Top {min(top, len(primary['pairs']))} by score ({self.timeframes[0]}):")
+        for row in primary["pairs"][:top]:
+            higher = [f"{tf} {'up' if trends[tf][row['pair']]['trend'] > 0 else 'down'}"
+                      for tf in self.timeframes[1:] if row["pair"] in trends[tf]]
+            context = f" [{', '.join(higher)}]" if higher else ""
+            flags = ",".join(row["flags"]) or "-"
+            lines.append(f"- {row['pair']}: {row['change_pct']:+.2f}% RSI {row['rsi']:.0f} "
+                         f"vol x{row['volume_spike']:.1f} volat {row['volatility']:.2f}% {flags}{context}")
+        return "\n".join(lines)
@@ -0,0 +1,192 @@
+import math
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Deque
+
+# Profit factor is undefined while there are no losing trades; cap it so the
+# value stays JSON-serialisable for the metrics endpoint.
+MAX_PROFIT_FACTOR = 100.0
+
+
+class RunningStats:
+    """Welford online mean/variance accumulator"""
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 until two values have been seen)"""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class ProfitFactorAccumulator:
+    """Running gross profit / gross loss"""
+    __slots__ = ("gross_profit", "gross_loss", "wins", "losses")
+
+    def __init__(self):
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.wins = 0
+        self.losses = 0
+
+    def update(self, profit: float) -> None:
+        if profit > 0:
+            self.gross_profit += profit
+            self.wins += 1
+        elif profit < 0:
+            self.gross_loss -= profit
+            self.losses += 1
+
+    @property
+    def profit_factor(self) -> float:
+        if self.gross_loss == 0:
+            return MAX_PROFIT_FACTOR if self.gross_profit > 0 else 0.0
+        return min(self.gross_profit / self.gross_loss, MAX_PROFIT_FACTOR)
+
+
+class RollingMean:
+    """Mean over the last ``window`` values with O(1) updates"""
+    __slots__ = ("window", "_values", "_total")
+
+    def __init__(self, window: int):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self._values: Deque[float] = deque()
+        self._total = 0.0
+
+    def update(self, value: float) -> None:
+        self._values.append(value)
+        self._total += value
+        if len(self._values) > self.window:
+            self._total -= self._values.popleft()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def mean(self) -> float:
+        if not self._values:
+            return 0.0
+        return self._total / len(self._values)
+
+
+class _PairMetrics:
+    """Accumulators for a single pair (or the aggregate over all pairs)"""
+
+    def __init__(self, window: int, annualization: float):
+        self.returns = RunningStats()
+        self.profit = ProfitFactorAccumulator()
+        self.accuracy = RollingMean(window)
+        self.loss = RollingMean(window)
+        self.annualization = annualization
+
+    def sharpe_ratio(self) -> float:
+        std = self.returns.std
+        if std == 0:
+            return 0.0
+        return self.returns.mean / std * self.annualization
+
+    def snapshot(self) -> Dict[str, float]:
+        snapshot = {
+            "sharpe_ratio": self.sharpe_ratio(),
+            "profit_factor": self.profit.profit_factor,
+            "trade_count": float(self.returns.count),
+            "prediction_count": float(len(self.accuracy)),
+        }
+        if len(self.accuracy):
+            # Reported only once predictions are fed; 0 would read as a real score
+            snapshot["accuracy"] = self.accuracy.mean
+            snapshot["loss"] = self.loss.mean
+        return snapshot
+
+
+class PerformanceTracker:
+    """
+    Streaming performance metrics fed from the trade and prediction stream.
+
+    Every update is O(1) and republishes an immutable snapshot, so readers
+    (e.g. the metrics endpoint) never take the lock - they just read the
+    latest published reference.
+    """
+
+    def __init__(self, window: int = 500, annualization: float = 1.0):
+        self.window = window
+        self.annualization = annualization
+        self._lock = threading.Lock()
+        self._total = _PairMetrics(window, annualization)
+        self._pairs: Dict[str, _PairMetrics] = {}
+        self._snapshot: Dict[str, float] = self._total.snapshot()
+        self._pair_snapshots: Dict[str, Dict[str, float]] = {}
+
+    def _pair(self, pair: str) -> _PairMetrics:
+        metrics = self._pairs.get(pair)
+        if metrics is None:
+            metrics = self._pairs[pair] = _PairMetrics(self.window, self.annualization)
+        return metrics
+
+    def _publish(self, pair: Optional[str]) -> None:
+        self._snapshot = self._total.snapshot()
+        if pair is not None:
+            # Swap one immutable snapshot in place; O(1) however many pairs there are
+            self._pair_snapshots[pair] = self._pairs[pair].snapshot()
+
+    def record_trade(self, profit_ratio: float, pair: Optional[str] = None) -> None:
+        """Record the return of a closed trade"""
+        profit_ratio = float(profit_ratio)
+        with self._lock:
+            targets = [self._total] if pair is None else [self._total, self._pair(pair)]
+            for metrics in targets:
+                metrics.returns.update(profit_ratio)
+                metrics.profit.update(profit_ratio)
+            self._publish(pair)
+
+    def record_prediction(self, prediction: Any, outcome: Any,
+                          pair: Optional[str] = None, loss: Optional[float] = None) -> None:
+        """
+        Record a model prediction once its outcome is known.
+        Numeric predictions are scored on direction; the loss defaults to
+        the squared error.
+        """
+        if isinstance(prediction, (int, float)) and not isinstance(prediction, bool) \
+                and isinstance(outcome, (int, float)) and not isinstance(outcome, bool):
+            correct = (prediction > 0) == (outcome > 0)
+            if loss is None:
+                loss = (float(prediction) - float(outcome)) ** 2
+        else:
+            correct = prediction == outcome
+            if loss is None:
+                loss = 0.0 if correct else 1.0
+
+        with self._lock:
+            targets = [self._total] if pair is None else [self._total, self._pair(pair)]
+            for metrics in targets:
+                metrics.accuracy.update(1.0 if correct else 0.0)
+                metrics.loss.update(float(loss))
+            self._publish(pair)
+
+    def snapshot(self, pair: Optional[str] = None) -> Dict[str, float]:
+        """Latest published metrics, lock-free"""
+        if pair is None:
+            return self._snapshot
+        return self._pair_snapshots.get(pair, {})
+
+    def pairs(self) -> Dict[str, Dict[str, float]]:
+        """Latest published per-pair metrics, lock-free (a single C-level copy, safe under the GIL)"""
+        return dict(self._pair_snapshots)
@@ -0,0 +1,262 @@
+import asyncio
+import inspect
+import logging
+import os
+import random
+import resource
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Tuple, List
+
+logger = logging.getLogger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricFamily:
+    """A metric family whose header lines are encoded once at construction"""
+
+    def __init__(self, name: str, metric_type: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.metric_type = metric_type
+        self.labelnames = labelnames
+        self.sample_name = f"{name}_total" if metric_type == "counter" else name
+        self.header = f"# TYPE {name} {metric_type}\n# HELP {name} {help_text}\n"
+        self.samples: Dict[Tuple[str, ...], float] = {}
+        self._label_cache: Dict[Tuple[str, ...], str] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        self.samples[labels] = value
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self.samples[labels] = self.samples.get(labels, 0.0) + amount
+
+    def _prefix(self, labels: Tuple[str, ...]) -> str:
+        prefix = self._label_cache.get(labels)
+        if prefix is None:
+            if labels:
+                pairs = ",".join(f'{k}="{_escape_label(v)}"' for k, v in zip(self.labelnames, labels))
+                prefix = f"{self.sample_name}{{{pairs}}} "
+            else:
+                prefix = f"{self.sample_name} "
+            self._label_cache[labels] = prefix
+        return prefix
+
+    def render(self, out: List[str]) -> None:
+        if not self.samples:
+            return
+        out.append(self.header)
+        for labels, value in self.samples.items():
+            out.append(self._prefix(labels))
+            out.append(_format_value(value))
+            out.append("\n")
+
+
+class LLMCallStats:
+    """Counters for Claude API calls, updated inline by the callers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[Tuple[str, str], int] = {}
+        self.latency_sum: Dict[str, float] = {}
+
+    def record(self, model: str, duration: float, success: bool) -> None:
+        outcome = "success" if success else "error"
+        with self._lock:
+            key = (model, outcome)
+            self.calls[key] = self.calls.get(key, 0) + 1
+            self.latency_sum[model] = self.latency_sum.get(model, 0.0) + duration
+
+
+def _flatten(values: Dict[str, Any], prefix: str = ""):
+    """``(key, value)`` pairs with nested dicts joined as ``outer.inner`` (e.g. cache regions)"""
+    for key, value in values.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+class MonitoringSystem:
+    """
+    Periodic metrics collector with OpenMetrics exposition.
+
+    A single background task samples process stats, event-loop lag, LLM call
+    stats and any registered sources (caches, freqtrade status, ...) every
+    ``interval`` seconds. The exposition text is rendered once per tick, so
+    a ``/metrics`` scrape only returns the cached bytes.
+    """
+
+    def __init__(self, interval: float = 15.0, jitter: float = 0.1, source_timeout: float = 5.0):
+        self.interval = interval
+        self.jitter = jitter
+        self.source_timeout = source_timeout
+        self.llm_stats = LLMCallStats()
+        self.started_at = time.time()
+        self._sources: Dict[str, Callable[[], Any]] = {}
+        self._collectors: List[Any] = []
+        self._task: Optional[asyncio.Task] = None
+        self._last_values: Dict[str, float] = {}
+        self._exposition = b"# EOF\n"
+
+        self._families = {
+            "rss": MetricFamily("freqassistant_process_resident_memory_bytes", "gauge", "Resident memory size."),
+            "cpu": MetricFamily("freqassistant_process_cpu_seconds", "counter", "User and system CPU time."),
+            "fds": MetricFamily("freqassistant_process_open_fds", "gauge", "Open file descriptors."),
+            "threads": MetricFamily("freqassistant_process_threads", "gauge", "Python threads."),
+            "uptime": MetricFamily("freqassistant_uptime_seconds", "gauge", "Seconds since start."),
+            "loop_lag": MetricFamily("freqassistant_event_loop_lag_seconds", "gauge",
+                                     "Collector wake-up delay on the event loop."),
+            "collect_duration": MetricFamily("freqassistant_collector_duration_seconds", "gauge",
+                                             "Duration of the last collection."),
+            "overruns": MetricFamily("freqassistant_collector_overruns", "counter",
+                                     "Collections that exceeded the interval."),
+            "llm_calls": MetricFamily("freqassistant_llm_calls", "counter", "Claude API calls.",
+                                      ("model", "outcome")),
+            "llm_latency": MetricFamily("freqassistant_llm_latency_seconds", "counter",
+                                        "Cumulative Claude API call latency.", ("model",)),
+            "source_up": MetricFamily("freqassistant_source_up", "gauge",
+                                      "Whether the last read of a source succeeded.", ("source",)),
+            "source_value": MetricFamily("freqassistant_source_value", "gauge",
+                                         "Values reported by registered sources.", ("source", "key")),
+        }
+        self._families["overruns"].set(0)
+
+    def register_source(self, name: str, fn: Callable[[], Any]) -> None:
+        """
+        Register a callable (sync or async) returning ``Dict[str, float]``
+        that is sampled on every collection. Nested dicts are exported with
+        dotted keys, so ``{"llm": {"hit_rate": 0.9}}`` becomes ``llm.hit_rate``.
+        """
+        self._sources[name] = fn
+
+    def unregister_source(self, name: str) -> None:
+        self._sources.pop(name, None)
+        for key in [k for k in self._families["source_value"].samples if k[0] == name]:
+            del self._families["source_value"].samples[key]
+        self._families["source_up"].samples.pop((name,), None)
+
+    def register_collector(self, collector: Any) -> None:
+        """Register an object whose ``render(out)`` appends its own metric families"""
+        self._collectors.append(collector)
+
+    def record_llm_call(self, model: str, duration: float, success: bool) -> None:
+        self.llm_stats.record(model, duration, success)
+
+    def _collect_process_stats(self) -> None:
+        families = self._families
+        try:
+            with open("/proc/self/statm") as f:
+                rss = int(f.read().split()[1]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            # ru_maxrss is the peak (KiB on Linux), the best portable fallback
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        families["rss"].set(rss)
+        times = os.times()
+        families["cpu"].set(times.user + times.system)
+        try:
+            families["fds"].set(len(os.listdir("/proc/self/fd")))
+        except OSError:
+            pass
+        families["threads"].set(threading.active_count())
+        families["uptime"].set(time.time() - self.started_at)
+
+    def _collect_llm_stats(self) -> None:
+        stats = self.llm_stats
+        with stats._lock:
+            calls = dict(stats.calls)
+            latency = dict(stats.latency_sum)
+        for (model, outcome), count in calls.items():
+            self._families["llm_calls"].set(count, model, outcome)
+        for model, total in latency.items():
+            self._families["llm_latency"].set(total, model)
+
+    async def _read_source(self, name: str, fn: Callable[[], Any]) -> None:
+        try:
+            result = fn()
+            if inspect.isawaitable(result):
+                result = await asyncio.wait_for(result, timeout=self.source_timeout)
+            for key, value in _flatten(result or {}):
+                if isinstance(value, bool):
+                    value = float(value)
+                if isinstance(value, (int, float)):
+                    self._families["source_value"].set(float(value), name, key)
+                    self._last_values[f"{name}.{key}"] = float(value)
+            self._families["source_up"].set(1, name)
+        except Exception as e:
+            logger.warning(f"Metrics source {name} failed: {e}")
+            self._families["source_up"].set(0, name)
+
+    async def collect_metrics(self) -> Dict[str, float]:
+        """Run one collection pass and re-render the exposition"""
+        started = time.perf_counter()
+        self._collect_process_stats()
+        self._collect_llm_stats()
+        if self._sources:
+            await asyncio.gather(*(self._read_source(name, fn) for name, fn in list(self._sources.items())))
+        self._families["collect_duration"].set(time.perf_counter() - started)
+        self._render()
+        return dict(self._last_values)
+
+    def _render(self) -> None:
+        out: List[str] = []
+        for family in self._families.values():
+            family.render(out)
+        for collector in self._collectors:
+            collector.render(out)
+        out.append("# EOF\n")
+        self._exposition = "".join(out).encode("utf-8")
+
+    def render(self) -> bytes:
+        """Latest OpenMetrics exposition (rendered by the last collection)"""
+        return self._exposition
+
+    def start(self) -> None:
+        """Start the collector task on the running loop (idempotent)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            try:
+                await self.collect_metrics()
+            except Exception as e:
+                logger.error(f"Metrics collection failed: {e}")
+
+            next_tick += self.interval
+            now = loop.time()
+            if now > next_tick:
+                # Overran the interval: skip the missed ticks instead of bursting
+                missed = int((now - next_tick) // self.interval) + 1
+                self._families["overruns"].inc(missed)
+                next_tick += missed * self.interval
+            wake_at = next_tick + random.uniform(0, self.jitter * self.interval)
+            await asyncio.sleep(wake_at - now)
+            self._families["loop_lag"].set(max(0.0, loop.time() - wake_at))
@@ -0,0 +1,280 @@
+import asyncio
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the final +Inf bucket is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is one bisect and two adds"""
+
+    __slots__ = ("counts", "total", "count", "max", "errors")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        if seconds > self.max:
+            self.max = seconds
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p90_ms": round(self.quantile(0.9) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class RequestMetrics:
+    """
+    Per-route latency histograms and in-flight request counts.
+
+    Routes are labelled by their path template (``/api/strategies/{name}``),
+    not the concrete URL, so the number of series stays bounded. Updates
+    happen on the event loop thread only, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.in_flight = 0
+        self.in_flight_peak = 0
+        self._route_paths: Dict[Any, str] = {}
+
+    def route_label(self, scope: Dict[str, Any]) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Map every route once; later requests are a dict lookup
+            app = scope.get("app")
+            for route in getattr(app, "routes", ()):
+                target = getattr(route, "endpoint", None) or getattr(route, "app", None)
+                if target is not None:
+                    self._route_paths.setdefault(target, getattr(route, "path", UNMATCHED_ROUTE) or "/")
+            path = self._route_paths.setdefault(endpoint, UNMATCHED_ROUTE)
+        return path
+
+    def observe(self, method: str, route: str, seconds: float, status: int) -> None:
+        histogram = self.histograms.get((method, route))
+        if histogram is None:
+            histogram = self.histograms[(method, route)] = LatencyHistogram()
+        histogram.observe(seconds, status >= 500)
+
+    def snapshot(self) -> Dict[str, Any]:
+        routes = [{"method": method, "route": route, **histogram.summary()}
+                  for (method, route), histogram in self.histograms.items()]
+        routes.sort(key=lambda r: r["mean_ms"] * r["count"], reverse=True)
+        return {"in_flight": self.in_flight, "in_flight_peak": self.in_flight_peak, "routes": routes}
+
+    def reset(self) -> None:
+        """Drop recorded latencies, e.g. between benchmark stages"""
+        self.histograms.clear()
+        self.in_flight_peak = self.in_flight
+
+    def render(self, out: List[str]) -> None:
+        """Append OpenMetrics histogram families (used by ``MonitoringSystem``)"""
+        name = "freqassistant_http_request_duration_seconds"
+        out.append(f"# TYPE {name} histogram\n# HELP {name} HTTP request latency by route.\n")
+        for (method, route), histogram in list(self.histograms.items()):
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + (float("inf"),), histogram.counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                out.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}\n')
+            out.append(f"{name}_count{{{labels}}} {histogram.count}\n")
+            out.append(f"{name}_sum{{{labels}}} {histogram.total!r}\n")
+        out.append("# TYPE freqassistant_http_requests_in_flight gauge\n"
+                   "# HELP freqassistant_http_requests_in_flight Requests currently being handled.\n"
+                   f"freqassistant_http_requests_in_flight {self.in_flight}\n")
+
+
+class LatencyMiddleware:
+    """Pure ASGI middleware feeding ``RequestMetrics``; websockets pass through untouched"""
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        metrics.in_flight += 1
+        if metrics.in_flight > metrics.in_flight_peak:
+            metrics.in_flight_peak = metrics.in_flight
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope["method"], metrics.route_label(scope), time.perf_counter() - started, status)
+
+
+class EventLoopLagMonitor:
+    """
+    Measures how late the event loop wakes a task that sleeps ``interval``.
+
+    Anything that blocks the loop (sync I/O, CPU-heavy handlers) delays
+    every request in flight by the same amount, and shows up here even
+    when no single route looks slow.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.histogram = LatencyHistogram()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.histogram.observe(max(0.0, loop.time() - started - self.interval))
+
+    def reset(self) -> None:
+        self.histogram = LatencyHistogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"interval_ms": self.interval * 1000, **self.histogram.summary()}
+
+    def render(self, out: List[str]) -> None:
+        """Append the lag histogram as an OpenMetrics family"""
+        name = "freqassistant_event_loop_lag_seconds"
+        histogram = self.histogram
+        out.append(f"# TYPE {name} histogram\n# HELP {name} Event loop wake-up delay.\n")
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS + (float("inf"),), histogram.counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            out.append(f'{name}_bucket{{le="{le}"}} {cumulative}\n')
+        out.append(f"{name}_count {histogram.count}\n")
+        out.append(f"{name}_sum {histogram.total!r}\n")
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    parent, base = os.path.split(filename)
+    return f"{code.co_name} ({os.path.basename(parent)}/{base}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the live process.
+
+    ``profile`` runs on its own thread and snapshots every other thread's
+    Python stack with ``sys._current_frames()`` at a fixed interval,
+    counting identical stacks. Nothing is instrumented, so the cost is one
+    stack walk per thread per sample. Output is the collapsed-stack format
+    read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _sample(self, stacks: Counter, thread_names: Dict[int, str], own_id: int,
+                label_cache: Dict[Any, str]) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels = []
+            while frame is not None and len(labels) < self.max_depth:
+                code = frame.f_code
+                label = label_cache.get(code)
+                if label is None:
+                    label = label_cache[code] = _frame_label(code)
+                labels.append(label)
+                frame = frame.f_back
+            labels.append(thread_names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(labels))] += 1
+
+    def profile(self, duration: float, interval: Optional[float] = None) -> Dict[str, Any]:
+        """Sample for ``duration`` seconds (blocking); raises RuntimeError if already running"""
+        interval = interval or self.interval
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            own_id = threading.get_ident()
+            stacks: Counter = Counter()
+            label_cache: Dict[Any, str] = {}
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + duration
+            while time.perf_counter() < deadline:
+                thread_names = {t.ident: t.name for t in threading.enumerate()}
+                self._sample(stacks, thread_names, own_id, label_cache)
+                samples += 1
+                time.sleep(interval)
+            return {"duration": time.perf_counter() - started, "samples": samples, "stacks": stacks}
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def collapse(stacks: Dict[str, int]) -> str:
+        """Render ``stack -> count`` as collapsed-stack lines, heaviest first"""
+        return "".join(f"{stack} {count}\n" for stack, count in
+                       sorted(stacks.items(), key=lambda item: item[1], reverse=True))
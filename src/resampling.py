@@ -0,0 +1,217 @@
+import logging
+import threading
+from typing import Dict, Any, Optional, List, Tuple, Sequence
+from .startup import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+Candles = Dict[str, "np.ndarray"]
+
+OHLCV_COLUMNS = ("date", "open", "high", "low", "close", "volume")
+
+TIMEFRAME_SECONDS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "8h": 28800, "12h": 43200,
+    "1d": 86400, "3d": 259200, "1w": 604800,
+}
+
+
+def timeframe_seconds(timeframe: str) -> int:
+    try:
+        return TIMEFRAME_SECONDS[timeframe]
+    except KeyError:
+        raise ValueError(f"Unsupported timeframe: {timeframe}")
+
+
+def stack_ohlcv(frames: Dict[str, Candles], window: int, columns: Sequence[str] = OHLCV_COLUMNS
+                ) -> Tuple[List[str], Dict[str, "np.ndarray"], List[str]]:
+    """
+    Stack the last ``window`` candles of every pair into ``(pairs, time)``
+    arrays. Pairs with too little history, or whose last candle is older
+    than the newest one in the set (delisted, not downloaded), are skipped.
+    """
+    latest = max((f["date"][-1] for f in frames.values() if len(f["date"])), default=None)
+    pairs, skipped = [], []
+    for pair, frame in frames.items():
+        if len(frame["date"]) >= window and frame["date"][-1] == latest:
+            pairs.append(pair)
+        else:
+            skipped.append(pair)
+    stacked = {name: np.stack([frames[p][name][-window:] for p in pairs]) if pairs
+               else np.empty((0, window)) for name in columns}
+    return pairs, stacked, skipped
+
+
+def _empty() -> Candles:
+    return {name: np.empty(0) for name in OHLCV_COLUMNS}
+
+
+def _slice(candles: Candles, start: int = 0, stop: Optional[int] = None) -> Candles:
+    return {name: values[start:stop] for name, values in candles.items()}
+
+
+def _concat(a: Candles, b: Candles) -> Candles:
+    return {name: np.concatenate((a[name], b[name])) for name in OHLCV_COLUMNS}
+
+
+def resample_ohlcv(candles: Candles, timeframe: str, base_timeframe: str) -> Tuple[Candles, "np.ndarray"]:
+    """
+    Aggregate ascending ``base_timeframe`` candles into ``timeframe`` candles.
+
+    Bucket boundaries are found once and every column is reduced with
+    ``ufunc.reduceat`` over them. Returns the candles and a mask that is
+    False for a trailing bucket whose period has not finished yet.
+    """
+    base_ms = timeframe_seconds(base_timeframe) * 1000
+    target_ms = timeframe_seconds(timeframe) * 1000
+    if target_ms % base_ms:
+        raise ValueError(f"{timeframe} is not a multiple of {base_timeframe}")
+    dates = candles["date"]
+    if not len(dates):
+        return _empty(), np.empty(0, dtype=bool)
+    buckets = dates // target_ms * target_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(dates)] - 1
+    resampled = {
+        "date": buckets[starts],
+        "open": candles["open"][starts],
+        "high": np.maximum.reduceat(candles["high"], starts),
+        "low": np.minimum.reduceat(candles["low"], starts),
+        "close": candles["close"][ends],
+        "volume": np.add.reduceat(candles["volume"], starts),
+    }
+    complete = resampled["date"] + target_ms <= dates[-1] + base_ms
+    return resampled, complete
+
+
+def align_informative(base_dates: "np.ndarray", base_timeframe: str, informative: Candles,
+                      timeframe: str) -> Candles:
+    """
+    Informative columns aligned to every base candle without lookahead.
+
+    Each base candle sees the latest ``timeframe`` candle that had closed
+    by the time the base candle closed, like freqtrade's
+    ``merge_informative_pair``. Rows before the first closed candle are NaN.
+    """
+    base_ms = timeframe_seconds(base_timeframe) * 1000
+    target_ms = timeframe_seconds(timeframe) * 1000
+    index = np.searchsorted(informative["date"] + target_ms, base_dates + base_ms, side="right") - 1
+    valid = index >= 0
+    aligned = {}
+    for name, values in informative.items():
+        column = np.full(len(base_dates), np.nan)
+        column[valid] = values[index[valid]]
+        aligned[name] = column
+    return aligned
+
+
+class _Series:
+    __slots__ = ("candles", "pending", "started")
+
+    def __init__(self):
+        self.candles = _empty()
+        # Base candles of the bucket that has not closed yet
+        self.pending = _empty()
+        self.started = False
+
+
+class Resampler:
+    """
+    Derives and caches higher timeframes from base candles per pair.
+
+    ``update`` only aggregates base candles newer than the last ones it
+    saw, together with those still waiting in an unfinished bucket, so
+    feeding it the latest candles every cycle costs a few rows rather
+    than the whole history. Only closed candles are kept; each derived
+    series holds at most ``max_candles`` rows.
+    """
+
+    def __init__(self, base_timeframe: str, timeframes: Sequence[str], max_candles: int = 5000):
+        self.base_timeframe = base_timeframe
+        self.timeframes = [tf for tf in timeframes if tf != base_timeframe]
+        for timeframe in self.timeframes:
+            if timeframe_seconds(timeframe) % timeframe_seconds(base_timeframe):
+                raise ValueError(f"{timeframe} is not a multiple of {base_timeframe}")
+        self.max_candles = max_candles
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._last_date: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def update(self, pair: str, candles: Candles) -> Dict[str, int]:
+        """Feed ascending base candles (overlap is fine); returns new closed candles per timeframe"""
+        added = {}
+        with self._lock:
+            last = self._last_date.get(pair)
+            start = 0 if last is None else int(np.searchsorted(candles["date"], last, side="right"))
+            new = _slice(candles, start)
+            if not len(new["date"]):
+                return {timeframe: 0 for timeframe in self.timeframes}
+            self._last_date[pair] = float(new["date"][-1])
+            for timeframe in self.timeframes:
+                series = self._series.setdefault((pair, timeframe), _Series())
+                window = _concat(series.pending, new)
+                if not series.started:
+                    # Start at a bucket boundary so the first candle is not missing its head
+                    target_ms = timeframe_seconds(timeframe) * 1000
+                    first_bucket = -(-window["date"][0] // target_ms) * target_ms
+                    window = _slice(window, int(np.searchsorted(window["date"], first_bucket)))
+                    series.started = len(window["date"]) > 0
+                resampled, complete = resample_ohlcv(window, timeframe, self.base_timeframe)
+                closed = int(complete.sum())
+                series.candles = _slice(_concat(series.candles, _slice(resampled, 0, closed)), -self.max_candles)
+                if closed < len(complete):
+                    cut = int(np.searchsorted(window["date"], resampled["date"][closed]))
+                    series.pending = _slice(window, cut)
+                else:
+                    series.pending = _empty()
+                added[timeframe] = closed
+        return added
+
+    def get(self, pair: str, timeframe: str) -> Candles:
+        """Closed ``timeframe`` candles derived so far for ``pair``"""
+        with self._lock:
+            series = self._series.get((pair, timeframe))
+            return dict(series.candles) if series is not None else _empty()
+
+    def reset(self, pair: Optional[str] = None) -> None:
+        """Forget derived candles, e.g. after historical data was re-downloaded"""
+        with self._lock:
+            if pair is None:
+                self._series.clear()
+                self._last_date.clear()
+                return
+            self._last_date.pop(pair, None)
+            for timeframe in self.timeframes:
+                self._series.pop((pair, timeframe), None)
+
+    def aligned(self, pair: str, candles: Candles) -> Candles:
+        """
+        Base candles plus ``<column>_<timeframe>`` columns for every derived
+        timeframe (freqtrade's informative naming), all of base length.
+        """
+        self.update(pair, candles)
+        frame = dict(candles)
+        for timeframe in self.timeframes:
+            informative = align_informative(candles["date"], self.base_timeframe, self.get(pair, timeframe),
+                                            timeframe)
+            for name, values in informative.items():
+                frame[f"{name}_{timeframe}"] = values
+        return frame
+
+    def aligned_stack(self, frames: Dict[str, Candles], window: int
+                      ) -> Tuple[List[str], Dict[str, "np.ndarray"], List[str]]:
+        """Aligned multi-timeframe columns for many pairs as ``(pairs, window)`` arrays"""
+        aligned = {pair: self.aligned(pair, candles) for pair, candles in frames.items()}
+        columns = next(iter(aligned.values())).keys() if aligned else OHLCV_COLUMNS
+        return stack_ohlcv(aligned, window, columns)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "base_timeframe": self.base_timeframe,
+                "timeframes": list(self.timeframes),
+                "pairs": len(self._last_date),
+                "candles": sum(len(s.candles["date"]) for s in self._series.values()),
+            }
@@ -0,0 +1,291 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Anthropic SDK errors that are worth retrying or failing over; matched by
+# name so this module does not import the SDK
+RETRYABLE_ERROR_NAMES = frozenset({
+    "APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError", "OverloadedError",
+})
+RETRYABLE_STATUS = frozenset({408, 409, 429})
+
+
+class CircuitOpenError(Exception):
+    """Raised when every model tier is unavailable"""
+    pass
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in RETRYABLE_STATUS or status >= 500)
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 5.0) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after ``failure_threshold`` consecutive failures; open
+    -> half-open after ``reset_timeout``, where one probe call decides
+    whether to close again or re-open.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """End a half-open probe that proved nothing (cancelled, or a bad request) so another call can probe"""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = self.clock()
+            self._probe_in_flight = False
+
+
+class RetryBudget:
+    """
+    Caps retries (and hedges) at ``ratio`` of recent first attempts plus a
+    small floor, so a failing upstream sees at most ``1 + ratio`` times its
+    normal load instead of ``max_retries`` times.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_window: int = 3, window: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.min_per_window = min_per_window
+        self.window = window
+        self.clock = clock
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+
+    def _trim(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(self.clock())
+
+    def try_spend(self) -> bool:
+        now = self.clock()
+        self._trim(now)
+        if len(self._retries) < self.min_per_window + self.ratio * len(self._requests):
+            self._retries.append(now)
+            return True
+        return False
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for hedge timing"""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ModelStats:
+    __slots__ = ("calls", "successes", "failures", "retries", "hedges", "hedge_wins", "rejected")
+
+    def __init__(self):
+        for slot in self.__slots__:
+            setattr(self, slot, 0)
+
+    def to_dict(self) -> Dict[str, int]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ResilientCaller:
+    """
+    Calls an LLM through an ordered list of model tiers.
+
+    Each model has its own circuit breaker and latency window. A call
+    goes to the first tier whose breaker is closed. Slow attempts are
+    hedged: once an attempt has run longer than the model's p95 latency,
+    a second identical request starts, and whichever finishes first wins.
+    Retryable failures are retried with jittered backoff while the shared
+    retry budget allows, then the call fails over to the next tier. Every
+    attempt is bounded by ``timeout``, so during an upstream incident the
+    worst-case latency is roughly ``timeout`` per tier instead of unbounded.
+    """
+
+    def __init__(self, models: Sequence[str], failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 max_retries: int = 2, retry_budget: float = 0.2, timeout: float = 60.0,
+                 hedge: bool = True, hedge_quantile: float = 0.95, hedge_min_samples: int = 20,
+                 hedge_min_delay: float = 0.5):
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models = list(dict.fromkeys(models))
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.budget = RetryBudget(ratio=retry_budget)
+        self.breakers = {m: CircuitBreaker(failure_threshold, reset_timeout) for m in self.models}
+        self.latency = {m: LatencyTracker() for m in self.models}
+        self.stats = {m: ModelStats() for m in self.models}
+        self.fallbacks = 0
+
+    @classmethod
+    def from_config(cls, primary: str, config: Dict[str, Any]) -> "ResilientCaller":
+        """Build from the ``claude_integration`` section (``fallback_models`` and ``resilience``)"""
+        options = dict(config.get("resilience", {}))
+        return cls([primary, *config.get("fallback_models", [])], **options)
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        if not self.hedge or len(self.latency[model]) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latency[model].quantile(self.hedge_quantile))
+
+    @staticmethod
+    def _start(call: Callable[[str], Awaitable[T]], model: str) -> asyncio.Task:
+        task = asyncio.ensure_future(call(model))
+        # The losing copy of a hedged pair may fail after the winner returned
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _attempt(self, model: str, call: Callable[[str], Awaitable[T]]) -> T:
+        """One logical attempt, possibly hedged; raises the first error if every copy fails"""
+        stats = self.stats[model]
+        started = time.perf_counter()
+        tasks: List[asyncio.Task] = [self._start(call, model)]
+        delay = self.hedge_delay(model)
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.budget.try_spend():
+                    stats.hedges += 1
+                    tasks.append(self._start(call, model))
+            remaining = list(tasks)
+            first_error: Optional[BaseException] = None
+            deadline = started + self.timeout
+            while remaining:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    raise asyncio.TimeoutError(f"{model} did not answer within {self.timeout}s")
+                done, _ = await asyncio.wait(remaining, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    remaining.remove(task)
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            stats.hedge_wins += 1
+                        self.latency[model].record(time.perf_counter() - started)
+                        return task.result()
+                    first_error = first_error or task.exception()
+            raise first_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def call(self, call: Callable[[str], Awaitable[T]]) -> T:
+        """Run ``call(model)`` against the tiers in order; see the class docstring"""
+        self.budget.record_request()
+        last_error: Optional[BaseException] = None
+        for index, model in enumerate(self.models):
+            breaker, stats = self.breakers[model], self.stats[model]
+            if not breaker.allow():
+                stats.rejected += 1
+                continue
+            if index > 0:
+                # Only reached when every earlier tier was open or failed
+                self.fallbacks += 1
+                logger.warning(f"Falling back to model {model}")
+            for attempt in range(self.max_retries + 1):
+                stats.calls += 1
+                try:
+                    result = await self._attempt(model, call)
+                except Exception as e:
+                    if not is_retryable(e):
+                        # A bad request fails the same way on every tier and says nothing about the model
+                        breaker.release()
+                        raise
+                    stats.failures += 1
+                    breaker.record_failure()
+                    last_error = e
+                    logger.warning(f"{model} attempt {attempt + 1} failed: {e}")
+                    if attempt == self.max_retries or not breaker.allow() or not self.budget.try_spend():
+                        break
+                    stats.retries += 1
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                except BaseException:
+                    # Cancelled mid-probe: leaving the probe taken would keep the breaker half-open forever
+                    breaker.release()
+                    raise
+                stats.successes += 1
+                breaker.record_success()
+                return result
+        if last_error is not None:
+            raise last_error
+        raise CircuitOpenError(f"All model tiers unavailable: {', '.join(self.models)}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "fallbacks": self.fallbacks,
+            "models": {
+                model: {
+                    "breaker": self.breakers[model].state,
+                    "times_opened": self.breakers[model].times_opened,
+                    "p95_ms": round((self.latency[model].quantile(0.95) or 0.0) * 1000, 1),
+                    **self.stats[model].to_dict(),
+                }
+                for model in self.models
+            },
+        }
@@ -0,0 +1,167 @@
+"""
+Minimal stand-ins for freqtrade, talib and qtpylib used by the strategy
+sandbox when the real packages are not installed in this process.
+
+They implement just enough of each API for a generated strategy to import
+and run its populate_* methods on a fixture frame. Indicators without a
+stand-in resolve to a neutral series and are reported back as stubbed.
+"""
+import sys
+import types
+from typing import Any, Dict, Set
+import numpy as np
+import pandas as pd
+
+stubbed_calls: Set[str] = set()
+
+
+class IStrategy:
+    INTERFACE_VERSION = 3
+    timeframe = "5m"
+    minimal_roi: Dict[str, float] = {}
+    stoploss = -0.1
+    can_short = False
+    startup_candle_count = 0
+
+    def __init__(self, config: Dict[str, Any] = None):
+        self.config = config or {}
+
+    def informative_pairs(self):
+        return []
+
+
+class _Parameter:
+    def __init__(self, *args, default=None, **kwargs):
+        self.value = default if default is not None else (args[0] if args else None)
+
+
+class IntParameter(_Parameter):
+    pass
+
+
+class DecimalParameter(_Parameter):
+    pass
+
+
+class RealParameter(_Parameter):
+    pass
+
+
+class CategoricalParameter(_Parameter):
+    def __init__(self, categories, default=None, **kwargs):
+        super().__init__(default=default if default is not None else list(categories)[0])
+
+
+class BooleanParameter(_Parameter):
+    pass
+
+
+def merge_informative_pair(dataframe, informative, timeframe, timeframe_inf, ffill=True, **kwargs):
+    return dataframe
+
+
+def _series(dataframe, price="close"):
+    return dataframe[price] if isinstance(dataframe, pd.DataFrame) else pd.Series(dataframe)
+
+
+def SMA(dataframe, timeperiod=30, price="close", **kwargs):
+    return _series(dataframe, price).rolling(timeperiod).mean()
+
+
+def EMA(dataframe, timeperiod=30, price="close", **kwargs):
+    return _series(dataframe, price).ewm(span=timeperiod, adjust=False).mean()
+
+
+def RSI(dataframe, timeperiod=14, price="close", **kwargs):
+    delta = _series(dataframe, price).diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / timeperiod, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / timeperiod, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss.replace(0, np.nan))
+
+
+def MACD(dataframe, fastperiod=12, slowperiod=26, signalperiod=9, **kwargs):
+    close = _series(dataframe)
+    macd = EMA(close, fastperiod) - EMA(close, slowperiod)
+    signal = macd.ewm(span=signalperiod, adjust=False).mean()
+    return pd.DataFrame({"macd": macd, "macdsignal": signal, "macdhist": macd - signal})
+
+
+def BBANDS(dataframe, timeperiod=20, nbdevup=2.0, nbdevdn=2.0, **kwargs):
+    close = _series(dataframe)
+    mid = close.rolling(timeperiod).mean()
+    std = close.rolling(timeperiod).std()
+    return pd.DataFrame({"upperband": mid + nbdevup * std, "middleband": mid, "lowerband": mid - nbdevdn * std})
+
+
+def ATR(dataframe, timeperiod=14, **kwargs):
+    high, low, close = dataframe["high"], dataframe["low"], dataframe["close"]
+    true_range = pd.concat([high - low, (high - close.shift()).abs(), (low - close.shift()).abs()], axis=1).max(axis=1)
+    return true_range.rolling(timeperiod).mean()
+
+
+def _talib_getattr(name: str):
+    def neutral(dataframe, *args, **kwargs):
+        stubbed_calls.add(f"talib.{name}")
+        return pd.Series(50.0, index=dataframe.index) if isinstance(dataframe, pd.DataFrame) else dataframe
+    return neutral
+
+
+def typical_price(bars):
+    return (bars["high"] + bars["low"] + bars["close"]) / 3
+
+
+def rolling_mean(series, window=200, min_periods=None):
+    return series.rolling(window=window, min_periods=min_periods).mean()
+
+
+def bollinger_bands(series, window=20, stds=2):
+    mid = series.rolling(window).mean()
+    std = series.rolling(window).std(ddof=0)
+    return pd.DataFrame({"upper": mid + std * stds, "mid": mid, "lower": mid - std * stds})
+
+
+def crossed_above(series1, series2):
+    series2 = series2 if isinstance(series2, pd.Series) else pd.Series(series2, index=series1.index)
+    return (series1 > series2) & (series1.shift(1) <= series2.shift(1))
+
+
+def crossed_below(series1, series2):
+    series2 = series2 if isinstance(series2, pd.Series) else pd.Series(series2, index=series1.index)
+    return (series1 < series2) & (series1.shift(1) >= series2.shift(1))
+
+
+def _module(name: str, **attrs) -> types.ModuleType:
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install() -> bool:
+    """Register the stand-ins for any of freqtrade/talib that are missing; True if any were installed"""
+    installed = False
+    try:
+        import freqtrade.strategy  # noqa: F401
+    except ImportError:
+        strategy = _module(
+            "freqtrade.strategy", IStrategy=IStrategy, IntParameter=IntParameter,
+            DecimalParameter=DecimalParameter, RealParameter=RealParameter,
+            CategoricalParameter=CategoricalParameter, BooleanParameter=BooleanParameter,
+            merge_informative_pair=merge_informative_pair,
+        )
+        indicators = _module(
+            "freqtrade.vendor.qtpylib.indicators", typical_price=typical_price, rolling_mean=rolling_mean,
+            bollinger_bands=bollinger_bands, crossed_above=crossed_above, crossed_below=crossed_below,
+        )
+        qtpylib = _module("freqtrade.vendor.qtpylib", indicators=indicators)
+        vendor = _module("freqtrade.vendor", qtpylib=qtpylib)
+        _module("freqtrade", strategy=strategy, vendor=vendor, __path__=[])
+        installed = True
+    try:
+        import talib.abstract  # noqa: F401
+    except ImportError:
+        abstract = _module("talib.abstract", SMA=SMA, EMA=EMA, RSI=RSI, MACD=MACD, BBANDS=BBANDS, ATR=ATR,
+                           __getattr__=_talib_getattr)
+        _module("talib", abstract=abstract, __path__=[])
+        installed = True
+    return installed
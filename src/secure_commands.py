@@ -1,9 +1,67 @@
+import asyncio
+import math
+import threading
+import time
+from dataclasses import dataclass
 from functools import wraps
-from typing import Callable
-from ratelimit import limits, sleep_and_retry
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+from .shared_state import SharedStore
+from .strategy_validator import extract_code, validate_strategy
 
 class RateLimiter:
-    pass
+    """
+    Token buckets for command rate limits. With a ``SharedStore`` the
+    buckets live in SQLite so every server worker draws from the same
+    budget; without one they are kept in this process.
+    """
+
+    def __init__(self, store: Optional[SharedStore] = None):
+        self.store = store
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, name: str, calls: int, period: float) -> Tuple[bool, float]:
+        """Take one call from ``name``'s budget of ``calls`` per ``period`` seconds"""
+        rate = calls / period
+        if self.store is not None:
+            return self.store.try_acquire(f"ratelimit:{name}", rate, calls)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(name, (float(calls), now))
+            tokens = min(calls, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            self._buckets[name] = (tokens - 1 if allowed else tokens, now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    async def check(self, name: str, calls: int, period: float) -> Tuple[bool, float]:
+        """``try_acquire`` that keeps the shared store's SQLite write off the event loop"""
+        if self.store is None:
+            return self.try_acquire(name, calls, period)
+        return await asyncio.to_thread(self.try_acquire, name, calls, period)
+
+    async def acquire(self, name: str, calls: int, period: float) -> None:
+        """Wait without blocking the event loop until a call is allowed"""
+        while True:
+            allowed, retry_after = await self.check(name, calls, period)
+            if allowed:
+                return
+            await asyncio.sleep(retry_after)
+
+def rate_limited(calls: int, period: float) -> Callable:
+    """
+    Limit a command handler to ``calls`` per ``period`` seconds per user.
+    Over the limit the user is told when to retry; waiting would hold a
+    dispatcher slot that other chats need.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(self, user_id: str, command: str, *args, **kwargs):
+            allowed, retry_after = await self.rate_limiter.check(f"{func.__qualname__}:{user_id}", calls, period)
+            if not allowed:
+                return f"Rate limited, retry in {math.ceil(retry_after)}s."
+            return await func(self, user_id, command, *args, **kwargs)
+        return wrapper
+    return decorator
 
 class SecurityManager:
     pass
@@ -18,6 +76,70 @@ COMMAND_PERMISSIONS = {
     'user': ['/status', '/balance', '/trades', '/market_analysis', '/help', '/test_claude']
 }
 
+@dataclass(frozen=True)
+class CommandRoute:
+    command: str
+    handler: str  # SecureCommands method name
+    takes_argument: bool = False
+    slow: bool = False  # calls the LLM or rewrites config; kept off the fast lane
+
+# Command table for process_command; a message's first word must equal the command
+COMMAND_ROUTES = (
+    CommandRoute('/status', 'handle_status'),
+    CommandRoute('/generate_strategy', 'handle_strategy', takes_argument=True, slow=True),
+    CommandRoute('/market_analysis', 'handle_market_analysis', takes_argument=True, slow=True),
+    CommandRoute('/update_config', 'handle_config', takes_argument=True, slow=True),
+    CommandRoute('/help', 'handle_help'),
+    CommandRoute('/test_claude', 'handle_test_claude', slow=True),
+)
+
+_TERMINAL = ''
+
+class CommandTrie:
+    """
+    Character trie over command names, built once. ``match`` walks the
+    first word of a message (a ``@botname`` suffix is ignored) and returns
+    the route whose command is that whole word, so lookup cost depends on
+    the message, not on the number of commands.
+    """
+
+    def __init__(self, routes: Iterable[CommandRoute]):
+        self._root: Dict[str, dict] = {}
+        for route in routes:
+            node = self._root
+            for char in route.command:
+                node = node.setdefault(char, {})
+            node[_TERMINAL] = route
+
+    def match(self, text: str) -> Optional[Tuple[CommandRoute, str]]:
+        """``(route, argument)`` for ``text``, or ``None`` if no command matches"""
+        node = self._root
+        end = len(text)
+        for i, char in enumerate(text):
+            if char.isspace() or char == '@':
+                end = i
+                break
+            node = node.get(char)
+            if node is None:
+                return None
+        # The command must end at whitespace, '@' or the end of the text: "/statusx" is not "/status"
+        route = node.get(_TERMINAL)
+        if route is None:
+            return None
+        rest = text[end:]
+        if rest.startswith('@'):
+            parts = rest.split(None, 1)
+            rest = parts[1] if len(parts) > 1 else ''
+        return route, rest.strip()
+
+def permission_sets(permissions: Dict[str, Iterable[str]], commands: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+    """Expand ``COMMAND_PERMISSIONS`` (``'*'`` meaning every command) into a set per role"""
+    commands = frozenset(commands)
+    return {
+        role: commands if '*' in allowed else frozenset(allowed) & commands
+        for role, allowed in permissions.items()
+    }
+
 def authenticate(func: Callable) -> Callable:
     @wraps(func)
     async def wrapper(self, user_id: str, command: str, *args, **kwargs):
@@ -28,8 +150,12 @@ def authenticate(func: Callable) -> Callable:
     return wrapper
 
 class SecureCommands:
+    dispatcher = CommandTrie(COMMAND_ROUTES)
+    role_permissions = permission_sets(COMMAND_PERMISSIONS, (route.command for route in COMMAND_ROUTES))
+
     def __init__(self, freqtrade_assistant):
         self.freqtrade_assistant = freqtrade_assistant
+        self.rate_limiter = RateLimiter(getattr(freqtrade_assistant, 'shared_store', None))
         self.allowed_commands = {
             'start': self.verify_start,
             'stop': self.verify_stop,
@@ -59,79 +185,109 @@ class SecureCommands:
     def _check_permission(self, user_id: str, command: str) -> bool:
         return True if user_id == 'user1' else False
 
+    def permissions_for(self, user_id: str) -> FrozenSet[str]:
+        role = 'admin' if user_id in ADMIN_USERS else 'user'
+        return self.role_permissions.get(role, frozenset())
+
     def validate_command(self, command: str) -> bool:
         valid_commands = ['/status', '/generate_strategy', '/update_config', 
                          '/market_analysis', '/claude', '/help']
         return any(command.startswith(cmd) for cmd in valid_commands)
 
+    def _claude_controller(self):
+        return getattr(self.freqtrade_assistant, 'claude_controller', None)
+
     @authenticate
-    @sleep_and_retry
-    @limits(calls=20, period=60)
+    @rate_limited(calls=20, period=60)
     async def handle_status(self, user_id: str, command: str) -> str:
-        return self.freqtrade._get_status()
+        status = self.freqtrade_assistant.get_status()
+        lines = [
+            f"Assistant: {'running' if status.get('running') else 'stopped'}",
+            f"Cache entries: {status.get('cache_entries', 0)}",
+        ]
+        client = getattr(self.freqtrade_assistant, 'freqtrade_client', None)
+        if client is not None:
+            try:
+                lines.append(f"Open trades: {len(await client.get_status() or [])}")
+            except Exception as e:
+                lines.append(f"Freqtrade unreachable: {e}")
+        return "\n".join(lines)
 
     @authenticate
-    @sleep_and_retry
-    @limits(calls=5, period=60)
+    @rate_limited(calls=5, period=60)
     async def handle_strategy(self, user_id: str, command: str, description: str) -> str:
+        controller = self._claude_controller()
+        if controller is None:
+            return "Claude controller is not configured"
         try:
-            response = await self.freqtrade.claude.messages.create(
-                model="claude-3-sonnet-20241022",
-                messages=[{
-                    "role": "user",
-                    "content": f"Create a detailed trading strategy based on: {description}"
-                }]
-            )
-            return response.content[0].text
+            text = await controller.complete([{
+                "role": "user",
+                "content": f"Create a detailed trading strategy based on: {description}"
+            }])
+            code = extract_code(text)
+            result = validate_strategy(code)
+            reply = f"{text}\n\n{result.summary()}"
+            library = getattr(self.freqtrade_assistant, 'strategy_library', None)
+            if result.valid and library is not None:
+                reply += f"\n{await library.save_generated(code, description)}"
+            return reply
         except Exception as e:
             return f"Strategy generation error: {e}"
 
     @authenticate
-    @sleep_and_retry
-    @limits(calls=10, period=60)
+    @rate_limited(calls=10, period=60)
     async def handle_config(self, user_id: str, command: str, request: str) -> str:
-        return await self.freqtrade.config_manager.update_config(request)
+        return str(await self.freqtrade_assistant.config_manager.update_config(request))
 
     @authenticate
-    async def handle_market_analysis(self, user_id: str, command: str) -> str:
-        return "Market analysis simulation: Currently tracking BTC/USDT, ETH/USDT"
+    @rate_limited(calls=10, period=60)
+    async def handle_market_analysis(self, user_id: str, command: str, question: str) -> str:
+        screener = getattr(self.freqtrade_assistant, 'market_screener', None)
+        if screener is None:
+            return "Market screener is not configured"
+        question = question or "Summarise the current market"
+        controller = getattr(self.freqtrade_assistant, 'claude_controller', None)
+        try:
+            if controller is None:
+                return await asyncio.to_thread(screener.summary)
+            return await controller.analyze_market(question)
+        except Exception as e:
+            return f"Market analysis error: {e}"
 
     @authenticate
     async def handle_help(self, user_id: str, command: str) -> str:
-        return self.freqtrade._get_help()
+        allowed = self.permissions_for(user_id)
+        commands = sorted(route.command + (' <text>' if route.takes_argument else '')
+                          for route in COMMAND_ROUTES if route.command in allowed)
+        return "Available commands:\n" + "\n".join(commands)
 
     @authenticate
+    @rate_limited(calls=5, period=60)
     async def handle_test_claude(self, user_id: str, command: str) -> str:
         """Test Claude API connection"""
+        controller = self._claude_controller()
+        if controller is None:
+            return "Claude controller is not configured"
         try:
-            response = await self.freqtrade.claude.messages.create(
-                model="claude-3-sonnet-20241022",
-                messages=[{
-                    "role": "user",
-                    "content": "Respond with 'Claude 3.5 Sonnet API connection successful!'"
-                }]
-            )
-            return response.content[0].text
+            return await controller.complete([{
+                "role": "user",
+                "content": "Respond with 'Claude API connection successful!'"
+            }])
         except Exception as e:
             return f"Claude API connection failed: {e}"
 
     async def process_command(self, user_id: str, command: str) -> str:
         """Process and route user commands"""
         try:
-            if command.startswith("/status"):
-                return await self.handle_status(user_id, command)
-            elif command.startswith("/generate_strategy"):
-                desc = command[len("/generate_strategy"):].strip()
-                return await self.handle_strategy(user_id, command, desc)
-            elif command.startswith("/market_analysis"):
-                return await self.handle_market_analysis(user_id, command)
-            elif command.startswith("/update_config"):
-                request = command[len("/update_config"):].strip()
-                return await self.handle_config(user_id, command, request)
-            elif command.startswith("/help"):
-                return await self.handle_help(user_id, command)
-            elif command.startswith("/test_claude"):
-                return await self.handle_test_claude(user_id, command)
-            return "Unknown command. Type /help for available commands."
+            match = self.dispatcher.match(command)
+            if match is None:
+                return "Unknown command. Type /help for available commands."
+            route, argument = match
+            if route.command not in self.permissions_for(user_id):
+                return f"Permission denied for {route.command}."
+            handler = getattr(self, route.handler)
+            if route.takes_argument:
+                return await handler(user_id, command, argument)
+            return await handler(user_id, command)
         except Exception as e:
-            return f"Error processing command: {e}"
\ No newline at end of file
+            return f"Error processing command: {e}"
@@ -0,0 +1,229 @@
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+
+STOPWORDS = frozenset("""
+a an the me my i we us our you your please can could would will should to for of on in and or
+that this it is are be based using use some any just
+""".split())
+
+# Words that flip or narrow a request ("with"/"without" a filter, long or short side):
+# like numbers, they must match exactly for a cached answer to be reused
+QUALIFIERS = frozenset("""
+not no never without with except long short above below
+""".split())
+
+# Operator shorthand and verbs that mean the same request
+SYNONYMS = {
+    "strat": "strategy", "strats": "strategy", "strategies": "strategy", "algo": "strategy",
+    "make": "create", "build": "create", "generate": "create", "write": "create", "give": "create",
+    "new": "create", "design": "create",
+    "backtesting": "backtest", "backtests": "backtest", "bt": "backtest",
+    "indicators": "indicator", "signals": "signal", "pairs": "pair",
+    "bollinger": "bbands", "bb": "bbands",
+}
+
+# Requests that change state must always reach the model and the handlers
+MUTATING_PATTERN = re.compile(
+    r"\b(config|configuration|set|change|update|modify|edit|enable|disable|start|stop|restart|"
+    r"force|sell|buy|close|cancel|delete|remove|stake|leverage|whitelist|blacklist|reload)\b",
+    re.IGNORECASE,
+)
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Normalised content words: lower-cased, stopwords dropped, synonyms folded"""
+    tokens = set()
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.add(SYNONYMS.get(token, token))
+    return frozenset(tokens)
+
+
+def _salient(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    # Numbers are parameters (periods, thresholds, timeframes): they must match exactly
+    return frozenset(t for t in tokens if t in QUALIFIERS or any(c.isdigit() for c in t))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class MinHasher:
+    """MinHash signatures from ``num_perm`` universal hash functions over 32-bit token hashes"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                        for _ in range(num_perm)]
+
+    def signature(self, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        if not tokens:
+            return (_MAX_HASH,) * self.num_perm
+        hashes = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=4).digest(), "little") for t in tokens]
+        return tuple(min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in self._params)
+
+
+@dataclass
+class SemanticCacheStats:
+    hits: int = 0
+    misses: int = 0
+    bypassed: int = 0
+    stored: int = 0
+    evictions: int = 0
+    candidates_checked: int = 0
+
+
+@dataclass
+class _Entry:
+    namespace: str
+    text: str
+    tokens: FrozenSet[str]
+    salient: FrozenSet[str]
+    bands: Tuple[int, ...]
+    value: Any
+    expires_at: float
+
+
+class SemanticCache:
+    """
+    Near-duplicate prompt cache.
+
+    Prompts are reduced to normalised token sets and indexed with
+    MinHash-LSH (``bands`` x ``rows`` = ``num_perm``), so a lookup only
+    compares against prompts that share at least one band. Candidates are
+    then verified with exact Jaccard similarity against ``threshold`` and
+    must contain the same numbers and ``QUALIFIERS``. Entries are bounded by ``maxsize``
+    (least recently used evicted first) and ``ttl``. State-changing
+    requests (see ``MUTATING_PATTERN``) are never cached or served.
+    """
+
+    def __init__(self, threshold: float = 0.75, maxsize: int = 1000, ttl: float = 3600.0,
+                 num_perm: int = 64, bands: int = 16, enabled: bool = True):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.stats = SemanticCacheStats()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: List[Dict[Tuple[str, int], set]] = [{} for _ in range(bands)]
+        self._by_tokens: Dict[Tuple[str, FrozenSet[str]], int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "SemanticCache":
+        return cls(**config)
+
+    @staticmethod
+    def is_cacheable(text: str) -> bool:
+        return MUTATING_PATTERN.search(text) is None
+
+    def _band_hashes(self, tokens: FrozenSet[str]) -> Tuple[int, ...]:
+        signature = self.hasher.signature(tokens)
+        rows = self.rows
+        return tuple(hash(signature[i * rows:(i + 1) * rows]) for i in range(self.bands))
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._by_tokens.pop((entry.namespace, entry.tokens), None)
+        for band, band_hash in enumerate(entry.bands):
+            bucket = self._buckets[band].get((entry.namespace, band_hash))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band][(entry.namespace, band_hash)]
+
+    def lookup(self, namespace: str, text: str) -> Optional[Tuple[Any, float]]:
+        """Best cached ``(value, similarity)`` for ``text`` in ``namespace``, if any"""
+        if not self.enabled or not self.is_cacheable(text):
+            self.stats.bypassed += 1
+            return None
+        tokens = tokenize(text)
+        bands = self._band_hashes(tokens)
+        salient = _salient(tokens)
+        now = time.time()
+        with self._lock:
+            candidates = set()
+            for band, band_hash in enumerate(bands):
+                candidates |= self._buckets[band].get((namespace, band_hash), set())
+            best: Optional[Tuple[float, int]] = None
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if entry.expires_at <= now:
+                    self._remove(entry_id)
+                    continue
+                self.stats.candidates_checked += 1
+                if entry.salient != salient:
+                    continue
+                similarity = jaccard(tokens, entry.tokens)
+                if similarity >= self.threshold and (best is None or similarity > best[0]):
+                    best = (similarity, entry_id)
+            if best is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(best[1])
+            self.stats.hits += 1
+            return self._entries[best[1]].value, best[0]
+
+    def store(self, namespace: str, text: str, value: Any) -> bool:
+        if not self.enabled or not self.is_cacheable(text):
+            return False
+        tokens = tokenize(text)
+        if not tokens:
+            return False
+        entry = _Entry(namespace, text, tokens, _salient(tokens), self._band_hashes(tokens), value,
+                       time.time() + self.ttl)
+        with self._lock:
+            previous = self._by_tokens.get((namespace, tokens))
+            if previous is not None:
+                self._remove(previous)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = entry
+            self._by_tokens[(namespace, tokens)] = entry_id
+            for band, band_hash in enumerate(entry.bands):
+                self._buckets[band].setdefault((namespace, band_hash), set()).add(entry_id)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+            self.stats.stored += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tokens.clear()
+            self._buckets = [{} for _ in range(self.bands)]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats.hits + self.stats.misses
+            return {
+                "enabled": self.enabled, "size": len(self._entries), "maxsize": self.maxsize,
+                "threshold": self.threshold,
+                "hit_rate": round(self.stats.hits / lookups, 4) if lookups else 0.0,
+                **asdict(self.stats),
+            }
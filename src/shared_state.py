@@ -0,0 +1,274 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Callable, Awaitable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    """Identity of this worker process, unique across hosts sharing the store"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False):
+    """
+    Advisory ``flock`` on ``path``, created if missing. Exclusive by default;
+    ``shared`` holders only exclude exclusive ones. Locks belong to the open
+    file, so they also serialise threads of one process.
+    """
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class SharedStore:
+    """
+    Cross-process state shared by all uvicorn workers through one SQLite
+    file in WAL mode: namespaced key/value entries with TTL (sessions, job
+    status), token buckets for rate limiting, and leases for leader
+    election. Every operation is a single short transaction; writers that
+    must read-modify-write take ``BEGIN IMMEDIATE`` so they serialise across
+    processes without lost updates.
+    """
+
+    def __init__(self, path: str = "shared_state.db", busy_timeout_ms: int = 5000):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=busy_timeout_ms / 1000, check_same_thread=False,
+                                     isolation_level=None)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={busy_timeout_ms}")
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS kv (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    # --- key/value ---------------------------------------------------------
+
+    def put(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO kv (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, default=str), now + ttl if ttl else None, now))
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE namespace = ? AND key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, key, time.time())).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def delete(self, namespace: str, key: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key)).rowcount > 0
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM kv WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, time.time())).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def touch(self, namespace: str, key: str, ttl: float) -> bool:
+        """Extend a live entry's TTL"""
+        now = time.time()
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE kv SET expires_at = ?, updated_at = ? WHERE namespace = ? AND key = ? "
+                "AND (expires_at IS NULL OR expires_at > ?)", (now + ttl, now, namespace, key, now)).rowcount > 0
+
+    def purge_expired(self) -> int:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                                (time.time(),)).rowcount
+
+    # --- token buckets -----------------------------------------------------
+
+    def try_acquire(self, name: str, rate: float, capacity: float, tokens: float = 1.0) -> Tuple[bool, float]:
+        """
+        Take ``tokens`` from the bucket ``name`` refilled at ``rate`` per
+        second up to ``capacity``. Returns ``(allowed, retry_after_seconds)``.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+            available = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            allowed = available >= tokens
+            if allowed:
+                available -= tokens
+            conn.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                         (name, available, now))
+        return allowed, 0.0 if allowed else (tokens - available) / rate
+
+    # --- leases ------------------------------------------------------------
+
+    def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """Take or renew the lease ``name``; True if ``holder`` owns it afterwards"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("""
+                INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+                WHERE leases.holder = excluded.holder OR leases.expires_at <= ?
+            """, (name, holder, now + ttl, now))
+            row = conn.execute("SELECT holder FROM leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row[0] == holder
+
+    def release_lease(self, name: str, holder: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (name, holder))
+
+    def lease_holder(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT holder FROM leases WHERE name = ? AND expires_at > ?",
+                                     (name, time.time())).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SessionStore:
+    """Sessions visible to every worker, expiring after ``ttl`` seconds of inactivity"""
+
+    NAMESPACE = "sessions"
+
+    def __init__(self, store: SharedStore, ttl: float = 3600.0):
+        self.store = store
+        self.ttl = ttl
+
+    def create(self, data: Dict[str, Any]) -> str:
+        token = os.urandom(16).hex()
+        self.store.put(self.NAMESPACE, token, data, ttl=self.ttl)
+        return token
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        data = self.store.get(self.NAMESPACE, token)
+        if data is not None:
+            self.store.touch(self.NAMESPACE, token, self.ttl)
+        return data
+
+    def update(self, token: str, data: Dict[str, Any]) -> None:
+        self.store.put(self.NAMESPACE, token, data, ttl=self.ttl)
+
+    def delete(self, token: str) -> bool:
+        return self.store.delete(self.NAMESPACE, token)
+
+
+class LeaderElector:
+    """
+    Keeps exactly one worker running background collectors. Each worker
+    tries to take a lease every ``ttl / 3`` seconds; the holder renews it,
+    and if the holder dies the lease expires and another worker takes over.
+    ``on_elected``/``on_demoted`` start and stop the leader-only work.
+    """
+
+    def __init__(self, store: SharedStore, name: str = "background",
+                 ttl: float = 15.0, holder: Optional[str] = None):
+        self.store = store
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or worker_id()
+        self.is_leader = False
+        self._on_elected: List[Callable[[], Awaitable[None]]] = []
+        self._on_demoted: List[Callable[[], Awaitable[None]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def on_elected(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._on_elected.append(callback)
+
+    def on_demoted(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._on_demoted.append(callback)
+
+    async def _run_callbacks(self, callbacks) -> None:
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Leader callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+    async def step(self) -> bool:
+        """One election round; returns whether this worker is leader afterwards"""
+        try:
+            leader = await asyncio.to_thread(self.store.acquire_lease, self.name, self.holder, self.ttl)
+        except sqlite3.Error as e:
+            logger.error(f"Leader election failed: {e}")
+            leader = False
+        if leader and not self.is_leader:
+            logger.info(f"Worker {self.holder} elected leader for {self.name}")
+            self.is_leader = True
+            await self._run_callbacks(self._on_elected)
+        elif not leader and self.is_leader:
+            logger.warning(f"Worker {self.holder} lost leadership of {self.name}")
+            self.is_leader = False
+            await self._run_callbacks(self._on_demoted)
+        return self.is_leader
+
+    async def _run(self) -> None:
+        while True:
+            await self.step()
+            await asyncio.sleep(self.ttl / 3)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            await self._run_callbacks(self._on_demoted)
+            await asyncio.to_thread(self.store.release_lease, self.name, self.holder)
@@ -0,0 +1,105 @@
+import importlib
+import logging
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """
+    Records how long each import and initialisation step takes during
+    startup, plus named milestones (server bound, bot ready, ...), all
+    relative to the moment this module was first imported.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phases: List[Dict[str, Any]] = []
+        self.milestones: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _offset_ms(self, moment: float) -> float:
+        return round((moment - self.origin) * 1000, 3)
+
+    def record(self, name: str, started: float, kind: str = "init") -> None:
+        finished = time.perf_counter()
+        with self._lock:
+            self.phases.append({
+                "name": name, "kind": kind,
+                "start_ms": self._offset_ms(started),
+                "duration_ms": round((finished - started) * 1000, 3),
+            })
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "init"):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started, kind)
+
+    def mark(self, name: str) -> None:
+        """Record a milestone the first time it is reached"""
+        with self._lock:
+            self.milestones.setdefault(name, self._offset_ms(time.perf_counter()))
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p["duration_ms"], reverse=True)
+            return {
+                "milestones_ms": dict(self.milestones),
+                "imports_ms": round(sum(p["duration_ms"] for p in phases if p["kind"] == "import"), 3),
+                "init_ms": round(sum(p["duration_ms"] for p in phases if p["kind"] == "init"), 3),
+                "phases": phases,
+            }
+
+
+profiler = StartupProfiler()
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    After loading, the real module's namespace is copied onto the proxy so
+    later lookups are plain attribute reads. ``from x import y`` cannot be
+    deferred this way; callers reference ``x.y`` instead.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                profiler.record(f"import {self.__name__}", started, kind="import")
+                logger.debug(f"Lazily imported {self.__name__}")
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_module"] = module
+            return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return ``name`` if already imported, otherwise a ``LazyModule`` for it"""
+    module: Optional[types.ModuleType] = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
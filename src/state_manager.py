@@ -0,0 +1,173 @@
+# src/state_manager.py
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from dataclasses import fields, is_dataclass
+from typing import Dict, Any, Callable, List, Tuple, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+_UPSERT_STATE_SQL = """
+    INSERT INTO state (key, value, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+"""
+
+
+class StateManager:
+    """
+    Manages persistent state storage.
+
+    All SQLite work runs on one dedicated writer thread that owns a single
+    long-lived connection (WAL, ``synchronous=NORMAL``). State saves are
+    coalesced: keys written while a flush is in progress are merged and
+    written by the next ``executemany`` batch, so frequent snapshots cost one
+    transaction rather than one per call. The ``*_async`` methods await the
+    writer thread without blocking the event loop.
+    """
+
+    def __init__(self, db_path: str = "freqtrade_ai.db"):
+        self.db_path = db_path
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending: Dict[str, str] = {}
+        self._pending_futures: List[Future] = []
+        self._flush_scheduled = False
+        self._pending_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._closed = False
+        ready: Future = Future()
+        self._thread = threading.Thread(target=self._worker, args=(ready,), name="state-writer", daemon=True)
+        self._thread.start()
+        ready.result()
+
+    def _worker(self, ready: Future) -> None:
+        try:
+            self._conn = sqlite3.connect(self.db_path, cached_statements=256)
+            self._init_db()
+            ready.set_result(None)
+        except Exception as e:
+            ready.set_exception(e)
+            return
+
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            fn, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(self._conn))
+            except Exception as e:
+                future.set_exception(e)
+        self._conn.close()
+
+    def _init_db(self):
+        conn = self._conn
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS strategies (
+                    name TEXT PRIMARY KEY,
+                    code TEXT,
+                    description TEXT,
+                    performance JSON,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def submit(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Run ``fn(connection)`` on the writer thread"""
+        if self._closed:
+            raise RuntimeError("StateManager is closed")
+        future: Future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Awaitable ``submit``"""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    @staticmethod
+    def _encode_state(state: Any) -> Dict[str, str]:
+        if is_dataclass(state):
+            items = [(f.name, getattr(state, f.name)) for f in fields(state)
+                     if f.metadata.get("persist", True)]
+        else:
+            items = list(state.items())
+        encoded = {}
+        for key, value in items:
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, default=str)
+            encoded[key] = str(value)
+        return encoded
+
+    def save_state(self, state: Any) -> Future:
+        """Queue a state snapshot; the future resolves once it is committed"""
+        rows = self._encode_state(state)
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending.update(rows)
+            self._pending_futures.append(future)
+            schedule = not self._flush_scheduled
+            self._flush_scheduled = True
+        if schedule:
+            self.submit(self._flush_pending)
+        return future
+
+    def _flush_pending(self, conn: sqlite3.Connection) -> int:
+        with self._pending_lock:
+            rows: List[Tuple[str, str]] = list(self._pending.items())
+            futures = self._pending_futures
+            self._pending = {}
+            self._pending_futures = []
+            self._flush_scheduled = False
+        try:
+            with conn:
+                conn.executemany(_UPSERT_STATE_SQL, rows)
+        except Exception as e:
+            logger.error(f"State flush failed: {e}")
+            for future in futures:
+                future.set_exception(e)
+            raise
+        for future in futures:
+            future.set_result(len(rows))
+        return len(rows)
+
+    @staticmethod
+    def _read_state(conn: sqlite3.Connection) -> Dict[str, Any]:
+        cursor = conn.execute("SELECT key, value FROM state")
+        return {key: json.loads(value) if value.startswith('{') or value.startswith('[') else value
+                for key, value in cursor.fetchall()}
+
+    def load_state(self) -> Dict[str, Any]:
+        # Runs behind any queued saves, so it always sees them
+        return self.submit(self._read_state).result()
+
+    async def save_state_async(self, state: Any) -> int:
+        return await asyncio.wrap_future(self.save_state(state))
+
+    async def load_state_async(self) -> Dict[str, Any]:
+        return await self.run(self._read_state)
+
+    def close(self) -> None:
+        """Flush outstanding work and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
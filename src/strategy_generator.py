@@ -1,56 +1,156 @@
-from jinja2 import Environment, FileSystemLoader
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
 import os
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+from .state_manager import StateManager
+from .strategy_validator import validate_strategy
+from .startup import lazy_import
+
+jinja2 = lazy_import("jinja2")
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIX = ".py.j2"
+DEFAULTS_SUFFIX = ".defaults.json"
+
+
+def expand_grid(grid: Dict[str, Iterable[Any]]) -> Iterator[Dict[str, Any]]:
+    """Cartesian product of a parameter grid, one dict per combination"""
+    keys = list(grid)
+    for values in itertools.product(*(list(grid[key]) for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def grid_size(grid: Dict[str, Iterable[Any]]) -> int:
+    size = 1
+    for values in grid.values():
+        size *= len(list(values))
+    return size
+
+
+def _class_prefix(template_name: str) -> str:
+    stem = os.path.basename(template_name)
+    if stem.endswith(TEMPLATE_SUFFIX):
+        stem = stem[:-len(TEMPLATE_SUFFIX)]
+    return ''.join(part.capitalize() for part in stem.replace('-', '_').split('_') if part)
+
 
 class StrategyGenerator:
-    """Generates FreqTrade strategy files from templates"""
-    def __init__(self, template_dir: str = "templates"):
-        pass
+    """
+    Generates FreqTrade strategy files from templates
 
-# src/state_manager.py
-import sqlite3
-from dataclasses import asdict
-import json
+    Templates are compiled once per process (and, with ``cache_dir``, once
+    across processes via Jinja's bytecode cache); each render is then a plain
+    function call, so parameter grids expand at thousands of strategies per
+    second without any LLM involvement. A ``<name>.defaults.json`` file next
+    to a template supplies values for parameters the grid does not vary.
+    """
+    def __init__(self, template_dir: str = "templates", cache_dir: Optional[str] = None):
+        self.template_dir = template_dir
+        bytecode_cache = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(template_dir),
+            bytecode_cache=bytecode_cache,
+            undefined=jinja2.StrictUndefined,
+            auto_reload=False,
+            keep_trailing_newline=True,
+        )
+        self.env.filters['pyrepr'] = repr
+        self._templates: Dict[str, Tuple["jinja2.Template", Dict[str, Any]]] = {}
+
+    def list_templates(self) -> List[str]:
+        return self.env.list_templates(filter_func=lambda name: name.endswith(TEMPLATE_SUFFIX))
+
+    def _load(self, template_name: str) -> Tuple["jinja2.Template", Dict[str, Any]]:
+        loaded = self._templates.get(template_name)
+        if loaded is None:
+            template = self.env.get_template(template_name)
+            defaults: Dict[str, Any] = {}
+            defaults_path = os.path.join(self.template_dir, template_name[:-len(TEMPLATE_SUFFIX)] + DEFAULTS_SUFFIX) \
+                if template_name.endswith(TEMPLATE_SUFFIX) else None
+            if defaults_path and os.path.exists(defaults_path):
+                with open(defaults_path) as f:
+                    defaults = json.load(f)
+            loaded = self._templates[template_name] = (template, defaults)
+        return loaded
+
+    @staticmethod
+    def strategy_name(template_name: str, params: Dict[str, Any]) -> str:
+        """Stable class name derived from the template and its parameters"""
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:10]
+        return f"{_class_prefix(template_name)}_{digest}"
+
+    def render(self, template_name: str, params: Optional[Dict[str, Any]] = None,
+               strategy_name: Optional[str] = None) -> Tuple[str, str]:
+        """Render one strategy; returns ``(class_name, code)``"""
+        template, defaults = self._load(template_name)
+        context = {**defaults, **(params or {})}
+        name = strategy_name or self.strategy_name(template_name, context)
+        return name, template.render(context, strategy_name=name, template_name=template_name)
+
+    def iter_strategies(self, template_name: str, grid: Dict[str, Iterable[Any]]
+                        ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Lazily render every grid combination as ``(class_name, code, params)``"""
+        for params in expand_grid(grid):
+            name, code = self.render(template_name, params)
+            yield name, code, params
+
+    def write_strategies(self, template_name: str, grid: Dict[str, Iterable[Any]], output_dir: str) -> int:
+        """Stream every grid combination to ``output_dir/<class_name>.py``"""
+        os.makedirs(output_dir, exist_ok=True)
+        written = 0
+        for name, code, _ in self.iter_strategies(template_name, grid):
+            with open(os.path.join(output_dir, f"{name}.py"), "w") as f:
+                f.write(code)
+            written += 1
+        logger.info(f"Generated {written} strategies from {template_name} into {output_dir}")
+        return written
 
-class StateManager:
-    """Manages persistent state storage"""
-    def __init__(self, db_path: str = "freqtrade_ai.db"):
-        self.db_path = db_path
-        self._init_db()
-
-    def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS state (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS strategies (
-                    name TEXT PRIMARY KEY,
-                    code TEXT,
-                    description TEXT,
-                    performance JSON,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-
-    def save_state(self, state: SystemState):
-        with sqlite3.connect(self.db_path) as conn:
-            state_dict = asdict(state)
-            for key, value in state_dict.items():
-                if isinstance(value, (dict, list)):
-                    value = json.dumps(value)
-                conn.execute(
-                    "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
-                    (key, str(value))
-                )
-
-    def load_state(self) -> Dict[str, Any]:
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("SELECT key, value FROM state")
-            return {key: json.loads(value) if value.startswith('{') or value.startswith('[') else value 
-                    for key, value in cursor.fetchall()}
+    def _render_batch(self, template_name: str, combinations: List[Dict[str, Any]]
+                      ) -> Tuple[List[Dict[str, str]], int]:
+        """Render and validate a batch; returns library rows and the number rejected"""
+        rows: List[Dict[str, str]] = []
+        invalid = 0
+        for params in combinations:
+            try:
+                name, code = self.render(template_name, params)
+            except (TypeError, ValueError, jinja2.TemplateError) as e:
+                # e.g. a string where the template does arithmetic on a period
+                logger.warning(f"Could not render {template_name} with {params}: {e}")
+                invalid += 1
+                continue
+            result = validate_strategy(code)
+            if not result.valid:
+                logger.warning(f"Rendered {name} failed validation: {[str(i) for i in result.errors]}")
+                invalid += 1
+                continue
+            rows.append({"name": name, "code": code,
+                         "description": f"{template_name} {json.dumps(params, sort_keys=True, default=str)}"})
+        return rows, invalid
 
+    async def add_to_library(self, library, template_name: str, grid: Dict[str, Iterable[Any]],
+                             batch_size: int = 500) -> Dict[str, int]:
+        """
+        Stream every grid combination into a ``StrategyLibrary`` in batches.
+        Rendering and validation run on a worker thread; combinations that
+        fail validation are counted as ``invalid`` and not stored.
+        """
+        totals = {"added": 0, "skipped": 0, "invalid": 0}
+        combinations = expand_grid(grid)
+        while True:
+            chunk = list(itertools.islice(combinations, batch_size))
+            if not chunk:
+                break
+            rows, invalid = await asyncio.to_thread(self._render_batch, template_name, chunk)
+            totals["invalid"] += invalid
+            if rows:
+                result = await library.add_many(rows)
+                totals["added"] += result["added"]
+                totals["skipped"] += result["skipped"]
+        return totals
@@ -0,0 +1,342 @@
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Dict, Any, Optional, List
+from .state_manager import StateManager
+
+logger = logging.getLogger(__name__)
+
+# Backtest metrics stored as real columns so they can be filtered and ranked
+METRIC_COLUMNS = {
+    'sharpe': 'REAL',
+    'sortino': 'REAL',
+    'profit_total': 'REAL',
+    'max_drawdown': 'REAL',
+    'win_rate': 'REAL',
+    'trade_count': 'INTEGER',
+}
+
+_ADDED_COLUMNS = {'ast_hash': 'TEXT', 'backtested_at': 'TIMESTAMP', **METRIC_COLUMNS}
+
+# Backtest result keys (freqtrade's and BacktestStore's) that name the same metric
+_METRIC_ALIASES = {
+    'profit': 'profit_total', 'winrate': 'win_rate', 'total_trades': 'trade_count',
+    'max_drawdown_account': 'max_drawdown', 'sharpe_ratio': 'sharpe', 'sortino_ratio': 'sortino',
+}
+
+_UPSERT_SQL = """
+    INSERT INTO strategies (name, code, description, ast_hash) VALUES (?, ?, ?, ?)
+    ON CONFLICT(name) DO UPDATE SET code = excluded.code,
+        description = excluded.description, ast_hash = excluded.ast_hash,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+class _Normalizer(ast.NodeTransformer):
+    """Strips docstrings and renames classes, arguments and locals to positional names"""
+
+    def __init__(self):
+        self._classes: Dict[str, str] = {}
+        self._locals: List[Dict[str, str]] = []
+
+    @staticmethod
+    def _strip_docstring(node):
+        body = node.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], 'value', None), ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            node.body = body[1:] or [ast.Pass()]
+        return node
+
+    def visit_Module(self, node):
+        self._strip_docstring(node)
+        return self.generic_visit(node)
+
+    def visit_ClassDef(self, node):
+        self._strip_docstring(node)
+        node.name = self._classes.setdefault(node.name, f"C{len(self._classes)}")
+        return self.generic_visit(node)
+
+    def _visit_function(self, node):
+        self._strip_docstring(node)
+        self._locals.append({})
+        node = self.generic_visit(node)
+        self._locals.pop()
+        return node
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def _local(self, name: str, define: bool) -> str:
+        scope = self._locals[-1]
+        if name in scope:
+            return scope[name]
+        if define:
+            scope[name] = f"v{len(scope)}"
+            return scope[name]
+        return self._classes.get(name, name)
+
+    def visit_arg(self, node):
+        if self._locals and node.arg != 'self':
+            node.arg = self._local(node.arg, define=True)
+        node.annotation = None
+        return node
+
+    def visit_Name(self, node):
+        if self._locals and node.id != 'self':
+            node.id = self._local(node.id, define=isinstance(node.ctx, ast.Store))
+        else:
+            node.id = self._classes.get(node.id, node.id)
+        return node
+
+
+def normalized_ast_hash(code: str) -> str:
+    """
+    Hash of the code's AST with formatting, comments, docstrings, class
+    names and local variable names normalised away. Raises ``SyntaxError``
+    for code that does not parse.
+    """
+    tree = _Normalizer().visit(ast.parse(code))
+    dumped = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    return hashlib.sha256(dumped.encode('utf-8')).hexdigest()
+
+
+def strategy_class_name(code: str) -> Optional[str]:
+    """Name of the first class defined in ``code``"""
+    try:
+        for node in ast.parse(code).body:
+            if isinstance(node, ast.ClassDef):
+                return node.name
+    except SyntaxError:
+        pass
+    return None
+
+
+_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS strategies_fts USING fts5(
+        name, description, code, content='strategies', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS strategies_fts_insert AFTER INSERT ON strategies BEGIN
+        INSERT INTO strategies_fts (rowid, name, description, code)
+        VALUES (new.rowid, new.name, new.description, new.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS strategies_fts_delete AFTER DELETE ON strategies BEGIN
+        INSERT INTO strategies_fts (strategies_fts, rowid, name, description, code)
+        VALUES ('delete', old.rowid, old.name, old.description, old.code);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS strategies_fts_update
+    AFTER UPDATE OF name, description, code ON strategies BEGIN
+        INSERT INTO strategies_fts (strategies_fts, rowid, name, description, code)
+        VALUES ('delete', old.rowid, old.name, old.description, old.code);
+        INSERT INTO strategies_fts (rowid, name, description, code)
+        VALUES (new.rowid, new.name, new.description, new.code);
+    END
+    """,
+)
+
+
+def _fts_query(text: str) -> str:
+    """Quote every term so user input cannot inject FTS5 syntax"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+class StrategyLibrary:
+    """
+    Searchable store of generated strategies on top of ``StateManager``.
+
+    Strategies are deduplicated by a normalised-AST hash before insertion, an
+    FTS5 index covers name/description/code, and backtest metrics live in
+    indexed columns so rankings such as top-N by Sharpe are plain index scans.
+    """
+
+    def __init__(self, state_manager: StateManager):
+        self.state_manager = state_manager
+        self._ready = state_manager.submit(self._migrate)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(strategies)")}
+        # DDL does not open a transaction implicitly (and executescript would
+        # COMMIT first), so begin one explicitly: the migration applies whole or not at all
+        with conn:
+            conn.execute("BEGIN")
+            for column, column_type in _ADDED_COLUMNS.items():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE strategies ADD COLUMN {column} {column_type}")
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_strategies_ast_hash
+                ON strategies (ast_hash) WHERE ast_hash IS NOT NULL
+            """)
+            for column in METRIC_COLUMNS:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_strategies_{column} ON strategies ({column} DESC)")
+            has_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'strategies_fts'").fetchone()
+            for statement in _FTS_SCHEMA:
+                conn.execute(statement)
+            if not has_fts:
+                conn.execute("INSERT INTO strategies_fts (strategies_fts) VALUES ('rebuild')")
+
+        # Backfill hashes for rows written before deduplication existed
+        missing = conn.execute("SELECT name, code FROM strategies WHERE ast_hash IS NULL").fetchall()
+        with conn:
+            for name, code in missing:
+                try:
+                    conn.execute("UPDATE OR IGNORE strategies SET ast_hash = ? WHERE name = ?",
+                                 (normalized_ast_hash(code or ''), name))
+                except SyntaxError:
+                    logger.warning(f"Stored strategy {name} does not parse; left unhashed")
+
+    async def _run(self, fn):
+        await self._wrap_ready()
+        return await self.state_manager.run(fn)
+
+    async def _wrap_ready(self) -> None:
+        if self._ready.done():
+            self._ready.result()
+        else:
+            await asyncio.wrap_future(self._ready)
+
+    async def find_duplicate(self, code: str) -> Optional[str]:
+        """Name of a stored strategy with the same normalised AST, if any"""
+        ast_hash = normalized_ast_hash(code)
+        row = await self._run(lambda conn: conn.execute(
+            "SELECT name FROM strategies WHERE ast_hash = ?", (ast_hash,)).fetchone())
+        return row[0] if row else None
+
+    async def add_strategy(self, code: str, description: str = "", name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Store a strategy unless a structurally identical one exists.
+        Returns ``{"name", "added", "duplicate_of", "ast_hash"}``.
+        """
+        try:
+            ast_hash = normalized_ast_hash(code)
+        except SyntaxError as e:
+            raise ValueError(f"Strategy code does not parse: {e}") from e
+        name = name or strategy_class_name(code) or f"strategy_{ast_hash[:12]}"
+
+        def insert(conn: sqlite3.Connection) -> Dict[str, Any]:
+            row = conn.execute("SELECT name FROM strategies WHERE ast_hash = ?", (ast_hash,)).fetchone()
+            if row:
+                return {"name": name, "added": False, "duplicate_of": row[0], "ast_hash": ast_hash}
+            with conn:
+                conn.execute(_UPSERT_SQL, (name, code, description, ast_hash))
+            return {"name": name, "added": True, "duplicate_of": None, "ast_hash": ast_hash}
+
+        return await self._run(insert)
+
+    async def save_generated(self, code: str, description: str = "") -> str:
+        """``add_strategy`` for model output; returns a line telling the user what happened"""
+        try:
+            stored = await self.add_strategy(code, description)
+        except ValueError:
+            return "Not saved to the strategy library: the code does not parse."
+        if stored["added"]:
+            return f"Saved to the strategy library as {stored['name']}."
+        return f"Same as library strategy {stored['duplicate_of']}; not saved again."
+
+    async def add_many(self, strategies: List[Dict[str, str]]) -> Dict[str, int]:
+        """
+        Bulk ``add_strategy`` in one transaction: ``{"code", "description",
+        "name"}`` dicts whose AST is already stored are skipped, an existing
+        name is replaced.
+        """
+        rows = []
+        for strategy in strategies:
+            code = strategy['code']
+            ast_hash = normalized_ast_hash(code)
+            name = strategy.get('name') or strategy_class_name(code) or f"strategy_{ast_hash[:12]}"
+            rows.append((name, code, strategy.get('description', ''), ast_hash))
+
+        def insert(conn: sqlite3.Connection) -> Dict[str, int]:
+            added = 0
+            with conn:
+                for row in rows:
+                    if conn.execute("SELECT 1 FROM strategies WHERE ast_hash = ?", (row[3],)).fetchone():
+                        continue
+                    conn.execute(_UPSERT_SQL, row)
+                    added += 1
+            return {"added": added, "skipped": len(rows) - added}
+
+        return await self._run(insert)
+
+    async def record_backtest(self, name: str, results: Dict[str, Any]) -> bool:
+        """
+        Store backtest results: known metrics as columns, everything as JSON.
+        Returns False if no strategy is stored under ``name``.
+        """
+        metrics = {_METRIC_ALIASES.get(key, key): value for key, value in results.items()}
+        values = [metrics.get(column) for column in METRIC_COLUMNS]
+        assignments = ', '.join(f"{column} = ?" for column in METRIC_COLUMNS)
+
+        def update(conn: sqlite3.Connection) -> bool:
+            with conn:
+                cursor = conn.execute(f"""
+                    UPDATE strategies SET {assignments}, performance = ?,
+                        backtested_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP
+                    WHERE name = ?
+                """, (*values, json.dumps(results, default=str), name))
+            return cursor.rowcount > 0
+
+        return await self._run(update)
+
+    async def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over name, description and code, best matches first"""
+        fts_query = _fts_query(query)
+        if not fts_query:
+            return []
+
+        def run(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            cursor = conn.execute("""
+                SELECT s.name, s.description, s.sharpe, s.profit_total,
+                       snippet(strategies_fts, 2, '[', ']', '...', 12) AS snippet
+                FROM strategies_fts JOIN strategies s ON s.rowid = strategies_fts.rowid
+                WHERE strategies_fts MATCH ?
+                ORDER BY bm25(strategies_fts)
+                LIMIT ?
+            """, (fts_query, limit))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        return await self._run(run)
+
+    async def top(self, metric: str = 'sharpe', limit: int = 20, min_trades: int = 0) -> List[Dict[str, Any]]:
+        """Best strategies by a backtest metric (lowest first for max_drawdown)"""
+        if metric not in METRIC_COLUMNS:
+            raise ValueError(f"Unknown metric: {metric}")
+        order = 'ASC' if metric == 'max_drawdown' else 'DESC'
+
+        def run(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            cursor = conn.execute(f"""
+                SELECT name, description, {', '.join(METRIC_COLUMNS)}, backtested_at
+                FROM strategies
+                WHERE {metric} IS NOT NULL AND COALESCE(trade_count, 0) >= ?
+                ORDER BY {metric} {order}
+                LIMIT ?
+            """, (min_trades, limit))
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        return await self._run(run)
+
+    async def get(self, name: str) -> Optional[Dict[str, Any]]:
+        def run(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            cursor = conn.execute("SELECT * FROM strategies WHERE name = ?", (name,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            result = dict(zip([c[0] for c in cursor.description], row))
+            if result.get('performance'):
+                result['performance'] = json.loads(result['performance'])
+            return result
+
+        return await self._run(run)
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+import traceback
+import types
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+from .strategy_validator import validate_strategy
+
+logger = logging.getLogger(__name__)
+
+PRELOAD_MODULES = ["numpy", "pandas", "src.sandbox_stubs"]
+# Everything else (API keys, tokens, DSNs) is removed from a worker's environment
+ENV_ALLOWLIST = ("PATH", "LANG", "LC_ALL", "LC_CTYPE", "TZ", "TMPDIR", "PYTHONHASHSEED")
+ENTRY_COLUMNS = ("enter_long", "enter_short", "buy")
+EXIT_COLUMNS = ("exit_long", "exit_short", "sell")
+
+
+@dataclass
+class SandboxResult:
+    ok: bool
+    class_name: Optional[str] = None
+    error: Optional[str] = None
+    traceback: Optional[str] = None
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    rows: int = 0
+    entry_signals: int = 0
+    exit_signals: int = 0
+    stubbed: List[str] = field(default_factory=list)
+    worker_pid: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class SandboxTimeout(Exception):
+    pass
+
+
+class SandboxCheckFailed(Exception):
+    """Raised by the harness itself, so its message is safe to return"""
+
+
+# --- worker side -----------------------------------------------------------
+
+_fixture = None
+_stubs_installed = False
+
+
+def fixture_frame(rows: int = 500, seed: int = 42):
+    """Deterministic random-walk OHLCV frame for smoke tests"""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.005, rows)) * close
+    return pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=rows, freq="5min", tz="UTC"),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.uniform(10, 1000, rows),
+    })
+
+
+def _on_alarm(signum, frame):
+    raise SandboxTimeout("Strategy exceeded its time limit")
+
+
+def _vm_size_bytes() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmSize:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def _init_worker(memory_mb: int, max_open_files: int, fixture_rows: int) -> None:
+    global _fixture, _stubs_installed
+    for name in [name for name in os.environ if name not in ENV_ALLOWLIST]:
+        del os.environ[name]
+    from . import sandbox_stubs
+    _stubs_installed = sandbox_stubs.install()
+    _fixture = fixture_frame(fixture_rows)
+    signal.signal(signal.SIGALRM, _on_alarm)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        import resource
+        if memory_mb:
+            limit = _vm_size_bytes() + memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        # No file writes and few descriptors; the pool's pipes are already open
+        signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+        resource.setrlimit(resource.RLIMIT_FSIZE, (0, 0))
+        if max_open_files:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (max_open_files, max_open_files))
+    except (ImportError, ValueError, OSError) as e:
+        logger.warning(f"Sandbox worker could not apply resource limits: {e}")
+
+
+def _count_signals(dataframe, columns) -> int:
+    return int(sum(dataframe[c].fillna(0).astype(bool).sum() for c in columns if c in dataframe.columns))
+
+
+def _run_job(code: str, timeout: float) -> Dict[str, Any]:
+    import pandas as pd
+    from .sandbox_stubs import stubbed_calls
+    result = SandboxResult(ok=False, worker_pid=os.getpid())
+    timings = result.timings_ms
+    stubbed_calls.clear()
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        started = time.perf_counter()
+        module = types.ModuleType("sandbox_strategy")
+        exec(compile(code, "<strategy>", "exec"), module.__dict__)
+        timings["import"] = (time.perf_counter() - started) * 1000
+
+        base = sys.modules["freqtrade.strategy"].IStrategy
+        classes = [obj for obj in module.__dict__.values()
+                   if isinstance(obj, type) and issubclass(obj, base) and obj is not base]
+        if not classes:
+            raise SandboxCheckFailed("No IStrategy subclass defined")
+        strategy_cls = classes[0]
+        result.class_name = strategy_cls.__name__
+        strategy = strategy_cls({"timeframe": getattr(strategy_cls, "timeframe", "5m"), "stake_currency": "USDT",
+                                 "dry_run": True, "runmode": "other"})
+
+        dataframe = _fixture.copy()
+        metadata = {"pair": "BTC/USDT"}
+        steps = [("populate_indicators", "indicators")]
+        if hasattr(strategy, "populate_entry_trend") and type(strategy).populate_entry_trend is not getattr(
+                base, "populate_entry_trend", None):
+            steps += [("populate_entry_trend", "entry"), ("populate_exit_trend", "exit")]
+        else:
+            steps += [("populate_buy_trend", "entry"), ("populate_sell_trend", "exit")]
+        for method, label in steps:
+            started = time.perf_counter()
+            returned = getattr(strategy, method)(dataframe, metadata)
+            timings[label] = (time.perf_counter() - started) * 1000
+            if not isinstance(returned, pd.DataFrame):
+                raise SandboxCheckFailed(f"{method} returned {type(returned).__name__}, expected DataFrame")
+            if len(returned) != len(_fixture):
+                raise SandboxCheckFailed(f"{method} changed the row count from {len(_fixture)} to {len(returned)}")
+            dataframe = returned
+
+        result.rows = len(dataframe)
+        result.entry_signals = _count_signals(dataframe, ENTRY_COLUMNS)
+        result.exit_signals = _count_signals(dataframe, EXIT_COLUMNS)
+        result.ok = True
+    except BaseException as e:  # generated code may raise anything, including SystemExit
+        result.error, result.traceback = _describe_failure(e)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    result.stubbed = sorted(stubbed_calls)
+    return result.to_dict()
+
+
+def _describe_failure(error: BaseException):
+    """
+    Error text and strategy-frame traceback for a failed job. Messages (and
+    custom exception names) from untrusted code are dropped, since they can
+    carry anything the code managed to read.
+    """
+    if isinstance(error, (SandboxTimeout, SandboxCheckFailed)):
+        message = f"{type(error).__name__}: {error}"
+    elif type(error).__module__ == "builtins":
+        message = f"{type(error).__name__} raised by the strategy"
+    else:
+        message = "Exception raised by the strategy"
+    frames = [frame for frame in traceback.extract_tb(error.__traceback__) if frame.filename == "<strategy>"]
+    return message, "".join(f'  File "<strategy>", line {frame.lineno}, in {frame.name}\n' for frame in frames)
+
+
+# --- parent side -----------------------------------------------------------
+
+def _pool_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # The fork server imports these once; every worker forks from it warm
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+class StrategySandbox:
+    """
+    Pool of pre-forked, resource-limited worker processes that import and
+    smoke-test generated strategies.
+
+    Workers fork from a fork server that has numpy/pandas preloaded, so
+    starting one costs a ``fork`` rather than an interpreter boot. Each job
+    imports the strategy, runs ``populate_indicators`` and the entry/exit
+    methods on a fixture frame under a wall-clock alarm, and reports timings
+    and errors. Workers are replaced after ``max_tasks_per_worker`` jobs so
+    leaked state does not accumulate; a worker that stops responding causes
+    the whole pool to be recycled.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_tasks_per_worker: int = 50, timeout: float = 10.0,
+                 memory_mb: int = 512, max_open_files: int = 64, fixture_rows: int = 500, validate: bool = True):
+        self.workers = workers or max(1, min(4, os.cpu_count() or 1))
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.max_open_files = max_open_files
+        self.fixture_rows = fixture_rows
+        self.validate = validate
+        self._pool = None
+        # One job per worker at a time, so the response timeout never counts time spent queued
+        self._slots = asyncio.Semaphore(self.workers)
+        self.stats = {"jobs": 0, "failed": 0, "rejected": 0, "pool_restarts": 0}
+
+    def start(self) -> None:
+        if self._pool is None:
+            self._pool = _pool_context().Pool(
+                self.workers,
+                initializer=_init_worker,
+                initargs=(self.memory_mb, self.max_open_files, self.fixture_rows),
+                maxtasksperchild=self.max_tasks_per_worker,
+            )
+
+    def _restart(self) -> None:
+        logger.warning("Recycling unresponsive strategy sandbox pool")
+        self.stats["pool_restarts"] += 1
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+        self.start()
+
+    async def run(self, code: str) -> SandboxResult:
+        """Smoke-test one strategy in a worker process"""
+        if self.validate:
+            validation = validate_strategy(code)
+            if not validation.valid:
+                self.stats["rejected"] += 1
+                return SandboxResult(ok=False, class_name=validation.class_name,
+                                     error=f"Rejected by static validation: {validation.summary()}")
+        async with self._slots:
+            self.start()
+            pool = self._pool
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+
+            def resolve(value):
+                if not future.done():
+                    future.set_result(value)
+
+            def fail(error):
+                if not future.done():
+                    future.set_exception(error)
+
+            pool.apply_async(
+                _run_job, (code, self.timeout),
+                callback=lambda value: loop.call_soon_threadsafe(resolve, value),
+                error_callback=lambda error: loop.call_soon_threadsafe(fail, error),
+            )
+            self.stats["jobs"] += 1
+            try:
+                # The in-worker alarm fires first; this only catches hung or killed workers
+                result = SandboxResult(**await asyncio.wait_for(future, self.timeout + 5))
+            except asyncio.TimeoutError:
+                if self._pool is pool:
+                    self._restart()
+                result = SandboxResult(ok=False, error="Sandbox worker did not respond")
+            except Exception as e:
+                result = SandboxResult(ok=False, error=f"Sandbox failure: {e}")
+        if not result.ok:
+            self.stats["failed"] += 1
+        return result
+
+    async def run_many(self, codes: List[str]) -> List[SandboxResult]:
+        return await asyncio.gather(*(self.run(code) for code in codes))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    async def __aenter__(self) -> "StrategySandbox":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
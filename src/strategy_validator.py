@@ -0,0 +1,261 @@
+import ast
+import hashlib
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional
+from cachetools import LRUCache
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_ATTRIBUTES = ("minimal_roi", "stoploss")
+RECOMMENDED_ATTRIBUTES = ("timeframe",)
+ENTRY_EXIT_METHODS = ("populate_entry_trend", "populate_exit_trend")
+LEGACY_ENTRY_EXIT_METHODS = ("populate_buy_trend", "populate_sell_trend")
+
+FORBIDDEN_MODULES = {
+    "os", "sys", "subprocess", "shutil", "socket", "pickle", "marshal", "ctypes",
+    "importlib", "builtins", "multiprocessing", "threading", "requests", "urllib",
+    "http", "ftplib", "telnetlib", "smtplib", "pty", "signal",
+}
+FORBIDDEN_CALLS = {"eval", "exec", "compile", "open", "__import__", "input", "breakpoint", "globals", "vars"}
+FORBIDDEN_ATTRIBUTES = {"__subclasses__", "__globals__", "__builtins__", "__code__", "__bases__", "__mro__"}
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)?\s*\n(.*?)```", re.DOTALL)
+
+
+def extract_code(text: str) -> str:
+    """Python source from an LLM response: the largest fenced block, or the text itself"""
+    blocks = _CODE_BLOCK.findall(text or "")
+    return max(blocks, key=len) if blocks else (text or "")
+
+
+@dataclass
+class ValidationIssue:
+    severity: str  # "error" or "warning"
+    message: str
+    line: Optional[int] = None
+
+    def __str__(self) -> str:
+        where = f"line {self.line}: " if self.line else ""
+        return f"[{self.severity}] {where}{self.message}"
+
+
+@dataclass
+class ValidationResult:
+    valid: bool
+    code_hash: str
+    class_name: Optional[str] = None
+    issues: List[ValidationIssue] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def errors(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == "error"]
+
+    @property
+    def warnings(self) -> List[ValidationIssue]:
+        return [issue for issue in self.issues if issue.severity == "warning"]
+
+    def summary(self) -> str:
+        if not self.issues:
+            return f"Strategy {self.class_name} passed validation"
+        status = "passed with warnings" if self.valid else "failed validation"
+        return "\n".join([f"Strategy {self.class_name or '<unknown>'} {status}:"] + [str(i) for i in self.issues])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _is_istrategy(node: ast.ClassDef) -> bool:
+    for base in node.bases:
+        name = base.attr if isinstance(base, ast.Attribute) else getattr(base, "id", None)
+        if name == "IStrategy":
+            return True
+    return False
+
+
+def _negative_number(node: Optional[ast.AST]) -> bool:
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        return isinstance(node.operand, ast.Constant) and isinstance(node.operand.value, (int, float)) \
+            and node.operand.value > 0
+    return isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and node.value < 0
+
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, SyntaxError, TypeError):
+        return None
+
+
+class _Checker(ast.NodeVisitor):
+    """Single pass over the tree collecting safety and lookahead issues"""
+
+    def __init__(self):
+        self.issues: List[ValidationIssue] = []
+        self._function: Optional[str] = None
+
+    def _add(self, severity: str, message: str, node: ast.AST) -> None:
+        self.issues.append(ValidationIssue(severity, message, getattr(node, "lineno", None)))
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.name.split(".")[0] in FORBIDDEN_MODULES:
+                self._add("error", f"Forbidden import: {alias.name}", node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.module and node.module.split(".")[0] in FORBIDDEN_MODULES:
+            self._add("error", f"Forbidden import: {node.module}", node)
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        outer, self._function = self._function, node.name
+        self.generic_visit(node)
+        self._function = outer
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if node.attr in FORBIDDEN_ATTRIBUTES:
+            self._add("error", f"Forbidden attribute access: {node.attr}", node)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if isinstance(func, ast.Name) and func.id in FORBIDDEN_CALLS:
+            self._add("error", f"Forbidden call: {func.id}()", node)
+        elif isinstance(func, ast.Attribute):
+            if func.attr == "shift":
+                periods = node.args[0] if node.args else next(
+                    (kw.value for kw in node.keywords if kw.arg == "periods"), None)
+                if _negative_number(periods):
+                    self._add("error", "Lookahead bias: shift() with a negative period reads future candles", node)
+            elif func.attr in ("rolling", "ewm"):
+                for kw in node.keywords:
+                    if kw.arg == "center" and getattr(kw.value, "value", False) is True:
+                        self._add("error", "Lookahead bias: centred rolling window uses future candles", node)
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        # dataframe.iloc[-1] inside populate_* broadcasts the last candle to every row
+        if self._function and self._function.startswith("populate_") \
+                and isinstance(node.value, ast.Attribute) and node.value.attr in ("iloc", "iat") \
+                and _negative_number(node.slice):
+            self._add("warning", f"Possible lookahead bias: .{node.value.attr}[-n] in {self._function}", node)
+        self.generic_visit(node)
+
+
+class StrategyValidator:
+    """
+    AST-based static validator for freqtrade strategies.
+
+    Checks syntax, the ``IStrategy`` contract (required methods and
+    attributes), forbidden imports/calls and obvious lookahead patterns.
+    Results are cached by the SHA-256 of the source, so re-validating code
+    that has been seen before is a dictionary lookup.
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def validate(self, code: str) -> ValidationResult:
+        code_hash = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._cache.get(code_hash)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        started = time.perf_counter()
+        result = self._validate(code, code_hash)
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._cache[code_hash] = result
+        return result
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def _validate(self, code: str, code_hash: str) -> ValidationResult:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            return ValidationResult(False, code_hash, issues=[
+                ValidationIssue("error", f"Syntax error: {e.msg}", e.lineno)])
+
+        checker = _Checker()
+        checker.visit(tree)
+        issues = checker.issues
+
+        strategies = [node for node in tree.body if isinstance(node, ast.ClassDef) and _is_istrategy(node)]
+        if not strategies:
+            issues.append(ValidationIssue("error", "No class inheriting from IStrategy"))
+            return ValidationResult(False, code_hash, issues=issues)
+        strategy = strategies[0]
+        issues.extend(self._check_contract(strategy))
+
+        return ValidationResult(not any(i.severity == "error" for i in issues), code_hash, strategy.name, issues)
+
+    @staticmethod
+    def _check_contract(strategy: ast.ClassDef) -> List[ValidationIssue]:
+        issues: List[ValidationIssue] = []
+        methods = {node.name: node for node in strategy.body
+                   if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+        attributes: Dict[str, ast.AST] = {}
+        for node in strategy.body:
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        attributes[target.id] = node.value
+            elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+                attributes[node.target.id] = node.value
+
+        if "populate_indicators" not in methods:
+            issues.append(ValidationIssue("error", "Missing method: populate_indicators", strategy.lineno))
+        if all(name in methods for name in ENTRY_EXIT_METHODS):
+            pass
+        elif all(name in methods for name in LEGACY_ENTRY_EXIT_METHODS):
+            issues.append(ValidationIssue(
+                "warning", "Uses legacy populate_buy_trend/populate_sell_trend", strategy.lineno))
+        else:
+            missing = [name for name in ENTRY_EXIT_METHODS if name not in methods]
+            issues.append(ValidationIssue("error", f"Missing method(s): {', '.join(missing)}", strategy.lineno))
+
+        for name, method in methods.items():
+            if name.startswith("populate_") and not any(isinstance(n, ast.Return) and n.value is not None
+                                                        for n in ast.walk(method)):
+                issues.append(ValidationIssue("error", f"{name} does not return the dataframe", method.lineno))
+
+        for name in REQUIRED_ATTRIBUTES:
+            if name not in attributes:
+                issues.append(ValidationIssue("error", f"Missing attribute: {name}", strategy.lineno))
+        for name in RECOMMENDED_ATTRIBUTES:
+            if name not in attributes:
+                issues.append(ValidationIssue("warning", f"Missing attribute: {name} (taken from config)",
+                                              strategy.lineno))
+
+        stoploss = _literal(attributes["stoploss"]) if "stoploss" in attributes else None
+        if isinstance(stoploss, (int, float)) and not -1 <= stoploss < 0:
+            issues.append(ValidationIssue("error", f"stoploss must be in [-1, 0), got {stoploss}",
+                                          attributes["stoploss"].lineno))
+        minimal_roi = _literal(attributes["minimal_roi"]) if "minimal_roi" in attributes else None
+        if "minimal_roi" in attributes and minimal_roi is not None and not isinstance(minimal_roi, dict):
+            issues.append(ValidationIssue("error", "minimal_roi must be a dict", attributes["minimal_roi"].lineno))
+        return issues
+
+
+_default_validator = StrategyValidator()
+
+
+def validate_strategy(code: str) -> ValidationResult:
+    """Validate with the process-wide cached validator"""
+    return _default_validator.validate(code)
+
+
+def get_validator() -> StrategyValidator:
+    return _default_validator
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+from .secure_commands import SecureCommands
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MAX_MESSAGE = 4096
+
+Reply = Callable[[str], Awaitable[Any]]
+
+
+def split_message(text: str, limit: int = TELEGRAM_MAX_MESSAGE) -> list:
+    """Split ``text`` into Telegram-sized chunks, preferring line breaks"""
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text or not chunks:
+        chunks.append(text)
+    return chunks
+
+
+class ChatDispatcher:
+    """
+    Runs commands concurrently across chats and in order within a chat.
+
+    Each chat with pending work has one worker task draining its queue, so
+    a chat's replies come back in the order its messages arrived. Handlers
+    run in two lanes with separate limits: ``slow`` commands (LLM calls,
+    config rewrites) can only occupy ``slow_concurrency`` slots, so they
+    never hold up fast commands from other chats. A chat that already has
+    ``max_pending`` queued messages is told to wait instead of queueing more.
+    """
+
+    def __init__(self, handler: Callable[[str, str], Awaitable[str]],
+                 is_slow: Callable[[str], bool] = lambda text: False,
+                 concurrency: int = 16, slow_concurrency: int = 4, max_pending: int = 20):
+        self.handler = handler
+        self.is_slow = is_slow
+        self.max_pending = max_pending
+        self._fast = asyncio.Semaphore(concurrency)
+        self._slow = asyncio.Semaphore(slow_concurrency)
+        self._queues: Dict[Any, asyncio.Queue] = {}
+        self._workers: Dict[Any, asyncio.Task] = {}
+        self.stats = {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    def submit(self, chat_id: Any, user_id: str, text: str, reply: Reply) -> bool:
+        """Queue a message for ``chat_id``; False if that chat has too much pending"""
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = asyncio.Queue()
+        if queue.qsize() >= self.max_pending:
+            self.stats["rejected"] += 1
+            return False
+        queue.put_nowait((user_id, text, reply, time.monotonic()))
+        self.stats["submitted"] += 1
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id, queue))
+        return True
+
+    async def _drain(self, chat_id: Any, queue: asyncio.Queue) -> None:
+        try:
+            while not queue.empty():
+                user_id, text, reply, queued_at = queue.get_nowait()
+                await self._run(user_id, text, reply, queued_at)
+        finally:
+            # Nothing awaits between the empty check and here, so no message is stranded
+            self._workers.pop(chat_id, None)
+            if queue.empty():
+                self._queues.pop(chat_id, None)
+
+    async def _run(self, user_id: str, text: str, reply: Reply, queued_at: float) -> None:
+        lane = self._slow if self.is_slow(text) else self._fast
+        async with lane:
+            try:
+                response = await self.handler(user_id, text)
+                self.stats["completed"] += 1
+            except Exception as e:
+                logger.error(f"Command failed: {e}", exc_info=True)
+                self.stats["failed"] += 1
+                response = f"Error processing command: {e}"
+        logger.debug(f"Handled command in {time.monotonic() - queued_at:.3f}s")
+        for chunk in split_message(response or "Done."):
+            try:
+                await reply(chunk)
+            except Exception as e:
+                logger.warning(f"Could not send reply: {e}")
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active_chats": len(self._workers),
+            "queued": sum(q.qsize() for q in self._queues.values()),
+        }
+
+    async def stop(self) -> None:
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+
+class TelegramFrontend:
+    """
+    Telegram bot that forwards commands to ``SecureCommands``.
+
+    python-telegram-bot runs with concurrent updates and each command is
+    handed to a ``ChatDispatcher`` straight away, so the polling loop
+    never waits on a handler. ``users`` maps Telegram user ids to the
+    assistant's user ids; unmapped users get their Telegram id, which
+    ``SecureCommands`` does not authorise.
+    """
+
+    def __init__(self, token: str, commands: SecureCommands, users: Optional[Dict[str, str]] = None,
+                 concurrency: int = 16, slow_concurrency: int = 4, max_pending: int = 20):
+        self.token = token
+        self.commands = commands
+        self.users = {str(k): v for k, v in (users or {}).items()}
+        self.dispatcher = ChatDispatcher(commands.process_command, self._is_slow,
+                                         concurrency, slow_concurrency, max_pending)
+        self.application = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], commands: SecureCommands) -> "TelegramFrontend":
+        return cls(config["token"], commands, config.get("users"),
+                   concurrency=config.get("concurrency", 16),
+                   slow_concurrency=config.get("slow_concurrency", 4),
+                   max_pending=config.get("max_pending", 20))
+
+    def _is_slow(self, text: str) -> bool:
+        match = self.commands.dispatcher.match(text)
+        return match is not None and match[0].slow
+
+    def user_for(self, telegram_user_id: Any) -> str:
+        return self.users.get(str(telegram_user_id), str(telegram_user_id))
+
+    async def _on_command(self, update, context) -> None:
+        message = update.effective_message
+        if message is None or not message.text or update.effective_user is None:
+            return
+        accepted = self.dispatcher.submit(update.effective_chat.id, self.user_for(update.effective_user.id),
+                                          message.text, message.reply_text)
+        if not accepted:
+            await message.reply_text("Still working on your earlier commands, please wait.")
+
+    async def start(self) -> None:
+        """Start long polling (call from one worker only; Telegram allows a single poller)"""
+        if self.application is not None:
+            return
+        from telegram.ext import Application, MessageHandler, filters
+
+        application = Application.builder().token(self.token).concurrent_updates(True).build()
+        application.add_handler(MessageHandler(filters.COMMAND, self._on_command))
+        await application.initialize()
+        await application.start()
+        await application.updater.start_polling(drop_pending_updates=True)
+        self.application = application
+        logger.info("Telegram front-end started")
+
+    async def stop(self) -> None:
+        application, self.application = self.application, None
+        if application is None:
+            return
+        await application.updater.stop()
+        await self.dispatcher.stop()
+        await application.stop()
+        await application.shutdown()
+        logger.info("Telegram front-end stopped")
+
+    def status(self) -> Dict[str, Any]:
+        return {"running": self.application is not None, **self.dispatcher.snapshot()}
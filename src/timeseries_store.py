@@ -0,0 +1,226 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from .startup import lazy_import
+
+np = lazy_import("numpy")
+
+# (name, bucket seconds, capacity). Bucket 0 keeps every raw sample.
+DEFAULT_RESOLUTIONS: Tuple[Tuple[str, int, int], ...] = (
+    ("raw", 0, 10_000),
+    ("1m", 60, 7 * 24 * 60),
+    ("1h", 3600, 366 * 24),
+)
+
+
+class _RingBuffer:
+    """Fixed-capacity columnar buffer of (ts, min, max, sum, count, last) rows"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.float64)
+        self.min = np.zeros(capacity, dtype=np.float64)
+        self.max = np.zeros(capacity, dtype=np.float64)
+        self.sum = np.zeros(capacity, dtype=np.float64)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.last = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self.wrapped = False  # True once the oldest rows start being overwritten
+        self._head = 0  # next write position
+
+    def append(self, ts: float, vmin: float, vmax: float, vsum: float, count: int, last: float) -> None:
+        i = self._head
+        self.ts[i] = ts
+        self.min[i] = vmin
+        self.max[i] = vmax
+        self.sum[i] = vsum
+        self.count[i] = count
+        self.last[i] = last
+        self._head = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+        else:
+            self.wrapped = True
+
+    def oldest(self) -> Optional[float]:
+        if not self.size:
+            return None
+        return float(self.ts[(self._head - self.size) % self.capacity])
+
+    def ordered(self) -> Dict[str, np.ndarray]:
+        """Rows in time order (copies)"""
+        start = (self._head - self.size) % self.capacity
+        idx = (np.arange(self.size) + start) % self.capacity
+        return {
+            "ts": self.ts[idx], "min": self.min[idx], "max": self.max[idx],
+            "sum": self.sum[idx], "count": self.count[idx], "last": self.last[idx],
+        }
+
+
+class _Tier:
+    """One resolution of a series; aggregates into ``bucket``-second rows"""
+
+    def __init__(self, name: str, bucket: int, capacity: int):
+        self.name = name
+        self.bucket = bucket
+        self.buffer = _RingBuffer(capacity)
+        self._pending: Optional[List[float]] = None  # [start, min, max, sum, count, last]
+
+    def add(self, ts: float, value: float) -> None:
+        if not self.bucket:
+            self.buffer.append(ts, value, value, value, 1, value)
+            return
+        start = ts - ts % self.bucket
+        pending = self._pending
+        if pending is not None and pending[0] != start:
+            self.buffer.append(*pending)
+            pending = None
+        if pending is None:
+            self._pending = [start, value, value, value, 1, value]
+            return
+        if value < pending[1]:
+            pending[1] = value
+        if value > pending[2]:
+            pending[2] = value
+        pending[3] += value
+        pending[4] += 1
+        pending[5] = value
+
+    def covers(self, start: float) -> bool:
+        """True if no data at or after ``start`` has been evicted"""
+        if not self.buffer.wrapped:
+            return True
+        oldest = self.buffer.oldest()
+        return oldest is not None and oldest <= start
+
+    def rows(self) -> Dict[str, np.ndarray]:
+        rows = self.buffer.ordered()
+        if self._pending is not None:
+            keys = ("ts", "min", "max", "sum", "count", "last")
+            rows = {k: np.append(rows[k], self._pending[i]) for i, k in enumerate(keys)}
+        return rows
+
+
+class MetricsTimeSeriesStore:
+    """
+    Fixed-memory time-series store for metric history.
+
+    Each metric is kept at several resolutions (raw samples, 1m and 1h
+    buckets by default) in numpy ring buffers; coarser tiers are
+    downsampled on write as min/max/mean/last. Range queries pick the finest
+    tier that still covers the requested range and decimate server-side to
+    the requested number of points.
+    """
+
+    def __init__(self, resolutions: Iterable[Tuple[str, int, int]] = DEFAULT_RESOLUTIONS):
+        self.resolutions = tuple(resolutions)
+        self._series: Dict[str, List[_Tier]] = {}
+        self._lock = threading.Lock()
+
+    def _tiers(self, name: str) -> List[_Tier]:
+        tiers = self._series.get(name)
+        if tiers is None:
+            tiers = [_Tier(*resolution) for resolution in self.resolutions]
+            self._series[name] = tiers
+        return tiers
+
+    def append(self, name: str, value: float, ts: Optional[float] = None) -> None:
+        """Record one sample of a metric"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for tier in self._tiers(name):
+                tier.add(ts, float(value))
+
+    def append_many(self, values: Dict[str, float], ts: Optional[float] = None) -> None:
+        """Record samples of several metrics taken at the same time"""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for name, value in values.items():
+                for tier in self._tiers(name):
+                    tier.add(ts, float(value))
+
+    def metric_names(self) -> List[str]:
+        return list(self._series)
+
+    def _select_tier(self, tiers: List[_Tier], start: float) -> _Tier:
+        for tier in tiers:
+            if tier.covers(start):
+                return tier
+        # Nothing reaches back far enough; the coarsest tier holds the most history
+        return tiers[-1]
+
+    def query(self, name: str, start: Optional[float] = None, end: Optional[float] = None,
+              max_points: int = 300) -> Dict[str, Any]:
+        """
+        Return ``{"resolution", "ts", "min", "max", "mean", "last"}`` for
+        ``name`` between ``start`` and ``end`` (epoch seconds), decimated
+        to at most ``max_points`` rows.
+        """
+        end = time.time() if end is None else end
+        start = 0.0 if start is None else start
+        empty = {"resolution": None, "ts": [], "min": [], "max": [], "mean": [], "last": []}
+        with self._lock:
+            tiers = self._series.get(name)
+            if not tiers:
+                return empty
+            tier = self._select_tier(tiers, start)
+            rows = tier.rows()
+
+        ts = rows["ts"]
+        lo = int(np.searchsorted(ts, start, side="left"))
+        hi = int(np.searchsorted(ts, end, side="right"))
+        if lo >= hi:
+            return {**empty, "resolution": tier.name}
+        rows = {k: v[lo:hi] for k, v in rows.items()}
+        if hi - lo > max_points > 0:
+            rows = self._decimate(rows, start, end, max_points)
+
+        return {
+            "resolution": tier.name,
+            "ts": rows["ts"].tolist(),
+            "min": rows["min"].tolist(),
+            "max": rows["max"].tolist(),
+            "mean": (rows["sum"] / rows["count"]).tolist(),
+            "last": rows["last"].tolist(),
+        }
+
+    @staticmethod
+    def _decimate(rows: Dict[str, np.ndarray], start: float, end: float,
+                  max_points: int) -> Dict[str, np.ndarray]:
+        """Merge rows into ``max_points`` equal-width time buckets"""
+        ts = rows["ts"]
+        start = max(start, ts[0])
+        edges = np.linspace(start, end, max_points + 1)[:-1]
+        idx = np.unique(np.searchsorted(ts, edges, side="left"))
+        idx = idx[idx < len(ts)]
+        ends = np.append(idx[1:], len(ts)) - 1
+        return {
+            "ts": ts[idx],
+            "min": np.minimum.reduceat(rows["min"], idx),
+            "max": np.maximum.reduceat(rows["max"], idx),
+            "sum": np.add.reduceat(rows["sum"], idx),
+            "count": np.add.reduceat(rows["count"], idx),
+            "last": rows["last"][ends],
+        }
+
+    def query_frame(self, names: Iterable[str], start: Optional[float] = None,
+                    end: Optional[float] = None, max_points: int = 300,
+                    field: str = "mean") -> List[Dict[str, Any]]:
+        """
+        Chart-ready rows ``{"name", "timestamp", <metric>: value, ...}``
+        joining several metrics on their (bucketed) timestamps.
+        """
+        end = time.time() if end is None else end
+        frame: Dict[float, Dict[str, Any]] = {}
+        for name in names:
+            result = self.query(name, start, end, max_points)
+            for ts, value in zip(result["ts"], result[field]):
+                row = frame.get(ts)
+                if row is None:
+                    row = frame[ts] = {
+                        "name": time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)),
+                        "timestamp": ts,
+                    }
+                row[name] = value
+        return [frame[ts] for ts in sorted(frame)]
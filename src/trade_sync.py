@@ -0,0 +1,358 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from .startup import lazy_import
+from .freqtrade_client import FreqtradeClient
+
+aiohttp = lazy_import("aiohttp")
+
+logger = logging.getLogger(__name__)
+
+TRADE_COLUMNS = (
+    'pair', 'is_open', 'open_timestamp', 'close_timestamp', 'open_rate', 'close_rate',
+    'amount', 'stake_amount', 'profit_ratio', 'profit_abs', 'exit_reason', 'strategy',
+)
+
+# closed_seq numbers trades in the order they were first seen closed, so
+# followers catch trades that sync late with an older close time
+_UPSERT_SQL = f"""
+    INSERT INTO trades (bot, trade_id, {', '.join(TRADE_COLUMNS)}, raw, closed_seq)
+    VALUES (?, ?, {', '.join('?' for _ in TRADE_COLUMNS)}, ?, ?)
+    ON CONFLICT(bot, trade_id) DO UPDATE SET
+    {', '.join(f'{c} = excluded.{c}' for c in TRADE_COLUMNS)}, raw = excluded.raw,
+    closed_seq = COALESCE(trades.closed_seq, excluded.closed_seq)
+"""
+
+
+class TradeSyncEngine:
+    """
+    Mirrors freqtrade trade history into a local SQLite table.
+
+    Each bot keeps a high-water mark (closed trades synced, max trade id and
+    close timestamp); a sync only pages through trades past that mark - with a
+    small overlap because freqtrade lists closed trades by id and late
+    closers shift the offsets - plus the current open trades. Rows are
+    bulk-upserted in WAL mode so dashboards and prompts can read the mirror
+    without touching the REST API. Reads go through a second connection
+    so they never wait behind a sync's write transaction.
+    """
+
+    def __init__(self, clients: Dict[str, FreqtradeClient], db_path: str = "trades.db",
+                 page_size: int = 500, overlap: int = 50,
+                 on_closed_trade: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_sync: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.clients = clients
+        self.db_path = db_path
+        self.page_size = page_size
+        self.overlap = overlap
+        self.on_closed_trade = on_closed_trade
+        self.on_sync = on_sync
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._task: Optional[asyncio.Task] = None
+        self._follow_task: Optional[asyncio.Task] = None
+        self._init_db()
+        # WAL readers see the last committed state while a write is in progress
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(db_path, check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+
+    def _init_db(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS trades (
+                    bot TEXT NOT NULL,
+                    trade_id INTEGER NOT NULL,
+                    pair TEXT,
+                    is_open INTEGER,
+                    open_timestamp INTEGER,
+                    close_timestamp INTEGER,
+                    open_rate REAL,
+                    close_rate REAL,
+                    amount REAL,
+                    stake_amount REAL,
+                    profit_ratio REAL,
+                    profit_abs REAL,
+                    exit_reason TEXT,
+                    strategy TEXT,
+                    raw TEXT,
+                    PRIMARY KEY (bot, trade_id)
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_trades_close ON trades (close_timestamp)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_trades_pair ON trades (pair, close_timestamp)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_trades_open ON trades (bot) WHERE is_open = 1")
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(trades)")}
+            if "closed_seq" not in columns:
+                self._conn.execute("ALTER TABLE trades ADD COLUMN closed_seq INTEGER")
+                self._conn.execute("UPDATE trades SET closed_seq = rowid WHERE is_open = 0")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_trades_closed_seq ON trades (closed_seq)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS trade_sync_state (
+                    bot TEXT PRIMARY KEY,
+                    synced_closed INTEGER NOT NULL DEFAULT 0,
+                    max_trade_id INTEGER NOT NULL DEFAULT 0,
+                    max_close_timestamp INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL
+                )
+            """)
+
+    def close(self) -> None:
+        with self._read_lock:
+            self._reader.close()
+        with self._lock:
+            self._conn.close()
+
+    def get_sync_state(self, bot: str) -> Dict[str, Any]:
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT * FROM trade_sync_state WHERE bot = ?", (bot,)).fetchone()
+        if row is None:
+            return {"bot": bot, "synced_closed": 0, "max_trade_id": 0, "max_close_timestamp": 0}
+        return dict(row)
+
+    @staticmethod
+    def _row(bot: str, trade: Dict[str, Any]) -> Tuple:
+        values = [trade.get(column) for column in TRADE_COLUMNS]
+        values[1] = 1 if trade.get('is_open') else 0
+        return (bot, trade['trade_id'], *values, json.dumps(trade))
+
+    async def sync_bot(self, bot: str) -> int:
+        """Fetch trades past the bot's high-water mark; returns rows upserted"""
+        client = self.clients[bot]
+        state = self.get_sync_state(bot)
+        offset = max(0, state["synced_closed"] - self.overlap)
+        closed: List[Dict[str, Any]] = []
+        total = None
+        while True:
+            page = await client.get_trades(limit=self.page_size, offset=offset)
+            trades = page.get('trades', [])
+            total = page.get('total_trades', total)
+            if offset and total is not None and total < state["synced_closed"]:
+                # The bot's database shrank (reset or new instance): start over
+                logger.info(f"Trade history of {bot} shrank, resyncing from scratch")
+                state = {**state, "synced_closed": 0, "max_trade_id": 0, "max_close_timestamp": 0}
+                offset, closed = 0, []
+                continue
+            closed.extend(trades)
+            offset += len(trades)
+            if len(trades) < self.page_size or (total is not None and offset >= total):
+                break
+
+        open_trades = await client.get_status() or []
+        # Trades that closed behind the overlap window would stay open in the
+        # mirror forever; fetch them individually.
+        seen = {t['trade_id'] for t in closed} | {t['trade_id'] for t in open_trades}
+        deleted: List[int] = []
+        for stale in self.open_trades(bot):
+            if stale['trade_id'] not in seen:
+                try:
+                    trade = await client.get_trade(stale['trade_id'])
+                except aiohttp.ClientResponseError as e:
+                    if e.status != 404:
+                        raise
+                    # Deleted in freqtrade (/api/v1/trades/<id> DELETE): drop it from the mirror too
+                    logger.info(f"Trade {stale['trade_id']} of {bot} no longer exists, removing it")
+                    deleted.append(stale['trade_id'])
+                    continue
+                if not trade.get('is_open'):
+                    closed.append(trade)
+
+        rows = [self._row(bot, trade) for trade in closed]
+        rows.extend(self._row(bot, trade) for trade in open_trades)
+
+        high_water = state["max_close_timestamp"]
+        newly_closed = [t for t in closed if (t.get('close_timestamp') or 0) > high_water]
+        new_state = (
+            bot,
+            offset,
+            max([state["max_trade_id"]] + [t['trade_id'] for t in closed]),
+            max([high_water] + [t.get('close_timestamp') or 0 for t in closed]),
+            time.time(),
+        )
+        await asyncio.to_thread(self._write, rows, new_state, [(bot, trade_id) for trade_id in deleted])
+
+        if self.on_closed_trade is not None:
+            for trade in sorted(newly_closed, key=lambda t: t.get('close_timestamp') or 0):
+                try:
+                    self.on_closed_trade(trade)
+                except Exception as e:
+                    logger.error(f"Closed-trade callback failed: {e}")
+        return len(rows)
+
+    def _write(self, rows: List[Tuple], state: Tuple, deleted: List[Tuple] = ()) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            seq = self._conn.execute("SELECT COALESCE(MAX(closed_seq), 0) FROM trades").fetchone()[0]
+            # Rows already closed in the mirror keep their number (see _UPSERT_SQL)
+            self._conn.executemany(_UPSERT_SQL, [
+                (*row, None if row[3] else seq + i) for i, row in enumerate(rows, 1)])
+            self._conn.executemany("DELETE FROM trades WHERE bot = ? AND trade_id = ?", deleted)
+            self._conn.execute("""
+                INSERT OR REPLACE INTO trade_sync_state
+                (bot, synced_closed, max_trade_id, max_close_timestamp, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, state)
+
+    async def sync_all(self) -> Dict[str, Any]:
+        """Sync every bot concurrently; failures are reported per bot"""
+        names = list(self.clients)
+        results = await asyncio.gather(*(self.sync_bot(name) for name in names), return_exceptions=True)
+        summary = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.error(f"Trade sync for {name} failed: {result}")
+                summary[name] = {"error": str(result)}
+            else:
+                summary[name] = {"upserted": result}
+        return summary
+
+    def start(self, interval: float = 60.0) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def follow(self, callback: Callable[[Dict[str, Any], bool], None], interval: float = 5.0) -> None:
+        """
+        Call ``callback(trade, replay)`` for every closed trade in the mirror:
+        first the existing history in close order with ``replay=True``, then
+        each trade as it is first seen closed, including ones that sync late
+        with an older close time. Unlike ``on_closed_trade`` this works on
+        any worker, not just the one running the sync.
+        """
+        if self._follow_task is None or self._follow_task.done():
+            self._follow_task = asyncio.get_running_loop().create_task(self._follow(callback, interval))
+
+    async def unfollow(self) -> None:
+        if self._follow_task is not None:
+            self._follow_task.cancel()
+            try:
+                await self._follow_task
+            except asyncio.CancelledError:
+                pass
+            self._follow_task = None
+
+    @staticmethod
+    def _deliver(callback: Callable[[Dict[str, Any], bool], None], trades: List[Dict[str, Any]],
+                 replay: bool) -> None:
+        for trade in trades:
+            try:
+                callback(trade, replay)
+            except Exception as e:
+                logger.error(f"Closed-trade callback failed: {e}")
+
+    async def _follow(self, callback: Callable[[Dict[str, Any], bool], None], interval: float) -> None:
+        seq: Optional[int] = None
+        cursor: Optional[Tuple] = None
+        replaying = True
+        while True:
+            try:
+                if seq is None:
+                    seq = await asyncio.to_thread(self.last_closed_seq)
+                if replaying:
+                    trades = await asyncio.to_thread(self.closed_after, cursor, seq)
+                    self._deliver(callback, trades, replay=True)
+                    replaying = len(trades) == self.page_size
+                    if trades:
+                        last = trades[-1]
+                        cursor = (last['close_timestamp'], last['bot'], last['trade_id'])
+                    continue
+                trades = await asyncio.to_thread(self.closed_since, seq)
+                self._deliver(callback, trades, replay=False)
+                if trades:
+                    seq = trades[-1]['closed_seq']
+            except sqlite3.Error as e:
+                logger.error(f"Reading the trade mirror failed: {e}")
+                trades = []
+            if len(trades) < self.page_size:
+                await asyncio.sleep(interval)
+
+    def last_closed_seq(self) -> int:
+        with self._read_lock:
+            return self._reader.execute("SELECT COALESCE(MAX(closed_seq), 0) FROM trades").fetchone()[0]
+
+    def closed_after(self, cursor: Optional[Tuple] = None, max_seq: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Closed trades ordered by (close_timestamp, bot, trade_id), starting after ``cursor``"""
+        query = f"SELECT bot, trade_id, {', '.join(TRADE_COLUMNS)}, closed_seq FROM trades WHERE is_open = 0"
+        params: List[Any] = []
+        if cursor is not None:
+            query += " AND (close_timestamp, bot, trade_id) > (?, ?, ?)"
+            params.extend(cursor)
+        if max_seq is not None:
+            query += " AND closed_seq <= ?"
+            params.append(max_seq)
+        query += " ORDER BY close_timestamp, bot, trade_id LIMIT ?"
+        params.append(self.page_size)
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(query, params)]
+
+    def closed_since(self, seq: int) -> List[Dict[str, Any]]:
+        """Trades first seen closed after sequence number ``seq``, in that order"""
+        query = (f"SELECT bot, trade_id, {', '.join(TRADE_COLUMNS)}, closed_seq FROM trades "
+                 f"WHERE is_open = 0 AND closed_seq > ? ORDER BY closed_seq LIMIT ?")
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(query, (seq, self.page_size))]
+
+    def recent_trades(self, limit: int = 50, bot: Optional[str] = None,
+                      pair: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recently closed trades from the mirror"""
+        query = f"SELECT bot, trade_id, {', '.join(TRADE_COLUMNS)} FROM trades WHERE is_open = 0"
+        params: List[Any] = []
+        if bot is not None:
+            query += " AND bot = ?"
+            params.append(bot)
+        if pair is not None:
+            query += " AND pair = ?"
+            params.append(pair)
+        query += " ORDER BY close_timestamp DESC LIMIT ?"
+        params.append(limit)
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(query, params)]
+
+    def open_trades(self, bot: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = f"SELECT bot, trade_id, {', '.join(TRADE_COLUMNS)} FROM trades WHERE is_open = 1"
+        params: List[Any] = []
+        if bot is not None:
+            query += " AND bot = ?"
+            params.append(bot)
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(query, params)]
+
+    def profit_summary(self, bot: Optional[str] = None, since: Optional[int] = None) -> Dict[str, Any]:
+        """Aggregate closed-trade performance; ``since`` is a ms timestamp"""
+        query = """
+            SELECT COUNT(*) AS trade_count,
+                   COALESCE(SUM(profit_abs), 0) AS profit_abs,
+                   COALESCE(AVG(profit_ratio), 0) AS avg_profit_ratio,
+                   COALESCE(SUM(profit_ratio > 0), 0) AS winning_trades,
+                   COALESCE(SUM(profit_ratio < 0), 0) AS losing_trades
+            FROM trades WHERE is_open = 0
+        """
+        params: List[Any] = []
+        if bot is not None:
+            query += " AND bot = ?"
+            params.append(bot)
+        if since is not None:
+            query += " AND close_timestamp >= ?"
+            params.append(since)
+        with self._read_lock:
+            return dict(self._reader.execute(query, params).fetchone())
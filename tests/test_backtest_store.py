@@ -0,0 +1,110 @@
+import os
+import threading
+import pytest
+from src.backtest_store import BacktestStore, config_hash
+from src.freqai_manager import FreqAIManager
+from src.shared_state import file_lock
+
+DAY_MS = 86_400_000
+JAN = 1_704_067_200_000  # 2024-01-01
+FEB = JAN + 31 * DAY_MS
+
+
+def _trade(pair, close_ms, profit):
+    return {"pair": pair, "open_timestamp": close_ms - 3_600_000, "close_timestamp": close_ms,
+            "open_rate": 100.0, "close_rate": 100.0 * (1 + profit), "profit_ratio": profit,
+            "profit_abs": profit * 100, "exit_reason": "roi" if profit > 0 else "stop_loss"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = BacktestStore(str(tmp_path / "results"))
+    store.record("RsiStrategy", {"profit_total": 0.02, "sharpe": 1.5, "max_drawdown": 0.05},
+                 {"rsi": 14}, [_trade("BTC/USDT", JAN + DAY_MS, 0.03), _trade("ETH/USDT", FEB + DAY_MS, -0.01)],
+                 run_id="rsi14", started_at=1000)
+    store.record("RsiStrategy", {"profit": -0.01}, {"rsi": 21},
+                 [_trade("BTC/USDT", JAN + 2 * DAY_MS, -0.01)], run_id="rsi21", started_at=2000)
+    store.record("MacdStrategy", {"profit_total": 0.05}, {"fast": 12},
+                 [_trade("BTC/USDT", FEB + 2 * DAY_MS, 0.05)], run_id="macd", started_at=3000)
+    return store
+
+
+def test_runs_are_partitioned_and_queryable(store):
+    assert sorted(os.listdir(store.trades_path)) == ["strategy=MacdStrategy", "strategy=RsiStrategy"]
+    assert sorted(os.listdir(os.path.join(store.trades_path, "strategy=RsiStrategy"))) == \
+        ["month=2024-01", "month=2024-02"]
+    runs = store.runs(strategy="RsiStrategy")
+    assert [r["run_id"] for r in runs] == ["rsi21", "rsi14"]
+    assert runs[1]["total_trades"] == 2 and runs[1]["winrate"] == 0.5 and runs[1]["started_at"] == 1_000_000
+    assert runs[0]["profit_total"] == -0.01
+    best = store.runs(order_by="profit_total", columns=["run_id"], limit=1)
+    assert best == [{"run_id": "macd", "profit_total": 0.05}]
+    assert [r["run_id"] for r in store.runs(config_hash=config_hash({"rsi": 21}))] == ["rsi21"]
+    assert [r["run_id"] for r in store.runs(since=1_500_000, until=2_500_000)] == ["rsi21"]
+
+
+def test_trade_filters_and_aggregates(store):
+    feb = store.trades(since=FEB, columns=["run_id", "pair", "close_date"])
+    assert [(t["run_id"], t["pair"]) for t in feb] == [("rsi14", "ETH/USDT"), ("macd", "BTC/USDT")]
+    assert len(store.trades(pair="BTC/USDT", strategy="RsiStrategy")) == 2
+    assert store.trades(run_id="rsi21")[0]["close_date"] == JAN + 2 * DAY_MS
+
+    by_strategy = store.aggregate(by=["strategy"])
+    assert [g["strategy"] for g in by_strategy] == ["MacdStrategy", "RsiStrategy"]
+    rsi = by_strategy[1]
+    assert rsi["trades"] == 3 and rsi["winrate"] == pytest.approx(1 / 3)
+    assert rsi["profit_total"] == pytest.approx(0.01)
+    by_pair = {g["pair"]: g for g in store.aggregate(by=["pair"], until=FEB)}
+    assert by_pair["BTC/USDT"]["trades"] == 2 and "ETH/USDT" not in by_pair
+    with pytest.raises(ValueError):
+        store.aggregate(by=["profit_ratio"])
+
+
+def test_compaction_keeps_results(store):
+    before = store.aggregate(by=["run_id"])
+    assert store.compact() == {"runs": 3, "trades": 4}
+    assert store.compact() == {"runs": 2, "trades": 3}
+    assert store.aggregate(by=["run_id"]) == before
+    assert len(store.runs()) == 3
+    assert "rsi21 RsiStrategy" in store.summary()
+
+
+def test_trade_partitions_are_merged_past_the_file_limit(tmp_path):
+    store = BacktestStore(str(tmp_path), max_files_per_partition=3)
+    for i in range(7):
+        store.record("S", {}, {"i": i}, [_trade("BTC/USDT", JAN, 0.01)], run_id=f"r{i}")
+    partition = os.path.join(store.trades_path, "strategy=S", "month=2024-01")
+    assert len([f for f in os.listdir(partition) if f.endswith(".parquet")]) <= 3
+    assert store.aggregate(by=["strategy"])[0]["trades"] == 7
+
+
+def test_merges_wait_for_queries_from_other_workers(tmp_path):
+    root = str(tmp_path / "results")
+    writer, reader = BacktestStore(root, max_files_per_partition=2), BacktestStore(root)
+    for i in range(2):
+        writer.record("S", {}, {"i": i}, [_trade("BTC/USDT", JAN, 0.01)], run_id=f"r{i}")
+    partition = os.path.join(writer.runs_path, "strategy=S")
+    with file_lock(reader._swap_lock_path, shared=True):
+        # A query is in progress: the merged file is staged but not swapped in
+        thread = threading.Thread(target=writer.record, args=("S", {}, {"i": 2}), kwargs={"run_id": "r2"})
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        assert len([f for f in os.listdir(partition) if f.endswith(".parquet") and f[0] != "."]) == 2
+    thread.join()
+    assert sorted(r["run_id"] for r in reader.runs(columns=["run_id"])) == ["r0", "r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_empty_store_and_test_strategy_persists(tmp_path, monkeypatch):
+    store = BacktestStore(str(tmp_path / "empty"))
+    assert store.runs() == [] and store.trades() == [] and store.aggregate() == []
+    assert store.summary() == "No recorded backtests."
+
+    async def no_sleep(_):
+        return None
+    monkeypatch.setattr("src.freqai_manager.asyncio.sleep", no_sleep)
+    manager = FreqAIManager(results_store=store)
+    results = await manager._test_strategy({"feature_parameters": {}})
+    assert store.runs()[0]["run_id"] == results["run_id"]
+    assert store.runs()[0]["strategy"] == "FreqAIStrategy"
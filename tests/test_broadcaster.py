@@ -0,0 +1,94 @@
+import asyncio
+import json
+import pytest
+from src import api_route
+from src.broadcaster import MetricsBroadcaster, diff_state
+
+
+def test_diff_state_nested_and_removed():
+    old = {"metrics": {"accuracy": 0.5, "loss": 0.2}, "status": {"running": True}, "gone": 1}
+    new = {"metrics": {"accuracy": 0.6, "loss": 0.2}, "status": {"running": True}}
+    assert diff_state(old, new) == {"metrics": {"accuracy": 0.6}, "gone": None}
+    assert diff_state(new, new) == {}
+
+
+@pytest.mark.asyncio
+async def test_delta_serialized_once_and_shared():
+    broadcaster = MetricsBroadcaster(queue_size=4)
+    values = {"accuracy": 0.5}
+    broadcaster.add_source("metrics", lambda: dict(values))
+    first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+    await broadcaster.tick()
+    frame_a, frame_b = first.queue.get_nowait(), second.queue.get_nowait()
+    assert frame_a is frame_b
+    assert json.loads(frame_a) == {"type": "delta", "seq": 1, "data": {"metrics": {"accuracy": 0.5}}}
+
+    await broadcaster.tick()  # unchanged state sends nothing
+    assert first.queue.empty()
+
+    values["accuracy"] = 0.7
+    await broadcaster.tick()
+    assert json.loads(first.queue.get_nowait())["data"] == {"metrics": {"accuracy": 0.7}}
+
+
+@pytest.mark.asyncio
+async def test_slow_client_gets_snapshot_instead_of_backlog():
+    broadcaster = MetricsBroadcaster(queue_size=2)
+    counter = {"n": 0}
+
+    def source():
+        counter["n"] += 1
+        return {"n": counter["n"]}
+
+    broadcaster.add_source("status", source)
+    slow = broadcaster.subscribe()
+    for _ in range(5):
+        await broadcaster.tick()
+
+    frames = []
+    while not slow.queue.empty():
+        frames.append(json.loads(slow.queue.get_nowait()))
+    assert slow.dropped > 0
+    assert len(frames) <= 2
+    snapshot = [f for f in frames if f["type"] == "snapshot"][0]
+    assert snapshot["data"]["status"]["n"] >= 3
+
+
+@pytest.mark.asyncio
+async def test_late_subscriber_receives_snapshot():
+    broadcaster = MetricsBroadcaster()
+    broadcaster.add_source("metrics", lambda: {"loss": 0.1})
+    broadcaster.subscribe()
+    await broadcaster.tick()
+    late = broadcaster.subscribe()
+    frame = json.loads(late.queue.get_nowait())
+    assert frame["type"] == "snapshot"
+    assert frame["data"] == {"metrics": {"loss": 0.1}}
+
+
+@pytest.mark.asyncio
+async def test_idle_socket_unsubscribes_on_disconnect(monkeypatch):
+    class IdleSocket:
+        def __init__(self):
+            self.gone = asyncio.Event()
+
+        async def accept(self):
+            pass
+
+        async def receive(self):
+            await self.gone.wait()
+            return {"type": "websocket.disconnect", "code": 1001}
+
+        async def send_text(self, frame):
+            raise AssertionError("no frames were published")
+
+    broadcaster = MetricsBroadcaster()
+    monkeypatch.setattr(api_route.router, "broadcaster", broadcaster, raising=False)
+    socket = IdleSocket()
+    handler = asyncio.ensure_future(api_route.metrics_socket(socket))
+    await asyncio.sleep(0.01)
+    assert broadcaster.subscriber_count == 1
+    socket.gone.set()
+    await asyncio.wait_for(handler, 1)
+    assert broadcaster.subscriber_count == 0
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import time
+import pytest
+from src.cache import CacheManager, make_key
+from src.config_manager import FreqtradeConfigManager
+from src.controllers.claude_controller import ClaudeFreqAIController
+
+
+@pytest.fixture
+def cache():
+    cache = CacheManager({"short": {"maxsize": 2, "ttl": 0.05}})
+    yield cache
+    cache.close()
+
+
+def test_regions_have_independent_policies(cache):
+    cache.set("short", "a", 1)
+    cache.set("short", "b", 2)
+    cache.set("short", "c", 3)  # evicts the least recently used
+    assert cache.get("short", "a") is None and cache.get("short", "c") == 3
+    cache.set("config", "x", {"k": 1})
+    time.sleep(0.06)
+    assert cache.get("short", "c") is None
+    assert cache.get("config", "x") == {"k": 1}
+    stats = cache.stats()
+    assert stats["short"]["misses"] == 2 and stats["config"]["hits"] == 1
+    with pytest.raises(KeyError):
+        cache.get("nope", "x")
+
+
+def test_tag_invalidation_across_regions(cache):
+    cache.set("config", "a", 1, tags=("pair:BTC",))
+    cache.set("predictions", "b", 2, tags=("pair:BTC", "model:x"))
+    cache.set("predictions", "c", 3, tags=("pair:ETH",))
+    assert cache.invalidate_tag("pair:BTC") == 2
+    assert cache.get("config", "a") is None and cache.get("predictions", "b") is None
+    assert cache.get("predictions", "c") == 3
+    cache.invalidate("predictions")
+    assert cache.get("predictions", "c") is None
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_coalesces_concurrent_misses(cache):
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"open_trades": 3}
+
+    results = await asyncio.gather(*(cache.get_or_load("freqtrade", "status", loader) for _ in range(20)))
+    assert calls == 1 and all(r == {"open_trades": 3} for r in results)
+    assert cache.stats()["freqtrade"]["coalesced"] == 19
+    assert await cache.get_or_load("freqtrade", "status", loader) == {"open_trades": 3} and calls == 1
+
+
+@pytest.mark.asyncio
+async def test_loader_errors_are_shared_and_not_cached(cache):
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("down")
+
+    results = await asyncio.gather(*(cache.get_or_load("freqtrade", "k", failing) for _ in range(3)),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.stats()["freqtrade"]["load_errors"] == 1
+
+    async def working():
+        return "ok"
+    assert await cache.get_or_load("freqtrade", "k", working) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_the_loading_caller_is_cancelled(cache):
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return calls
+
+    leader = asyncio.create_task(cache.get_or_load("freqtrade", "k", loader))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(cache.get_or_load("freqtrade", "k", loader)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    assert await asyncio.gather(*waiters) == [2, 2, 2]
+    assert leader.cancelled() and calls == 2
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = CacheManager(disk_path=path)
+    key = make_key("model", [{"role": "user", "content": "hi"}])
+    cache.set("llm", key, "hello", tags=("model:x",))
+    cache.set("config", "not-persisted", 1)
+    cache.close()
+
+    cache = CacheManager(disk_path=path)
+    try:
+        assert cache.get("llm", key) == "hello"
+        assert cache.get("config", "not-persisted") is None
+        assert cache.stats()["llm"]["disk_hits"] == 1
+        assert cache.invalidate_tag("model:x") >= 1
+        cache.regions["llm"].memory.clear()
+        assert cache.get("llm", key) is None
+    finally:
+        cache.close()
+
+
+def test_config_reads_are_cached_until_the_file_changes(tmp_path, cache):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"stake_currency": "USDT"}))
+    manager = FreqtradeConfigManager("key", str(path), cache)
+    first = manager.read_config()
+    assert manager.read_config() is first
+    assert manager.write_config({"stake_currency": "BTC"})
+    assert manager.read_config()["stake_currency"] == "BTC"
+    path.write_text(json.dumps({"stake_currency": "ETH", "x": 1}))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert manager.read_config()["stake_currency"] == "ETH"
+
+
+class _Messages:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        content = type("Block", (), {"text": f"reply {self.calls}"})
+        return type("Response", (), {"content": [content]})
+
+
+@pytest.mark.asyncio
+async def test_llm_responses_cached_only_when_deterministic(cache):
+    client = type("Client", (), {"messages": _Messages()})()
+    messages = [{"role": "user", "content": "status"}]
+    deterministic = ClaudeFreqAIController({"claude_integration": {"temperature": 0}}, client, cache=cache)
+    assert await deterministic._call_claude_api(messages) == await deterministic._call_claude_api(messages)
+    assert client.messages.calls == 1
+    sampled = ClaudeFreqAIController({"claude_integration": {"temperature": 1}}, client, cache=cache)
+    await sampled._call_claude_api(messages)
+    await sampled._call_claude_api(messages)
+    assert client.messages.calls == 3
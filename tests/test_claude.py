@@ -1,19 +1,148 @@
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+import anthropic
 import pytest
-from src.controllers.claude_controller import ClaudeController
+from benchmarks.bench_e2e import compare
+from benchmarks.fake_anthropic import FakeAnthropicConfig, FakeAnthropicServer
+from src.config_manager import FreqtradeConfigManager, update_config_file
+from src.controllers.claude_controller import ClaudeFreqAIController
+from src.shared_state import SharedStore, SessionStore
+
+CONFIG = {"claude_integration": {"model_version": "claude-test", "max_tokens": 1024,
+                                 "semantic_cache": {"enabled": False}}}
+
 
 @pytest.mark.asyncio
 async def test_claude_strategy_generation():
-    config = {"test": "config"}
-    controller = ClaudeController(config)
-    description = "RSI crossover strategy with MACD confirmation"
-    result = await controller.generate_strategy(description)
-    assert "class RSIMACDStrategy" in result
+    async with FakeAnthropicServer(FakeAnthropicConfig(output_tokens=300)) as server:
+        client = anthropic.AsyncAnthropic(api_key="test", base_url=server.base_url, max_retries=0)
+        controller = ClaudeFreqAIController(CONFIG, client)
+        result = await controller.handle_command("RSI crossover strategy with MACD confirmation")
+        await client.close()
+    assert "class BenchmarkStrategy(IStrategy)" in result
+    assert server.fake.prompts[0].startswith("Convert this FreqTrade command")
+    assert server.fake.prompts[1].startswith("Create a FreqTrade strategy based on this description")
+    assert server.fake.stats["output_tokens"] > 300
+
+
+@pytest.mark.asyncio
+async def test_streaming_and_max_tokens():
+    async with FakeAnthropicServer(FakeAnthropicConfig(output_tokens=200, chunk_tokens=10)) as server:
+        client = anthropic.AsyncAnthropic(api_key="test", base_url=server.base_url, max_retries=0)
+        messages = [{"role": "user", "content": "Create a strategy"}]
+        async with client.messages.stream(model="claude-test", max_tokens=1024, messages=messages) as stream:
+            chunks = [text async for text in stream.text_stream]
+            final = await stream.get_final_message()
+        truncated = await client.messages.create(model="claude-test", max_tokens=50, messages=messages)
+        await client.close()
+    assert len(chunks) == 20 and "".join(chunks) == final.content[0].text
+    assert final.usage.output_tokens == 200 and final.stop_reason == "end_turn"
+    assert truncated.usage.output_tokens == 50 and truncated.stop_reason == "max_tokens"
+    assert server.fake.stats["streamed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_are_not_recorded_as_failures():
+    class Messages:
+        async def create(self, **kwargs):
+            await asyncio.sleep(10 if kwargs["model"] == "slow" else 0)
+            raise RuntimeError("overloaded")
+
+    class Monitoring:
+        calls = []
+
+        def record_llm_call(self, model, duration, success):
+            self.calls.append((model, success))
+
+    controller = ClaudeFreqAIController(CONFIG, type("Client", (), {"messages": Messages()})(), Monitoring())
+    loser = asyncio.ensure_future(controller._create("slow", []))
+    await asyncio.sleep(0)
+    loser.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await loser
+    with pytest.raises(RuntimeError):
+        await controller._create("fast", [])
+    assert Monitoring.calls == [("fast", False)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_config_updates_are_serialised(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "config.json").write_text(json.dumps({"stake_amount": 1, "dry_run": True}))
+    async with FakeAnthropicServer(FakeAnthropicConfig(latency_ms=5)) as server:
+        client = anthropic.AsyncAnthropic(api_key="test", base_url=server.base_url, max_retries=0)
+        controller = ClaudeFreqAIController(CONFIG, client)
+        results = await asyncio.gather(*(controller.handle_command(f"set the config stake amount to {n}")
+                                         for n in range(10, 30)))
+        await client.close()
+    assert set(results) == {"Configuration updated successfully"}
+    config = json.loads((tmp_path / "config.json").read_text())
+    assert config["dry_run"] is True and 10 <= config["stake_amount"] < 30
+    assert (tmp_path / "config.json.backup").exists()
+
+
+def _bump(path):
+    for _ in range(20):
+        update_config_file(path, lambda config: {**config, "count": config["count"] + 1})
+
+
+def test_config_updates_are_serialised_across_processes(tmp_path):
+    path = str(tmp_path / "config.json")
+    (tmp_path / "config.json").write_text(json.dumps({"count": 0}))
+    with ProcessPoolExecutor(4, mp_context=multiprocessing.get_context("fork")) as pool:
+        list(pool.map(_bump, [path] * 4))
+    assert json.loads((tmp_path / "config.json").read_text()) == {"count": 80}
+
+    manager = FreqtradeConfigManager("test", path)
+    assert manager.write_config({"count": 1}) and manager.read_config() == {"count": 1}
+    assert json.loads((tmp_path / "config.json.backup").read_text()) == {"count": 80}
+    assert sorted(os.listdir(tmp_path)) == ["config.json", "config.json.backup", "config.json.lock"]
+    assert os.stat(tmp_path / "config.json.backup").st_mode & 0o777 == 0o600
+
+
+@pytest.mark.asyncio
+async def test_concurrent_update_config_requests_keep_each_change(tmp_path):
+    (tmp_path / "config.json").write_text(json.dumps({"stake_amount": 1, "exchange": {"name": "binance"}}))
+    manager = FreqtradeConfigManager("test", str(tmp_path / "config.json"))
+
+    class Llm:
+        async def complete(self, messages):
+            await asyncio.sleep(0.01)  # both read the config before either writes
+            key = "max_open_trades" if "trades" in messages[0]["content"] else "stake_amount"
+            return f"```json\n{json.dumps({key: 5, 'exchange': {'key': 'k'}})}\n```"
+
+    manager.llm = Llm()
+    results = await asyncio.gather(manager.update_config("open 5 trades"), manager.update_config("stake 5"))
+    assert results == ["Config updated successfully."] * 2
+    assert json.loads((tmp_path / "config.json").read_text()) == {
+        "stake_amount": 5, "max_open_trades": 5, "exchange": {"name": "binance", "key": "k"}}
+
+
+def test_benchmark_comparison_flags_regressions():
+    def report(rps, p99):
+        return {"results": [{"scenario": "message", "concurrency": 8, "throughput_rps": rps,
+                             "latency_ms": {"p99": p99}}]}
+
+    assert compare(report(100, 200), report(95, 210), tolerance=0.2) == []
+    regressions = compare(report(100, 200), report(70, 300), tolerance=0.2)
+    assert [r["metric"] for r in regressions] == ["throughput_rps", "p99_ms"]
+
 
 @pytest.mark.asyncio
-async def test_command_parsing():
-    config = {"test": "config"}
-    controller = ClaudeController(config)
-    command = controller.parse_command("Create a strategy using RSI and MACD")
-    assert command["action"] == "create_strategy"
-    assert "RSI" in command["indicators"]
-    assert "MACD" in command["indicators"]
\ No newline at end of file
+async def test_history_is_shared_between_workers(tmp_path):
+    store = SharedStore(str(tmp_path / "shared.db"))
+    async with FakeAnthropicServer() as server:
+        client = anthropic.AsyncAnthropic(api_key="test", base_url=server.base_url, max_retries=0)
+        first = ClaudeFreqAIController(CONFIG, client, sessions=SessionStore(store))
+        second = ClaudeFreqAIController(CONFIG, client, sessions=SessionStore(store))
+        await first.handle_command("check the market", session_id="alice")
+        history = await second.history("alice")
+        await second.clear_history("alice")
+        await client.close()
+    assert [m["role"] for m in history] == ["user", "assistant"]
+    assert history[0]["content"] == "check the market"
+    assert await first.history("alice") == []
+    store.close()
@@ -0,0 +1,55 @@
+import pytest
+from benchmarks.fake_freqtrade import FakeFreqtradeConfig, FakeFreqtradeServer
+from benchmarks.load_freqtrade_client import run_load, percentile, parse_args, benchmark
+from src.freqtrade_client import FreqtradeClient
+from src.trade_sync import TradeSyncEngine
+
+
+@pytest.mark.asyncio
+async def test_client_against_fake_with_auth_and_paging():
+    config = FakeFreqtradeConfig(username="bot", password="secret", closed_trades=25, open_trades=2)
+    async with FakeFreqtradeServer(config) as server:
+        async with FreqtradeClient(server.base_url, username="bot", password="secret") as client:
+            assert len(await client.get_status()) == 2
+            page = await client.get_trades(limit=10, offset=20)
+            assert page["total_trades"] == 25 and len(page["trades"]) == 5
+            assert (await client.deploy_strategy("Demo", "code"))["status"] == "deployed"
+        assert server.fake.deployed == {"Demo": "code"}
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_absorbed_by_retries():
+    config = FakeFreqtradeConfig(error_rate=0.3, seed=7)
+    async with FakeFreqtradeServer(config) as server:
+        async with FreqtradeClient(server.base_url, api_token="t", max_retries=8, backoff=0.001) as client:
+            result = await run_load(client, lambda c: c.get_status(), concurrency=5, requests=50)
+    assert result["requests"] == 50
+    assert result["errors"] == 0
+    assert result["latency_ms"]["p99"] >= result["latency_ms"]["p50"]
+
+
+@pytest.mark.asyncio
+async def test_trade_sync_against_fake(tmp_path):
+    async with FakeFreqtradeServer(FakeFreqtradeConfig(closed_trades=120)) as server:
+        async with FreqtradeClient(server.base_url, api_token="t") as client:
+            engine = TradeSyncEngine({"fake": client}, db_path=str(tmp_path / "t.db"), page_size=50)
+            try:
+                assert (await engine.sync_all())["fake"]["upserted"] == 123
+                assert engine.profit_summary()["trade_count"] == 120
+            finally:
+                engine.close()
+
+
+@pytest.mark.asyncio
+async def test_benchmark_report_shape():
+    report = await benchmark(parse_args(["--requests", "40", "--concurrency", "4", "--warmup", "0",
+                                         "--call", "fleet_status", "--fleet", "2"]))
+    assert report["bots"] == 2 and report["requests"] == 40
+    assert set(report["latency_ms"]) == {"p50", "p90", "p99", "max"}
+
+
+def test_percentile():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
@@ -0,0 +1,74 @@
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.freqtrade_client import FreqtradeClient
+
+
+def make_app(state):
+    async def login(request):
+        state["logins"] += 1
+        return web.json_response({"access_token": f"access-{state['logins']}", "refresh_token": "refresh"})
+
+    async def refresh(request):
+        state["refreshes"] += 1
+        return web.json_response({"access_token": "refreshed"})
+
+    async def status(request):
+        state["status_calls"] += 1
+        if request.headers.get("Authorization") == "Bearer access-1" and state["expire"]:
+            return web.json_response({"detail": "expired"}, status=401)
+        if state["fail_next"]:
+            state["fail_next"] -= 1
+            return web.json_response({"detail": "busy"}, status=503)
+        return web.json_response([{"trade_id": 1}])
+
+    async def start(request):
+        state["start_calls"] += 1
+        return web.json_response({"status": "busy"}, status=503)
+
+    app = web.Application()
+    app.router.add_post("/api/v1/token/login", login)
+    app.router.add_post("/api/v1/token/refresh", refresh)
+    app.router.add_get("/api/v1/status", status)
+    app.router.add_post("/api/v1/start", start)
+    return app
+
+
+@pytest.fixture
+def state():
+    return {"logins": 0, "refreshes": 0, "status_calls": 0, "start_calls": 0, "expire": False, "fail_next": 0}
+
+
+@pytest.mark.asyncio
+async def test_login_reuse_and_refresh(state):
+    async with TestServer(make_app(state)) as server:
+        async with FreqtradeClient(str(server.make_url("/api/v1")), username="u", password="p") as client:
+            assert await client.get_status() == [{"trade_id": 1}]
+            session = client._session
+            await client.get_status()
+            assert client._session is session
+            assert state["logins"] == 1
+
+            state["expire"] = True
+            assert await client.get_status() == [{"trade_id": 1}]
+            assert state["refreshes"] == 1
+            assert client.api_token == "refreshed"
+        assert client._session is None
+
+
+@pytest.mark.asyncio
+async def test_idempotent_requests_retry(state):
+    state["fail_next"] = 2
+    async with TestServer(make_app(state)) as server:
+        async with FreqtradeClient(str(server.make_url("/api/v1")), api_token="t", backoff=0.001) as client:
+            assert await client.get_status() == [{"trade_id": 1}]
+    assert state["status_calls"] == 3
+
+
+@pytest.mark.asyncio
+async def test_non_idempotent_requests_do_not_retry(state):
+    async with TestServer(make_app(state)) as server:
+        async with FreqtradeClient(str(server.make_url("/api/v1")), api_token="t", backoff=0.001) as client:
+            with pytest.raises(Exception):
+                await client.start_bot()
+    assert state["start_calls"] == 1
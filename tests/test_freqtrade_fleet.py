@@ -0,0 +1,103 @@
+import asyncio
+import time
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from src.freqtrade_fleet import FreqtradeFleetClient
+
+
+def make_bot(delay: float, calls: list, stake: str = "USDT"):
+    async def status(request):
+        calls.append("status")
+        await asyncio.sleep(delay)
+        return web.json_response([{"trade_id": 1, "pair": "BTC/USDT"}])
+
+    async def profit(request):
+        await asyncio.sleep(delay)
+        return web.json_response({"profit_closed_coin": 1.5, "trade_count": 3, "profit_closed_ratio": 0.1})
+
+    async def balance(request):
+        return web.json_response({"total": 100.0, "stake": stake})
+
+    async def trades(request):
+        return web.json_response({"trades": [{"trade_id": delay, "close_timestamp": int(delay * 1000)}]})
+
+    app = web.Application()
+    app.router.add_get("/api/v1/status", status)
+    app.router.add_get("/api/v1/profit", profit)
+    app.router.add_get("/api/v1/balance", balance)
+    app.router.add_get("/api/v1/trades", trades)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_fan_out_is_concurrent_with_partial_results():
+    calls = []
+    servers = [TestServer(make_bot(0.2, calls)) for _ in range(3)]
+    slow = TestServer(make_bot(5.0, calls))
+    for server in servers + [slow]:
+        await server.start_server()
+    bots = [{"name": f"bot{i}", "base_url": str(s.make_url("/api/v1")), "api_token": "t"}
+            for i, s in enumerate(servers)]
+    bots.append({"name": "slow", "base_url": str(slow.make_url("/api/v1")), "api_token": "t"})
+    fleet = FreqtradeFleetClient(bots, timeout=0.5, max_retries=0)
+    try:
+        started = time.perf_counter()
+        status = await fleet.get_status()
+        elapsed = time.perf_counter() - started
+        assert elapsed < 0.9  # slowest bot's timeout, not the sum
+        assert set(status["bots"]) == {"bot0", "bot1", "bot2"}
+        assert "slow" in status["errors"]
+        assert status["open_trade_count"] == 3
+        assert {t["bot"] for t in status["open_trades"]} == {"bot0", "bot1", "bot2"}
+
+        profit = await fleet.get_profit()
+        assert profit["total"]["profit_closed_coin"] == pytest.approx(4.5)
+        assert profit["total"]["trade_count"] == 9
+
+        balance = await fleet.get_balance()
+        assert balance["total"] == {"USDT": 400.0}
+    finally:
+        await fleet.close()
+        for server in servers + [slow]:
+            await server.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_readers_share_one_fan_out():
+    calls = []
+    server = TestServer(make_bot(0.05, calls))
+    await server.start_server()
+    fleet = FreqtradeFleetClient(
+        [{"name": "a", "base_url": str(server.make_url("/api/v1")), "api_token": "t"}], cache_ttl=5
+    )
+    try:
+        results = await asyncio.gather(*(fleet.get_status() for _ in range(10)))
+        assert all(r is results[0] for r in results)
+        await fleet.get_status()
+        assert calls.count("status") == 1
+        fleet.invalidate()
+        await fleet.get_status()
+        assert calls.count("status") == 2
+    finally:
+        await fleet.close()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_build_is_retried_by_a_waiting_reader():
+    fleet = FreqtradeFleetClient([])
+    builds = []
+
+    async def build():
+        builds.append(1)
+        await asyncio.sleep(0.05)
+        return {"build": len(builds)}
+
+    first = asyncio.ensure_future(fleet._cached(("status",), build))
+    await asyncio.sleep(0)
+    followers = [asyncio.ensure_future(fleet._cached(("status",), build)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await asyncio.gather(*followers) == [{"build": 2}] * 3
+    assert first.cancelled() and len(builds) == 2
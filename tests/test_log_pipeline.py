@@ -0,0 +1,116 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import pytest
+from src.log_pipeline import (BoundedQueueHandler, JsonFormatter, LogPipeline, RequestIdMiddleware,
+                              per_process_files, request_id_var)
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.get_ident())
+
+
+@pytest.fixture
+def pipeline():
+    root = logging.getLogger("pipeline_test")
+    root.setLevel(logging.DEBUG)
+    root.propagate = False
+    sink = _Collect()
+    root.addHandler(sink)
+    pipeline = LogPipeline(queue_size=100, sample_every={"/health": 10})
+    pipeline.install(root)
+    yield root, sink, pipeline
+    pipeline.stop(root)
+    root.removeHandler(sink)
+
+
+def test_records_are_written_off_thread_with_request_ids(pipeline):
+    root, sink, pipe = pipeline
+    token = request_id_var.set("abc123")
+    try:
+        root.info("hello %s", "world", extra={"pair": "BTC/USDT"})
+    finally:
+        request_id_var.reset(token)
+    pipe.stop(root)
+    record = sink.records[0]
+    assert sink.threads and threading.get_ident() not in sink.threads
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world" and entry["request_id"] == "abc123"
+    assert entry["pair"] == "BTC/USDT" and entry["level"] == "INFO"
+
+
+def test_high_frequency_routes_are_sampled(pipeline):
+    root, sink, pipe = pipeline
+    for _ in range(100):
+        root.info("Health check endpoint called", extra={"route": "/health"})
+    root.warning("degraded", extra={"route": "/health"})
+    root.info("other")
+    pipe.stop(root)
+    assert len(sink.records) == 12
+    assert pipe.stats()["sampled_out"] == 90
+
+
+def test_full_queue_drops_and_counts():
+    handler = BoundedQueueHandler(queue.Queue(maxsize=2), block_timeout=0.01)
+    log = logging.getLogger("drop_test")
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        for level in (logging.INFO, logging.INFO, logging.INFO, logging.ERROR):
+            log.log(level, "x")
+    finally:
+        log.removeHandler(handler)
+    assert handler.enqueued == 2
+    assert handler.dropped == {"INFO": 1, "ERROR": 1}
+
+
+def test_exceptions_are_serialised():
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.LogRecord("x", logging.ERROR, __file__, 1, "failed", (), __import__("sys").exc_info())
+    assert "ValueError: bad" in json.loads(JsonFormatter().format(record))["exc"]
+
+
+@pytest.mark.asyncio
+async def test_request_id_middleware_echoes_or_generates():
+    seen = []
+
+    async def app(scope, receive, send):
+        seen.append(request_id_var.get())
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = RequestIdMiddleware(app)
+    await middleware({"type": "http", "headers": [(b"x-request-id", b"given")]}, None, send)
+    await middleware({"type": "http", "headers": []}, None, send)
+    assert seen[0] == "given" and len(seen[1]) == 16
+    assert (b"x-request-id", b"given") in sent[0]["headers"]
+    assert request_id_var.get() is None
+
+
+def test_each_worker_rotates_its_own_log_file(tmp_path):
+    root = logging.getLogger("per_process_test")
+    root.propagate = False
+    handler = logging.handlers.RotatingFileHandler(str(tmp_path / "app.log"), maxBytes=1000, backupCount=1)
+    root.addHandler(handler)
+    per_process_files(root)
+    root.warning("hello")
+    handler.close()
+    root.removeHandler(handler)
+    assert (tmp_path / f"app.{os.getpid()}.log").read_text() == "hello\n"
@@ -0,0 +1,114 @@
+import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pytest
+from src.cache import CacheManager
+from src.market_screener import (MarketScreener, discover_pairs, load_ohlcv_file, resolve_datadir,
+                                 score, screen, stack_ohlcv)
+from src.controllers.claude_controller import ClaudeFreqAIController
+
+START_MS = 1_700_000_000_000
+STEP_MS = 300_000
+
+
+def _candles(close, volume=None):
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.full(len(close), 100.0) if volume is None else np.asarray(volume, dtype=np.float64)
+    dates = START_MS + np.arange(len(close)) * STEP_MS
+    return dates, close, volume
+
+
+def _write_feather(path, close, volume=None):
+    dates, close, volume = _candles(close, volume)
+    table = pa.table({
+        "date": pa.array(dates, type=pa.timestamp("ms", tz="UTC")),
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": volume,
+    })
+    feather.write_feather(table, str(path))
+
+
+def _write_json(path, close, volume=None):
+    dates, close, volume = _candles(close, volume)
+    rows = [[int(d), c, c * 1.01, c * 0.99, c, v] for d, c, v in zip(dates, close, volume)]
+    path.write_text(json.dumps(rows))
+
+
+@pytest.fixture
+def datadir(tmp_path):
+    n = 120
+    rng = np.random.default_rng(0)
+    _write_feather(tmp_path / "BTC_USDT-5m.feather", 100 * np.exp(np.linspace(0, 0.2, n)))
+    _write_feather(tmp_path / "ETH_USDT-5m.feather", 50 * np.exp(np.linspace(0, -0.2, n)))
+    spike = np.full(n, 100.0)
+    spike[-1] = 1000.0
+    _write_json(tmp_path / "SOL_USDT-5m.json", 20 + rng.normal(0, 0.05, n), spike)
+    _write_feather(tmp_path / "NEW_USDT-5m.feather", np.linspace(1, 2, 30))
+    return tmp_path
+
+
+def test_loads_feather_and_json_with_ms_timestamps(datadir):
+    files = discover_pairs(str(datadir), "5m")
+    assert set(files) == {"BTC/USDT", "ETH/USDT", "SOL/USDT", "NEW/USDT"}
+    btc = load_ohlcv_file(files["BTC/USDT"], rows=50)
+    sol = load_ohlcv_file(files["SOL/USDT"], rows=50)
+    assert len(btc["close"]) == len(sol["close"]) == 50
+    assert btc["date"][-1] == sol["date"][-1] == START_MS + 119 * STEP_MS
+
+
+def test_vectorised_metrics_match_the_data(datadir):
+    frames = {pair: load_ohlcv_file(path, 100) for pair, path in discover_pairs(str(datadir), "5m").items()}
+    pairs, stacked, skipped = stack_ohlcv(frames, 100)
+    assert skipped == ["NEW/USDT"] and stacked["close"].shape == (3, 100)
+    metrics = screen(stacked)
+    by_pair = {pair: {name: values[i] for name, values in metrics.items()} for i, pair in enumerate(pairs)}
+    assert by_pair["BTC/USDT"]["trend"] > 0 and by_pair["BTC/USDT"]["trend_r2"] > 0.99
+    assert by_pair["ETH/USDT"]["trend"] < 0 and by_pair["ETH/USDT"]["rsi"] == 0
+    assert by_pair["BTC/USDT"]["rsi"] == 100
+    assert by_pair["SOL/USDT"]["volume_spike"] == pytest.approx(10.0)
+    _, flags = score(metrics)
+    flags = dict(zip(pairs, flags))
+    assert flags["BTC/USDT"] == ["uptrend", "overbought"]
+    assert flags["ETH/USDT"] == ["downtrend", "oversold"]
+    assert "volume_spike" in flags["SOL/USDT"]
+
+
+def test_scan_is_cached_until_the_next_candle(datadir, monkeypatch):
+    cache = CacheManager()
+    screener = MarketScreener(str(datadir), timeframes=("5m",), cache=cache)
+    monkeypatch.setattr("src.market_screener.time.time", lambda: 1_000_000.0)
+    first = screener.scan("5m")
+    (datadir / "ETH_USDT-5m.feather").unlink()
+    assert screener.scan("5m") is first
+    monkeypatch.setattr("src.market_screener.time.time", lambda: 1_000_300.0)
+    assert {row["pair"] for row in screener.scan("5m")["pairs"]} == {"BTC/USDT", "SOL/USDT"}
+
+
+def test_summary_and_datadir_resolution(datadir, tmp_path):
+    summary = MarketScreener(str(datadir), timeframes=("5m",)).summary(top=2)
+    assert summary.splitlines()[0].startswith("5m: 3 pairs, 1 uptrend, 1 downtrend, median RSI")
+    assert len(summary.splitlines()) == 4
+    assert "No 5m candle data" in MarketScreener(str(tmp_path / "empty")).summary()
+    assert resolve_datadir({"datadir": "/data"}, "x/config.json") == "/data"
+    assert resolve_datadir({"exchange": {"name": "kraken"}}, "/ft/user_data/config.json") == \
+        "/ft/user_data/data/kraken"
+
+
+class _Messages:
+    def __init__(self):
+        self.prompts = []
+
+    async def create(self, **kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        self.prompts.append(prompt)
+        text = "market analysis" if "Convert this FreqTrade command" in prompt else "BTC/USDT leads"
+        return type("Response", (), {"content": [type("Block", (), {"text": text})]})
+
+
+@pytest.mark.asyncio
+async def test_controller_grounds_market_answers_in_the_screen(datadir):
+    client = type("Client", (), {"messages": _Messages()})()
+    screener = MarketScreener(str(datadir), timeframes=("5m",))
+    controller = ClaudeFreqAIController({"claude_integration": {}}, client, screener=screener)
+    assert await controller.handle_command("how is the market looking?") == "BTC/USDT leads"
+    assert "- BTC/USDT: +" in client.messages.prompts[-1]
@@ -0,0 +1,80 @@
+import statistics
+import pytest
+from src.freqai_integration import FreqAIIntegration
+from src.metrics_tracker import (
+    RunningStats, ProfitFactorAccumulator, RollingMean, PerformanceTracker, MAX_PROFIT_FACTOR
+)
+
+
+def test_running_stats_matches_statistics():
+    values = [0.02, -0.01, 0.035, -0.004, 0.011, 0.0]
+    stats = RunningStats()
+    for value in values:
+        stats.update(value)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.variance(values))
+
+
+def test_profit_factor():
+    acc = ProfitFactorAccumulator()
+    assert acc.profit_factor == 0.0
+    acc.update(0.03)
+    assert acc.profit_factor == MAX_PROFIT_FACTOR
+    acc.update(-0.01)
+    acc.update(0.01)
+    assert acc.profit_factor == pytest.approx(4.0)
+    assert (acc.wins, acc.losses) == (2, 1)
+
+
+def test_rolling_mean_evicts_oldest():
+    rolling = RollingMean(3)
+    for value in [1.0, 2.0, 3.0, 4.0]:
+        rolling.update(value)
+    assert len(rolling) == 3
+    assert rolling.mean == pytest.approx(3.0)
+
+
+def test_tracker_aggregate_and_per_pair():
+    tracker = PerformanceTracker(window=10)
+    tracker.record_trade(0.02, "BTC/USDT")
+    tracker.record_trade(-0.01, "ETH/USDT")
+    tracker.record_prediction(0.5, 0.2, "BTC/USDT")
+    tracker.record_prediction(0.5, -0.2, "BTC/USDT")
+
+    total = tracker.snapshot()
+    assert total["trade_count"] == 2
+    assert total["profit_factor"] == pytest.approx(2.0)
+    assert total["accuracy"] == pytest.approx(0.5)
+    assert tracker.snapshot("BTC/USDT")["prediction_count"] == 2
+    assert tracker.snapshot("ETH/USDT")["prediction_count"] == 0
+    assert "accuracy" not in tracker.snapshot("ETH/USDT")  # no predictions fed, nothing to score
+    assert set(tracker.pairs()) == {"BTC/USDT", "ETH/USDT"}
+
+
+def test_published_snapshot_is_not_mutated_by_updates():
+    tracker = PerformanceTracker()
+    before = tracker.snapshot()
+    tracker.record_trade(0.05)
+    assert before["trade_count"] == 0
+    assert tracker.snapshot()["trade_count"] == 1
+
+
+def test_pair_update_replaces_only_that_pair():
+    tracker = PerformanceTracker()
+    tracker.record_trade(0.01, "BTC/USDT")
+    btc, published = tracker.snapshot("BTC/USDT"), tracker._pair_snapshots
+    listed = tracker.pairs()
+    tracker.record_trade(0.02, "ETH/USDT")
+    assert tracker._pair_snapshots is published and tracker.snapshot("BTC/USDT") is btc
+    assert set(listed) == {"BTC/USDT"}
+
+
+def test_replayed_trades_skip_history_and_live_trades_use_their_close_time():
+    integration = FreqAIIntegration({"claude_integration": {}}, client=None)
+    for _ in range(3):
+        integration.record_trade(0.01, "BTC/USDT", ts=1_000.0, history=False)
+    integration.record_trade(0.02, "BTC/USDT", ts=1_700_000_000.0)
+    integration.record_trade(-0.01, "BTC/USDT", ts=1_600_000_000.0)  # synced late
+    assert integration.performance.snapshot()["trade_count"] == 5
+    history = integration.metrics_history.query("sharpe_ratio", start=0, end=2e9)
+    assert history["ts"] == [1_700_000_000.0, 1_700_000_000.0]
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from src.monitoring import MonitoringSystem, MetricFamily
+from src.cache import CacheManager
+
+
+def test_metric_family_renders_counter_and_labels():
+    family = MetricFamily("demo_calls", "counter", "Demo calls.", ("model",))
+    family.inc(2, 'claude "x"')
+    out = []
+    family.render(out)
+    text = "".join(out)
+    assert "# TYPE demo_calls counter\n" in text
+    assert 'demo_calls_total{model="claude \\"x\\""} 2\n' in text
+
+
+@pytest.mark.asyncio
+async def test_collect_renders_openmetrics():
+    monitoring = MonitoringSystem()
+    monitoring.record_llm_call("claude-test", 0.25, True)
+    monitoring.record_llm_call("claude-test", 0.5, False)
+
+    async def bot_status():
+        return {"open_trades": 3, "running": True}
+
+    monitoring.register_source("freqtrade", bot_status)
+    values = await monitoring.collect_metrics()
+    assert values["freqtrade.open_trades"] == 3.0
+
+    text = monitoring.render().decode()
+    assert text.endswith("# EOF\n")
+    assert 'freqassistant_llm_calls_total{model="claude-test",outcome="success"} 1' in text
+    assert 'freqassistant_llm_calls_total{model="claude-test",outcome="error"} 1' in text
+    assert 'freqassistant_source_value{source="freqtrade",key="running"} 1' in text
+    assert 'freqassistant_source_up{source="freqtrade"} 1' in text
+    assert "freqassistant_process_resident_memory_bytes " in text
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_rates_are_exported_per_region():
+    cache = CacheManager()
+    cache.set("config", "a", 1)
+    cache.get("config", "a")
+    cache.get("config", "missing")
+    monitoring = MonitoringSystem()
+    monitoring.register_source("cache", cache.stats)
+    values = await monitoring.collect_metrics()
+    assert values["cache.config.hit_rate"] == 0.5
+    assert values["cache.config.size"] == 1.0
+    assert 'freqassistant_source_value{source="cache",key="config.hit_rate"} 0.5' in monitoring.render().decode()
+
+
+@pytest.mark.asyncio
+async def test_failing_and_slow_sources_are_isolated():
+    monitoring = MonitoringSystem(source_timeout=0.05)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    async def slow():
+        await asyncio.sleep(1)
+        return {"x": 1}
+
+    monitoring.register_source("broken", broken)
+    monitoring.register_source("slow", slow)
+    await monitoring.collect_metrics()
+    text = monitoring.render().decode()
+    assert 'freqassistant_source_up{source="broken"} 0' in text
+    assert 'freqassistant_source_up{source="slow"} 0' in text
+
+
+@pytest.mark.asyncio
+async def test_collector_task_runs_on_schedule():
+    monitoring = MonitoringSystem(interval=0.01, jitter=0.0)
+    calls = []
+    monitoring.register_source("tick", lambda: calls.append(1) or {})
+    monitoring.start()
+    await asyncio.sleep(0.06)
+    await monitoring.stop()
+    assert len(calls) >= 2
+    assert "freqassistant_event_loop_lag_seconds" in monitoring.render().decode()
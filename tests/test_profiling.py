@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import FastAPI, HTTPException
+from src.profiling import (LatencyHistogram, RequestMetrics, LatencyMiddleware, SamplingProfiler, EventLoopLagMonitor,
+                           UNMATCHED_ROUTE)
+from src.monitoring import MonitoringSystem
+from src import api_route
+
+
+async def _get(app, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+             "headers": [], "root_path": "", "scheme": "http", "server": ("test", 80), "http_version": "1.1"}
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+
+def test_histogram_quantiles():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.observe(0.002)
+    for _ in range(10):
+        histogram.observe(0.3, error=True)
+    summary = histogram.summary()
+    assert summary["count"] == 100 and summary["errors"] == 10
+    assert 1.0 <= summary["p50_ms"] <= 2.5
+    assert 250 <= summary["p99_ms"] <= 300 and summary["max_ms"] == 300
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template():
+    app = FastAPI()
+    metrics = RequestMetrics()
+    app.add_middleware(LatencyMiddleware, metrics=metrics)
+
+    @app.get("/items/{name}")
+    async def item(name: str):
+        if name == "boom":
+            raise HTTPException(status_code=503)
+        return {"name": name}
+
+    assert await _get(app, "/items/a") == 200
+    assert await _get(app, "/items/b") == 200
+    assert await _get(app, "/items/boom") == 503
+    assert await _get(app, "/missing") == 404
+    routes = {(r["method"], r["route"]): r for r in metrics.snapshot()["routes"]}
+    assert routes[("GET", "/items/{name}")]["count"] == 3
+    assert routes[("GET", "/items/{name}")]["errors"] == 1
+    assert routes[("GET", UNMATCHED_ROUTE)]["count"] == 1
+    assert metrics.in_flight == 0 and metrics.in_flight_peak == 1
+
+    monitoring = MonitoringSystem()
+    monitoring.register_collector(metrics)
+    await monitoring.collect_metrics()
+    text = monitoring.render().decode()
+    assert 'route="/items/{name}",le="+Inf"} 3' in text and text.endswith("# EOF\n")
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_sees_blocking_calls():
+    monitor = EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.1)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    snapshot = monitor.snapshot()
+    assert snapshot["count"] >= 3 and snapshot["max_ms"] >= 80
+    out = []
+    monitor.render(out)
+    assert any(line.startswith('freqassistant_event_loop_lag_seconds_bucket{le="+Inf"}') for line in out)
+    monitor.reset()
+    assert monitor.snapshot()["count"] == 0
+
+
+def test_sampling_profiler_collapses_busy_thread_stacks():
+    stop = threading.Event()
+
+    def spin_in_hot_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=spin_in_hot_loop, name="spinner")
+    worker.start()
+    try:
+        result = SamplingProfiler(interval=0.001).profile(0.2)
+    finally:
+        stop.set()
+        worker.join()
+    assert result["samples"] > 10
+    lines = SamplingProfiler.collapse(result["stacks"]).splitlines()
+    spinner = [line for line in lines if line.startswith("spinner;")]
+    assert spinner and "spin_in_hot_loop (tests/test_profiling.py:" in spinner[0]
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_profiler_rejects_concurrent_runs():
+    profiler = SamplingProfiler()
+    thread = threading.Thread(target=profiler.profile, args=(0.2,))
+    thread.start()
+    time.sleep(0.05)
+    with pytest.raises(RuntimeError):
+        profiler.profile(0.01)
+    thread.join()
+
+
+def test_admin_guard(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    with pytest.raises(HTTPException) as disabled:
+        api_route.require_admin("anything")
+    assert disabled.value.status_code == 404
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    with pytest.raises(HTTPException) as denied:
+        api_route.require_admin("wrong")
+    assert denied.value.status_code == 403
+    api_route.require_admin("secret")
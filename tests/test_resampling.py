@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.resampling import Resampler, align_informative, resample_ohlcv
+from src.market_screener import MarketScreener
+from tests.test_market_screener import _write_feather
+
+START_MS = 1_700_000_000_000 // 3_600_000 * 3_600_000
+STEP_MS = 300_000
+
+
+def _candles(n, start=START_MS, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    open_ = np.r_[close[0], close[:-1]]
+    return {
+        "date": (start + np.arange(n) * STEP_MS).astype(np.float64),
+        "open": open_, "high": np.maximum(open_, close) * 1.002, "low": np.minimum(open_, close) * 0.998,
+        "close": close, "volume": rng.uniform(1, 10, n),
+    }
+
+
+def test_matches_pandas_resample_and_flags_the_open_bucket():
+    candles = _candles(130)
+    resampled, complete = resample_ohlcv(candles, "1h", "5m")
+    frame = pd.DataFrame(candles)
+    frame.index = pd.to_datetime(frame["date"], unit="ms")
+    expected = frame.resample("1h").agg({"open": "first", "high": "max", "low": "min",
+                                         "close": "last", "volume": "sum"})
+    for name in ("open", "high", "low", "close", "volume"):
+        np.testing.assert_allclose(resampled[name], expected[name].to_numpy())
+    assert complete.tolist() == [True] * 10 + [False]
+
+
+def test_incremental_updates_equal_one_batch():
+    candles = _candles(1000)
+    batch = Resampler("5m", ["15m", "1h", "4h"])
+    batch.update("BTC/USDT", candles)
+    incremental = Resampler("5m", ["15m", "1h", "4h"])
+    rng = np.random.default_rng(1)
+    end = 0
+    while end < 1000:
+        new_end = min(1000, end + int(rng.integers(1, 40)))
+        # Overlapping deliveries are deduplicated by timestamp
+        incremental.update("BTC/USDT", {k: v[max(0, end - 3):new_end] for k, v in candles.items()})
+        end = new_end
+    for timeframe in ("15m", "1h", "4h"):
+        a, b = batch.get("BTC/USDT", timeframe), incremental.get("BTC/USDT", timeframe)
+        for name in a:
+            np.testing.assert_array_equal(a[name], b[name])
+    assert len(batch.get("BTC/USDT", "1h")["date"]) == 83
+    assert incremental.update("BTC/USDT", candles) == {"15m": 0, "1h": 0, "4h": 0}
+
+
+def test_first_partial_bucket_is_dropped():
+    candles = _candles(30, start=START_MS + 5 * STEP_MS)
+    resampler = Resampler("5m", ["1h"])
+    resampler.update("ETH/USDT", candles)
+    derived = resampler.get("ETH/USDT", "1h")
+    assert derived["date"].tolist() == [START_MS + 3_600_000]
+    assert derived["open"][0] == candles["open"][7]
+
+
+def test_alignment_has_no_lookahead():
+    candles = _candles(48)
+    hourly, complete = resample_ohlcv(candles, "1h", "5m")
+    aligned = align_informative(candles["date"], "5m", hourly, "1h")
+    # The 00:00 hourly candle closes with the 00:55 five-minute candle
+    assert np.isnan(aligned["close"][:11]).all()
+    assert aligned["close"][11] == hourly["close"][0] == candles["close"][11]
+    assert aligned["close"][23] == hourly["close"][1]
+    assert (aligned["date"][11:23] == START_MS).all()
+
+    resampler = Resampler("5m", ["1h"])
+    pairs, stacked, skipped = resampler.aligned_stack({"A/USDT": candles, "B/USDT": _candles(48, seed=2)}, 24)
+    assert pairs == ["A/USDT", "B/USDT"] and stacked["close_1h"].shape == (2, 24)
+    np.testing.assert_array_equal(stacked["close_1h"][0], aligned["close"][-24:])
+
+
+def test_screener_derives_missing_timeframes(tmp_path):
+    for i, pair in enumerate(("BTC_USDT", "ETH_USDT")):
+        _write_feather(tmp_path / f"{pair}-5m.feather", _candles(1300, seed=i)["close"])
+    scan = MarketScreener(str(tmp_path), timeframes=("5m", "1h"), window=100).scan("1h")
+    assert {row["pair"] for row in scan["pairs"]} == {"BTC/USDT", "ETH/USDT"}
+    with pytest.raises(ValueError):
+        Resampler("1h", ["90m"])
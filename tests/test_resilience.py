@@ -0,0 +1,191 @@
+import asyncio
+import time
+import pytest
+from src.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, RetryBudget, is_retryable
+from src.error_handler import ErrorHandler, ErrorRecoveryManager
+from src.controllers.claude_controller import ClaudeFreqAIController
+
+
+class Overloaded(Exception):
+    status_code = 529
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_and_probes_after_reset():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now = 10
+    assert breaker.allow() and not breaker.allow()  # one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.times_opened == 2
+
+
+def test_retry_budget_caps_retries_to_a_fraction_of_traffic():
+    clock = _Clock()
+    budget = RetryBudget(ratio=0.1, min_per_window=1, window=10, clock=clock)
+    for _ in range(20):
+        budget.record_request()
+    assert sum(budget.try_spend() for _ in range(10)) == 3
+    clock.now = 11
+    assert budget.try_spend()
+
+
+def test_retryable_classification():
+    assert is_retryable(Overloaded()) and is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(BadRequest()) and not is_retryable(ValueError())
+
+
+@pytest.mark.asyncio
+async def test_falls_back_when_primary_fails_and_skips_it_once_open():
+    calls = []
+
+    async def call(model):
+        calls.append(model)
+        if model == "primary":
+            raise Overloaded("busy")
+        return f"answer from {model}"
+
+    caller = ResilientCaller(["primary", "fast"], failure_threshold=2, max_retries=1, hedge=False)
+    caller.budget.min_per_window = 100
+    assert await caller.call(call) == "answer from fast"
+    assert calls == ["primary", "primary", "fast"]
+    calls.clear()
+    assert await caller.call(call) == "answer from fast"
+    assert calls == ["fast"]
+    status = caller.status()
+    assert status["models"]["primary"]["breaker"] == "open" and status["fallbacks"] == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_are_raised_without_failover():
+    async def call(model):
+        raise BadRequest("bad prompt")
+
+    caller = ResilientCaller(["primary", "fast"], hedge=False)
+    with pytest.raises(BadRequest):
+        await caller.call(call)
+    assert caller.stats["fast"].calls == 0 and caller.breakers["primary"].state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe_is_released_by_cancellation_and_bad_requests():
+    caller = ResilientCaller(["primary"], failure_threshold=1, reset_timeout=0, max_retries=0, hedge=False)
+    breaker = caller.breakers["primary"]
+    breaker.record_failure()
+    started = asyncio.Event()
+
+    async def hang(model):
+        started.set()
+        await asyncio.sleep(10)
+
+    probe = asyncio.ensure_future(caller.call(hang))
+    await started.wait()
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+    assert breaker.state == "half_open" and breaker.allow()
+
+    breaker.release()
+
+    async def bad(model):
+        raise BadRequest("bad prompt")
+    with pytest.raises(BadRequest):
+        await caller.call(bad)
+    assert breaker.state == "half_open" and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_all_tiers_open_raises_circuit_open():
+    caller = ResilientCaller(["primary"], failure_threshold=1, max_retries=0, hedge=False)
+
+    async def failing(model):
+        raise Overloaded()
+    with pytest.raises(Overloaded):
+        await caller.call(failing)
+    with pytest.raises(CircuitOpenError):
+        await caller.call(failing)
+
+
+@pytest.mark.asyncio
+async def test_slow_attempt_is_hedged_and_tail_is_bounded():
+    attempts = 0
+
+    async def call(model):
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(5 if attempts == 21 else 0.001)
+        return attempts
+
+    caller = ResilientCaller(["primary"], hedge_min_samples=20, hedge_min_delay=0.02)
+    caller.budget.min_per_window = 100
+    for _ in range(20):
+        await caller.call(call)
+    started = time.perf_counter()
+    assert await caller.call(call) == 22
+    assert time.perf_counter() - started < 0.5
+    assert caller.stats["primary"].hedges == 1 and caller.stats["primary"].hedge_wins == 1
+
+    slow = ResilientCaller(["primary"], timeout=0.05, max_retries=0, hedge=False)
+
+    async def hang(model):
+        await asyncio.sleep(5)
+    with pytest.raises(asyncio.TimeoutError):
+        await slow.call(hang)
+
+
+@pytest.mark.asyncio
+async def test_error_handler_uses_mro_and_recovery_degrades_gracefully():
+    handler = ErrorHandler()
+
+    async def on_lookup(error, context):
+        return "handled"
+    handler.register(LookupError, on_lookup)
+    assert await handler.handle(KeyError("x")) == "handled"
+    with pytest.raises(ValueError):
+        await handler.handle(ValueError("x"))
+
+    recovery = ErrorRecoveryManager()
+    assert "temporarily unavailable" in await recovery.handle_error(CircuitOpenError(), {"component": "claude"})
+    assert await recovery.handle_error(ValueError("x"), {"component": "claude"}) is None
+    assert recovery.summary()["error_counts"] == {"claude": 2}
+
+
+class _FlakyMessages:
+    def __init__(self):
+        self.models = []
+
+    async def create(self, model, **kwargs):
+        self.models.append(model)
+        if model == "big":
+            raise Overloaded("overloaded")
+        content = type("Block", (), {"text": f"ok from {model}"})
+        return type("Response", (), {"content": [content]})
+
+
+@pytest.mark.asyncio
+async def test_controller_uses_fallback_tier():
+    client = type("Client", (), {"messages": _FlakyMessages()})()
+    config = {"claude_integration": {"model_version": "big", "fallback_models": ["small"],
+                                     "resilience": {"max_retries": 0, "hedge": False}}}
+    controller = ClaudeFreqAIController(config, client)
+    assert await controller.complete([{"role": "user", "content": "hi"}]) == "ok from small"
+    assert client.messages.models == ["big", "small"]
@@ -0,0 +1,79 @@
+import time
+import pytest
+from src.semantic_cache import SemanticCache, tokenize, jaccard
+from src.controllers.claude_controller import ClaudeFreqAIController
+
+
+def test_rephrasings_normalise_to_similar_token_sets():
+    a = tokenize("make me an RSI strategy")
+    b = tokenize("create RSI based strat")
+    assert a == b == {"create", "rsi", "strategy"}
+    assert jaccard(tokenize("build a bollinger bands strategy"), tokenize("create bb strats")) < 1.0
+
+
+def test_hits_above_threshold_only():
+    cache = SemanticCache(threshold=0.75)
+    cache.store("m", "make me an RSI strategy", "rsi code")
+    assert cache.lookup("m", "create RSI based strat") == ("rsi code", 1.0)
+    assert cache.lookup("m", "create a MACD strategy") is None
+    assert cache.lookup("other-model", "create RSI based strat") is None
+    assert cache.snapshot()["hits"] == 1 and cache.snapshot()["misses"] == 2
+
+
+def test_numbers_must_match():
+    cache = SemanticCache(threshold=0.5)
+    cache.store("m", "create an RSI 14 strategy on 5m candles", "rsi14")
+    assert cache.lookup("m", "make an RSI 21 strategy on 5m candles") is None
+    assert cache.lookup("m", "make RSI 14 strat on 5m candles")[0] == "rsi14"
+
+
+def test_negations_and_qualifiers_must_match():
+    cache = SemanticCache(threshold=0.5)
+    cache.store("m", "RSI strategy with volume filter for long trades", "long")
+    assert cache.lookup("m", "RSI strategy without volume filter for long trades") is None
+    assert cache.lookup("m", "RSI strategy with volume filter for short trades") is None
+    assert cache.lookup("m", "RSI strat with volume filter for long trades")[0] == "long"
+    cache.store("m", "entry when price is above the EMA", "above")
+    assert cache.lookup("m", "entry when price is not above the EMA") is None
+
+
+def test_mutating_requests_bypass_the_cache():
+    cache = SemanticCache()
+    assert not cache.store("m", "update config stake amount to 100", "done")
+    assert cache.lookup("m", "stop the bot") is None
+    assert cache.snapshot()["bypassed"] == 1 and cache.snapshot()["size"] == 0
+
+
+def test_bounded_with_lru_eviction_and_ttl():
+    cache = SemanticCache(maxsize=2, ttl=0.05)
+    cache.store("m", "rsi strategy", 1)
+    cache.store("m", "macd strategy", 2)
+    assert cache.lookup("m", "rsi strategy") == (1, 1.0)  # refresh rsi
+    cache.store("m", "ema crossover strategy", 3)
+    assert cache.lookup("m", "macd strategy") is None
+    assert cache.snapshot()["evictions"] == 1 and cache.snapshot()["size"] == 2
+    time.sleep(0.06)
+    assert cache.lookup("m", "rsi strategy") is None
+    assert cache.snapshot()["size"] == 1
+
+
+class _Messages:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        text = "strategy" if "Convert this FreqTrade command" in kwargs["messages"][0]["content"] \
+            else "class RsiStrategy: pass"
+        return type("Response", (), {"content": [type("Block", (), {"text": text})]})
+
+
+@pytest.mark.asyncio
+async def test_controller_serves_rephrased_strategy_requests_from_cache():
+    client = type("Client", (), {"messages": _Messages()})()
+    controller = ClaudeFreqAIController({"claude_integration": {}}, client)
+    first = await controller.handle_command("make me an RSI strategy")
+    calls = client.messages.calls
+    assert await controller.handle_command("create RSI based strat") == first
+    assert client.messages.calls == calls + 1  # classified again, but not regenerated
+    assert controller.semantic_cache.lookup(f"{controller.model_version}:backtest", "create RSI based strat") is None
@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import time
+import pytest
+from src.shared_state import SharedStore, SessionStore, LeaderElector
+from src.secure_commands import RateLimiter
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedStore(str(tmp_path / "shared.db"))
+    yield store
+    store.close()
+
+
+def _drain_bucket(path, attempts, results):
+    store = SharedStore(path)
+    results.put(sum(store.try_acquire("api", rate=0.001, capacity=50)[0] for _ in range(attempts)))
+    store.close()
+
+
+def test_token_bucket_is_shared_across_processes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    SharedStore(path).close()
+    results = multiprocessing.get_context("spawn").Queue()
+    workers = [multiprocessing.get_context("spawn").Process(target=_drain_bucket, args=(path, 30, results))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+    assert sum(results.get(timeout=5) for _ in workers) == 50
+
+
+def test_token_bucket_refills(store):
+    assert store.try_acquire("b", rate=100, capacity=1) == (True, 0.0)
+    allowed, retry_after = store.try_acquire("b", rate=100, capacity=1)
+    assert not allowed and 0 < retry_after <= 0.01
+    time.sleep(retry_after + 0.005)
+    assert store.try_acquire("b", rate=100, capacity=1)[0]
+
+
+def test_kv_ttl_and_sessions(store):
+    store.put("jobs", "sync", {"ok": True})
+    store.put("jobs", "stale", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert store.items("jobs") == {"sync": {"ok": True}}
+    assert store.purge_expired() == 1
+
+    sessions = SessionStore(store, ttl=60)
+    token = sessions.create({"user": "user1"})
+    assert SessionStore(store).get(token) == {"user": "user1"}
+    assert sessions.delete(token) and sessions.get(token) is None
+
+
+def test_lease_has_a_single_holder_until_it_expires(store):
+    assert store.acquire_lease("leader", "a", ttl=0.05)
+    assert not store.acquire_lease("leader", "b", ttl=0.05)
+    assert store.acquire_lease("leader", "a", ttl=0.05)
+    time.sleep(0.06)
+    assert store.acquire_lease("leader", "b", ttl=0.05)
+    assert store.lease_holder("leader") == "b"
+
+
+@pytest.mark.asyncio
+async def test_leader_elector_runs_callbacks_on_one_worker(store):
+    events = []
+    electors = [LeaderElector(store, ttl=0.3, holder=name) for name in ("a", "b")]
+    for elector in electors:
+        async def elected(name=elector.holder):
+            events.append(("elected", name))
+
+        async def demoted(name=elector.holder):
+            events.append(("demoted", name))
+        elector.on_elected(elected)
+        elector.on_demoted(demoted)
+
+    assert await electors[0].step() and not await electors[1].step()
+    await electors[0].stop()
+    assert store.lease_holder("background") is None
+    assert await electors[1].step()
+    assert events == [("elected", "a"), ("demoted", "a"), ("elected", "b")]
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_waits_instead_of_blocking(store):
+    for limiter in (RateLimiter(), RateLimiter(store)):
+        assert limiter.try_acquire("cmd", calls=2, period=0.1)[0]
+        assert limiter.try_acquire("cmd", calls=2, period=0.1)[0]
+        assert not limiter.try_acquire("cmd", calls=2, period=0.1)[0]
+        started = time.monotonic()
+        ticker = asyncio.create_task(asyncio.sleep(0.01))
+        await limiter.acquire("cmd", calls=2, period=0.1)
+        assert ticker.done() and time.monotonic() - started >= 0.03
@@ -0,0 +1,33 @@
+import sys
+import time
+from src.startup import StartupProfiler, LazyModule, lazy_import
+from benchmarks.bench_startup import measure_import
+
+
+def test_profiler_records_phases_and_milestones():
+    profiler = StartupProfiler()
+    with profiler.phase("import thing", kind="import"):
+        time.sleep(0.01)
+    with profiler.phase("init thing"):
+        pass
+    profiler.mark("ready")
+    profiler.mark("ready")  # first occurrence wins
+    report = profiler.report()
+    assert [p["name"] for p in report["phases"]] == ["import thing", "init thing"]
+    assert report["imports_ms"] >= 10
+    assert list(report["milestones_ms"]) == ["ready"]
+
+
+def test_lazy_module_defers_import(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    module = lazy_import("colorsys")
+    assert isinstance(module, LazyModule) and "colorsys" not in sys.modules
+    assert "not loaded" in repr(module)
+    assert module.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert "colorsys" in sys.modules and "rgb_to_hsv" in module.__dict__
+    assert lazy_import("colorsys") is sys.modules["colorsys"]
+
+
+def test_importing_main_does_not_load_heavy_dependencies():
+    result = measure_import()
+    assert result["heavy_modules"] == []
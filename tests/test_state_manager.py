@@ -0,0 +1,64 @@
+import threading
+import pytest
+from dataclasses import dataclass, field
+from typing import Dict, Any
+from src.state_manager import StateManager
+
+
+@dataclass
+class DemoState:
+    is_running: bool = False
+    performance: Dict[str, Any] = field(default_factory=dict)
+    scratch: object = field(default_factory=object, metadata={"persist": False})
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = StateManager(str(tmp_path / "state.db"))
+    yield manager
+    manager.close()
+
+
+def test_save_and_load_roundtrip(manager):
+    manager.save_state(DemoState(True, {"profit": 0.1})).result()
+    assert manager.load_state() == {"is_running": "True", "performance": {"profit": 0.1}}
+
+
+def test_uses_one_connection_in_wal_mode(manager):
+    modes = manager.submit(lambda conn: conn.execute("PRAGMA journal_mode").fetchone()[0]).result()
+    assert modes == "wal"
+    threads = {manager.submit(lambda conn: threading.get_ident()).result() for _ in range(5)}
+    assert len(threads) == 1 and threading.get_ident() not in threads
+
+
+def test_concurrent_saves_are_coalesced(manager):
+    gate = threading.Event()
+    manager.submit(lambda conn: gate.wait())  # hold the writer busy
+    futures = [manager.save_state({"counter": i}) for i in range(100)]
+    gate.set()
+    results = [f.result() for f in futures]
+    # All snapshots were merged into a single one-row batch
+    assert set(results) == {1}
+    assert manager.load_state() == {"counter": "99"}
+
+
+@pytest.mark.asyncio
+async def test_async_facade(manager):
+    await manager.save_state_async(DemoState(performance={"sharpe": 1.2}))
+    state = await manager.load_state_async()
+    assert state["performance"] == {"sharpe": 1.2}
+    assert "scratch" not in state
+
+
+def test_close_flushes_pending_writes(tmp_path):
+    path = str(tmp_path / "state.db")
+    manager = StateManager(path)
+    manager.save_state({"key": "value"})
+    manager.close()
+    reopened = StateManager(path)
+    try:
+        assert reopened.load_state() == {"key": "value"}
+    finally:
+        reopened.close()
+    with pytest.raises(RuntimeError):
+        manager.submit(lambda conn: None)
@@ -0,0 +1,84 @@
+import ast
+import os
+import time
+import pytest
+from src.state_manager import StateManager
+from src.strategy_generator import StrategyGenerator, expand_grid, grid_size
+from src.strategy_library import StrategyLibrary
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+TEMPLATE = "rsi_bbands.py.j2"
+
+GRID = {
+    "rsi_period": [7, 14, 21],
+    "rsi_buy": [20, 25, 30],
+    "minimal_roi": [{"0": 0.05}, {"0": 0.03, "30": 0.0}],
+}
+
+
+def test_expand_grid():
+    combos = list(expand_grid(GRID))
+    assert len(combos) == grid_size(GRID) == 18
+    assert combos[0] == {"rsi_period": 7, "rsi_buy": 20, "minimal_roi": {"0": 0.05}}
+
+
+def test_render_applies_defaults_and_produces_valid_python():
+    generator = StrategyGenerator(TEMPLATE_DIR)
+    assert TEMPLATE in generator.list_templates()
+    name, code = generator.render(TEMPLATE, {"rsi_period": 9})
+    assert name.startswith("RsiBbands_")
+    tree = ast.parse(code)
+    assert [node.name for node in tree.body if isinstance(node, ast.ClassDef)] == [name]
+    assert "timeperiod=9" in code and "window=20" in code
+    assert generator.render(TEMPLATE, {"rsi_period": 9})[0] == name
+
+
+def test_bytecode_cache_is_populated(tmp_path):
+    cache_dir = tmp_path / "jinja"
+    StrategyGenerator(TEMPLATE_DIR, cache_dir=str(cache_dir)).render(TEMPLATE)
+    assert any(cache_dir.iterdir())
+    # A fresh generator loads the compiled template from the cache
+    assert StrategyGenerator(TEMPLATE_DIR, cache_dir=str(cache_dir)).render(TEMPLATE)[1]
+
+
+def test_write_strategies_is_fast(tmp_path):
+    generator = StrategyGenerator(TEMPLATE_DIR)
+    grid = {"rsi_period": range(5, 25), "rsi_buy": range(15, 35), "bb_std": [1.5, 2, 2.5]}
+    started = time.perf_counter()
+    written = generator.write_strategies(TEMPLATE, grid, str(tmp_path / "out"))
+    elapsed = time.perf_counter() - started
+    assert written == 1200 == len(os.listdir(tmp_path / "out"))
+    assert written / elapsed > 1000
+
+
+@pytest.mark.asyncio
+async def test_add_to_library_skips_duplicates(tmp_path):
+    manager = StateManager(str(tmp_path / "state.db"))
+    try:
+        library = StrategyLibrary(manager)
+        generator = StrategyGenerator(TEMPLATE_DIR)
+        assert await generator.add_to_library(library, TEMPLATE, GRID, batch_size=5) == {"added": 18, "skipped": 0,
+                                                                                     "invalid": 0}
+        assert (await generator.add_to_library(library, TEMPLATE, GRID))["skipped"] == 18
+        hits = await library.search("rsi_period")
+        assert len(hits) > 0
+    finally:
+        manager.close()
+
+
+def test_grid_values_cannot_inject_code():
+    generator = StrategyGenerator(TEMPLATE_DIR)
+    payload = "14); import os; os.system('id'"
+    _, code = generator.render(TEMPLATE, {"rsi_period": payload, "bb_period": "20", "rsi_buy": "30) | (1"})
+    tree = ast.parse(code)
+    assert not any(isinstance(node, (ast.Import, ast.ImportFrom)) and node.names[0].name == "os"
+                   for node in ast.walk(tree))
+    assert repr(payload) in code
+
+
+@pytest.mark.asyncio
+async def test_unrenderable_combinations_are_counted_not_stored():
+    generator = StrategyGenerator(TEMPLATE_DIR)
+    # No valid rows, so the library is never touched
+    assert await generator.add_to_library(None, TEMPLATE, {"rsi_period": ["x", "y"]}) == \
+        {"added": 0, "skipped": 0, "invalid": 2}
@@ -0,0 +1,146 @@
+import pytest
+from src.state_manager import StateManager
+from src.strategy_library import StrategyLibrary, normalized_ast_hash
+from tests.test_strategy_validator import VALID as SAMPLE
+
+STRATEGY = '''
+class RsiStrategy(IStrategy):
+    """Buys oversold RSI"""
+    minimal_roi = {"0": 0.05}
+
+    def populate_indicators(self, dataframe, metadata):
+        rsi = ta.RSI(dataframe, timeperiod=14)
+        dataframe["rsi"] = rsi
+        return dataframe
+'''
+
+# Same strategy with different names, comments, docstring and formatting
+RENAMED = '''
+class OversoldBuyer(IStrategy):
+    minimal_roi = {"0": 0.05}   # take profit
+
+    def populate_indicators(self, df, meta):
+        value = ta.RSI(df, timeperiod=14)
+        df["rsi"] = value
+        return df
+'''
+
+MACD = STRATEGY.replace("RsiStrategy", "MacdStrategy").replace("Buys oversold RSI", "MACD crossover") \
+    .replace("ta.RSI(dataframe, timeperiod=14)", "ta.MACD(dataframe)")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = StateManager(str(tmp_path / "state.db"))
+    yield manager
+    manager.close()
+
+
+def test_normalized_hash_ignores_cosmetic_changes():
+    assert normalized_ast_hash(STRATEGY) == normalized_ast_hash(RENAMED)
+    assert normalized_ast_hash(STRATEGY) != normalized_ast_hash(MACD)
+    with pytest.raises(SyntaxError):
+        normalized_ast_hash("def broken(:")
+
+
+@pytest.mark.asyncio
+async def test_duplicates_are_rejected(manager):
+    library = StrategyLibrary(manager)
+    first = await library.add_strategy(STRATEGY, "RSI mean reversion")
+    assert first["added"] and first["name"] == "RsiStrategy"
+    duplicate = await library.add_strategy(RENAMED)
+    assert not duplicate["added"] and duplicate["duplicate_of"] == "RsiStrategy"
+    assert await library.find_duplicate(RENAMED) == "RsiStrategy"
+    assert await library.add_many([{"code": RENAMED}, {"code": MACD}]) == {"added": 1, "skipped": 1}
+    with pytest.raises(ValueError):
+        await library.add_strategy("class Broken(:")
+
+
+@pytest.mark.asyncio
+async def test_add_many_replaces_names_like_add_strategy(manager):
+    library = StrategyLibrary(manager)
+    await library.add_strategy(STRATEGY)
+    updated = STRATEGY.replace("timeperiod=14", "timeperiod=21")
+    assert await library.add_many([{"code": updated}, {"code": updated, "name": "Copy"}]) == \
+        {"added": 1, "skipped": 1}
+    assert "timeperiod=21" in (await library.get("RsiStrategy"))["code"]
+
+
+@pytest.mark.asyncio
+async def test_generated_strategies_and_backtests_reach_the_library(manager, monkeypatch):
+    from src.freqai_manager import FreqAIManager
+
+    class Llm:
+        async def complete(self, messages):
+            return f"```python\n{SAMPLE}\n```"
+
+    async def no_sleep(_):
+        return None
+    monkeypatch.setattr("src.freqai_manager.asyncio.sleep", no_sleep)
+    library = StrategyLibrary(manager)
+    freqai = FreqAIManager(llm=Llm(), library=library)
+    assert (await freqai.generate_strategy_from_template("rsi dip buyer")).startswith("from freqtrade")
+    assert await library.save_generated(SAMPLE) == "Same as library strategy Sample; not saved again."
+    await freqai._test_strategy({}, strategy="Sample")
+    assert [(s["name"], s["profit_total"]) for s in await library.top("profit_total")] == [("Sample", 0.1)]
+    assert not await library.record_backtest("Unknown", {"profit": 0.2})
+
+
+@pytest.mark.asyncio
+async def test_search_and_top_by_metric(manager):
+    library = StrategyLibrary(manager)
+    await library.add_strategy(STRATEGY, "RSI mean reversion")
+    await library.add_strategy(MACD, "MACD trend following")
+    await library.record_backtest("RsiStrategy", {"sharpe": 0.8, "trade_count": 40, "max_drawdown": 0.1})
+    await library.record_backtest("MacdStrategy", {"sharpe": 1.6, "trade_count": 5, "max_drawdown": 0.3})
+
+    hits = await library.search("trend")
+    assert [hit["name"] for hit in hits] == ["MacdStrategy"]
+    assert [hit["name"] for hit in await library.search('RSI "oversold')] == ["RsiStrategy"]
+
+    assert [s["name"] for s in await library.top("sharpe")] == ["MacdStrategy", "RsiStrategy"]
+    assert [s["name"] for s in await library.top("sharpe", min_trades=10)] == ["RsiStrategy"]
+    assert [s["name"] for s in await library.top("max_drawdown")] == ["RsiStrategy", "MacdStrategy"]
+    with pytest.raises(ValueError):
+        await library.top("name; DROP TABLE strategies")
+
+    stored = await library.get("MacdStrategy")
+    assert stored["performance"]["sharpe"] == 1.6 and stored["sharpe"] == 1.6
+
+    plan = manager.submit(lambda conn: conn.execute(
+        "EXPLAIN QUERY PLAN SELECT name FROM strategies WHERE sharpe IS NOT NULL "
+        "ORDER BY sharpe DESC LIMIT 20").fetchall()).result()
+    assert any("idx_strategies_sharpe" in row[-1] for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_migrates_existing_rows(tmp_path):
+    path = str(tmp_path / "state.db")
+    manager = StateManager(path)
+    manager.submit(lambda conn: conn.execute(
+        "INSERT INTO strategies (name, code, description) VALUES ('Legacy', ?, 'old RSI strategy')",
+        (STRATEGY,)) and conn.commit()).result()
+    manager.close()
+
+    manager = StateManager(path)
+    try:
+        library = StrategyLibrary(manager)
+        assert [hit["name"] for hit in await library.search("old")] == ["Legacy"]
+        assert await library.find_duplicate(RENAMED) == "Legacy"
+    finally:
+        manager.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.strategy_library._FTS_SCHEMA", ("CREATE TRIGGER broken",))
+    manager = StateManager(str(tmp_path / "state.db"))
+    try:
+        with pytest.raises(Exception):
+            StrategyLibrary(manager)._ready.result()
+        tables = manager.submit(lambda conn: conn.execute(
+            "SELECT name FROM sqlite_master WHERE name LIKE 'idx_strategies_%'").fetchall()).result()
+        columns = manager.submit(lambda conn: [row[1] for row in conn.execute(
+            "PRAGMA table_info(strategies)")]).result()
+        assert tables == [] and "ast_hash" not in columns
+    finally:
+        manager.close()
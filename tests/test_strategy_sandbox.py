@@ -0,0 +1,83 @@
+import os
+import time
+import pytest
+from src.strategy_generator import StrategyGenerator
+from src.strategy_sandbox import StrategySandbox, fixture_frame
+from tests.test_strategy_validator import VALID
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+
+@pytest.fixture
+def sandbox():
+    sandbox = StrategySandbox(workers=2, max_tasks_per_worker=3, timeout=2.0)
+    sandbox.start()
+    yield sandbox
+    sandbox.close()
+
+
+def test_fixture_frame_is_deterministic():
+    frame = fixture_frame(100)
+    assert len(frame) == 100 and frame.equals(fixture_frame(100))
+    assert (frame["high"] >= frame["close"]).all() and (frame["low"] <= frame["close"]).all()
+
+
+@pytest.mark.asyncio
+async def test_runs_generated_strategies(sandbox):
+    generator = StrategyGenerator(TEMPLATE_DIR)
+    codes = [code for _, code, _ in generator.iter_strategies("rsi_bbands.py.j2", {"rsi_buy": [30, 40, 50, 60]})]
+    started = time.perf_counter()
+    results = await sandbox.run_many(codes)
+    elapsed = time.perf_counter() - started
+    assert all(r.ok for r in results), [r.error for r in results]
+    assert results[0].rows == 500 and set(results[0].timings_ms) == {"import", "indicators", "entry", "exit"}
+    assert results[-1].entry_signals >= results[0].entry_signals
+    assert len(codes) / elapsed > 4
+    assert results[0].worker_pid != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_runtime_errors_are_reported(sandbox):
+    result = await sandbox.run(VALID.replace('dataframe["rsi"] = ta.RSI(dataframe)', 'dataframe["rsi"] = 1 / 0'))
+    assert not result.ok and result.error.startswith("ZeroDivisionError")
+    assert "populate_indicators" in result.traceback
+    result = await sandbox.run(VALID.replace("        return dataframe\n", "        return dataframe.iloc[:10]\n", 1))
+    assert not result.ok and "row count" in result.error
+
+
+@pytest.mark.asyncio
+async def test_static_validation_runs_first(sandbox):
+    result = await sandbox.run("import os\n" + VALID)
+    assert not result.ok and "Rejected by static validation" in result.error
+    assert sandbox.stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_time_and_memory_limits(sandbox):
+    slow = VALID.replace('dataframe["rsi"] = ta.RSI(dataframe)', "while True:\n            pass")
+    result = await sandbox.run(slow)
+    assert not result.ok and result.error.startswith("SandboxTimeout")
+    greedy = VALID.replace('dataframe["rsi"] = ta.RSI(dataframe)', 'dataframe["x"] = len(bytearray(2 ** 31))')
+    result = await sandbox.run(greedy)
+    assert not result.ok and "MemoryError" in result.error
+    # The pool still serves jobs afterwards
+    assert (await sandbox.run(VALID)).ok
+
+
+@pytest.mark.asyncio
+async def test_workers_are_recycled(sandbox):
+    results = [await sandbox.run(VALID) for _ in range(8)]
+    assert all(r.ok for r in results)
+    assert len({r.worker_pid for r in results}) > 2
+
+
+@pytest.mark.asyncio
+async def test_secrets_do_not_reach_or_leave_the_sandbox(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test-secret")
+    leak = VALID.replace('dataframe["rsi"] = ta.RSI(dataframe)',
+                         'raise ValueError(pd.io.common.os.environ.get("ANTHROPIC_API_KEY", "absent"))')
+    leak = "import pandas as pd\n" + leak
+    async with StrategySandbox(workers=1, timeout=2.0) as sandbox:
+        result = await sandbox.run(leak)
+    assert not result.ok and result.error == "ValueError raised by the strategy"
+    assert "sk-test-secret" not in result.to_dict().__repr__() and "absent" not in result.traceback
@@ -0,0 +1,95 @@
+import os
+import pytest
+from src.strategy_generator import StrategyGenerator
+from src.strategy_validator import StrategyValidator, extract_code
+
+VALID = '''
+from freqtrade.strategy import IStrategy
+import talib.abstract as ta
+
+
+class Sample(IStrategy):
+    timeframe = "5m"
+    minimal_roi = {"0": 0.04}
+    stoploss = -0.1
+
+    def populate_indicators(self, dataframe, metadata):
+        dataframe["rsi"] = ta.RSI(dataframe)
+        dataframe["prev_close"] = dataframe["close"].shift(1)
+        return dataframe
+
+    def populate_entry_trend(self, dataframe, metadata):
+        dataframe.loc[dataframe["rsi"] < 30, "enter_long"] = 1
+        return dataframe
+
+    def populate_exit_trend(self, dataframe, metadata):
+        dataframe.loc[dataframe["rsi"] > 70, "exit_long"] = 1
+        return dataframe
+'''
+
+
+def messages(result):
+    return [issue.message for issue in result.issues]
+
+
+@pytest.fixture
+def validator():
+    return StrategyValidator()
+
+
+def test_valid_strategy(validator):
+    result = validator.validate(VALID)
+    assert result.valid and result.class_name == "Sample" and result.issues == []
+
+
+def test_generated_templates_pass(validator):
+    templates = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+    _, code = StrategyGenerator(templates).render("rsi_bbands.py.j2")
+    assert validator.validate(code).valid
+
+
+def test_syntax_error_reports_line(validator):
+    result = validator.validate("class Broken(IStrategy:\n    pass")
+    assert not result.valid and result.issues[0].line == 1
+
+
+def test_contract_violations(validator):
+    code = VALID.replace('    minimal_roi = {"0": 0.04}\n', "").replace("stoploss = -0.1", "stoploss = 0.1") \
+        .replace("populate_exit_trend", "helper")
+    result = validator.validate(code)
+    assert not result.valid
+    assert "Missing attribute: minimal_roi" in messages(result)
+    assert "Missing method(s): populate_exit_trend" in messages(result)
+    assert any("stoploss must be" in m for m in messages(result))
+    assert not validator.validate("class NotAStrategy:\n    pass").valid
+
+
+def test_forbidden_imports_and_calls(validator):
+    code = "import os\nfrom subprocess import run\n" + VALID.replace(
+        'dataframe["rsi"] = ta.RSI(dataframe)', 'dataframe["rsi"] = eval("1")\n        ().__class__.__bases__')
+    result = validator.validate(code)
+    assert {"Forbidden import: os", "Forbidden import: subprocess", "Forbidden call: eval()",
+            "Forbidden attribute access: __bases__"} <= set(messages(result))
+
+
+def test_lookahead_patterns(validator):
+    code = VALID.replace("shift(1)", "shift(-2)").replace(
+        'ta.RSI(dataframe)', 'dataframe["close"].rolling(5, center=True).mean()') \
+        .replace('dataframe.loc[dataframe["rsi"] > 70', 'dataframe.loc[dataframe["close"].iloc[-1] > 70')
+    result = validator.validate(code)
+    assert not result.valid
+    assert sum("Lookahead" in m for m in messages(result)) == 2
+    assert any("iloc[-n]" in str(w) for w in result.warnings)
+    assert validator.validate(VALID.replace("shift(1)", "shift(periods=-1)")).errors
+
+
+def test_results_are_cached_by_hash(validator):
+    first = validator.validate(VALID)
+    assert validator.validate(VALID) is first
+    assert validator.cache_stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_extract_code_from_llm_response():
+    text = f"Here is the strategy:\n```python\n{VALID}```\nGood luck!"
+    assert extract_code(text) == VALID.lstrip("\n")
+    assert extract_code(VALID) == VALID
@@ -0,0 +1,119 @@
+import asyncio
+import pytest
+from src.secure_commands import (COMMAND_PERMISSIONS, COMMAND_ROUTES, CommandRoute, CommandTrie, SecureCommands,
+                                 permission_sets)
+from src.bot import FreqtradeAI
+from src.telegram_bot import ChatDispatcher, TelegramFrontend, split_message
+
+
+def test_trie_matches_whole_commands_and_strips_bot_name():
+    trie = CommandTrie(COMMAND_ROUTES)
+    route, argument = trie.match("/generate_strategy@freq_bot  RSI on 5m ")
+    assert route.handler == "handle_strategy" and argument == "RSI on 5m"
+    assert trie.match("/status")[0].command == "/status"
+    assert trie.match("/stat") is None and trie.match("hello") is None
+    assert trie.match("/statusx") is None and trie.match("/status_report now") is None
+    assert trie.match("/market_analysis@freq_bot") == (trie.match("/market_analysis")[0], "")
+    nested = CommandTrie(COMMAND_ROUTES + (CommandRoute("/status_all", "x"),))
+    assert nested.match("/status_all now")[0].command == "/status_all"
+    assert nested.match("/status now")[0].command == "/status"
+
+
+def test_permission_sets_expand_wildcards():
+    sets = permission_sets(COMMAND_PERMISSIONS, (r.command for r in COMMAND_ROUTES))
+    assert sets["admin"] == {r.command for r in COMMAND_ROUTES}
+    assert "/update_config" not in sets["user"] and "/status" in sets["user"]
+    # Commands without a route are dropped
+    assert "/balance" not in sets["user"]
+
+
+@pytest.mark.asyncio
+async def test_process_command_routes_and_checks_permissions():
+    commands = SecureCommands(object())
+    assert await commands.process_command("someone", "/update_config stake 10") == \
+        "Permission denied for /update_config."
+    assert await commands.process_command("someone", "/status") == "Unauthorized access."
+    assert (await commands.process_command("user1", "/nope")).startswith("Unknown command")
+    assert await commands.process_command("user1", "/market_analysis") == "Market screener is not configured"
+
+
+@pytest.mark.asyncio
+async def test_status_and_help_use_the_assistant_and_rate_limits_reply(tmp_path):
+    (tmp_path / "config.json").write_text("{}")
+    assistant = FreqtradeAI("test", str(tmp_path / "config.json"), state_db_path=str(tmp_path / "state.db"),
+                            backtest_results_path=str(tmp_path / "backtests"))
+    commands = assistant.secure_commands
+    assert (await commands.process_command("user1", "/status")).startswith("Assistant: stopped\nCache entries: ")
+    assert "/update_config <text>" in await commands.process_command("user1", "/help")
+    assert await commands.process_command("user1", "/test_claude") == "Claude controller is not configured"
+    for _ in range(19):
+        await commands.process_command("user1", "/status")
+    assert (await commands.process_command("user1", "/status")).startswith("Rate limited, retry in ")
+    await asyncio.to_thread(assistant.state_manager.close)
+    assistant.cache.close()
+
+
+def test_split_message():
+    assert split_message("short") == ["short"]
+    chunks = split_message("a" * 10 + "\n" + "b" * 10, limit=12)
+    assert chunks == ["a" * 10, "b" * 10]
+    assert split_message("x" * 25, limit=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+@pytest.mark.asyncio
+async def test_slow_command_does_not_delay_other_chats_and_chat_order_holds():
+    release = asyncio.Event()
+    replies = []
+
+    async def handler(user_id, text):
+        if text.startswith("/slow"):
+            await release.wait()
+        return f"{user_id}:{text}"
+
+    def reply_to(chat):
+        async def reply(text):
+            replies.append((chat, text))
+        return reply
+
+    dispatcher = ChatDispatcher(handler, lambda text: text.startswith("/slow"),
+                                concurrency=2, slow_concurrency=1)
+    dispatcher.submit("a", "alice", "/slow strategy", reply_to("a"))
+    dispatcher.submit("a", "alice", "/status", reply_to("a"))
+    dispatcher.submit("c", "carol", "/slow other", reply_to("c"))
+    dispatcher.submit("b", "bob", "/status", reply_to("b"))
+    await asyncio.sleep(0.01)
+    # Bob is answered while both slow commands wait; Alice's /status waits behind her own slow one
+    assert replies == [("b", "bob:/status")]
+    release.set()
+    await asyncio.sleep(0.01)
+    assert [r for r in replies if r[0] == "a"] == [("a", "alice:/slow strategy"), ("a", "alice:/status")]
+    assert dispatcher.snapshot()["completed"] == 4 and dispatcher.snapshot()["active_chats"] == 0
+
+
+@pytest.mark.asyncio
+async def test_per_chat_backlog_is_bounded_and_failures_are_reported():
+    gate = asyncio.Event()
+    replies = []
+
+    async def handler(user_id, text):
+        await gate.wait()
+        raise RuntimeError("boom")
+
+    async def reply(text):
+        replies.append(text)
+
+    dispatcher = ChatDispatcher(handler, max_pending=1)
+    assert dispatcher.submit(1, "u", "/status", reply)
+    await asyncio.sleep(0)
+    assert dispatcher.submit(1, "u", "/status", reply)
+    assert not dispatcher.submit(1, "u", "/status", reply)
+    gate.set()
+    await asyncio.sleep(0.01)
+    assert replies == ["Error processing command: boom"] * 2
+    assert dispatcher.snapshot()["rejected"] == 1 and dispatcher.snapshot()["failed"] == 2
+
+
+def test_frontend_maps_users_and_lanes():
+    frontend = TelegramFrontend("token", SecureCommands(object()), users={123: "user1"})
+    assert frontend.user_for(123) == "user1" and frontend.user_for(456) == "456"
+    assert frontend._is_slow("/generate_strategy rsi") and not frontend._is_slow("/status")
@@ -0,0 +1,58 @@
+import pytest
+from src.timeseries_store import MetricsTimeSeriesStore
+
+
+def test_raw_query_returns_samples_in_order():
+    store = MetricsTimeSeriesStore()
+    for i in range(10):
+        store.append("accuracy", i / 10, ts=1000.0 + i)
+    result = store.query("accuracy", 1002.0, 1005.0)
+    assert result["resolution"] == "raw"
+    assert result["ts"] == [1002.0, 1003.0, 1004.0, 1005.0]
+    assert result["last"] == pytest.approx([0.2, 0.3, 0.4, 0.5])
+
+
+def test_ring_buffer_keeps_fixed_memory():
+    store = MetricsTimeSeriesStore(resolutions=(("raw", 0, 5), ("1m", 60, 10)))
+    for i in range(20):
+        store.append("loss", float(i), ts=float(i))
+    raw = store.query("loss", 15.0, 19.0)
+    assert raw["ts"] == [15.0, 16.0, 17.0, 18.0, 19.0]
+    # Raw no longer reaches back to t=0, so the 1m tier answers
+    assert store.query("loss", 0.0, 19.0)["resolution"] == "1m"
+
+
+def test_downsampled_bucket_aggregates():
+    store = MetricsTimeSeriesStore(resolutions=(("raw", 0, 2), ("1m", 60, 10)))
+    for ts, value in [(0.0, 3.0), (10.0, 1.0), (59.0, 2.0), (60.0, 7.0)]:
+        store.append("sharpe_ratio", value, ts=ts)
+    result = store.query("sharpe_ratio", 0.0, 120.0)
+    assert result["resolution"] == "1m"
+    assert result["ts"] == [0.0, 60.0]
+    assert result["min"][0] == 1.0 and result["max"][0] == 3.0
+    assert result["mean"][0] == pytest.approx(2.0)
+    assert result["last"] == [2.0, 7.0]
+
+
+def test_query_decimates_to_requested_points():
+    store = MetricsTimeSeriesStore()
+    for i in range(5000):
+        store.append("accuracy", float(i % 7), ts=float(i))
+    result = store.query("accuracy", 0.0, 4999.0, max_points=100)
+    assert len(result["ts"]) <= 100
+    assert min(result["min"]) == 0.0 and max(result["max"]) == 6.0
+
+
+def test_query_frame_joins_metrics():
+    store = MetricsTimeSeriesStore()
+    store.append_many({"accuracy": 0.6, "loss": 0.2}, ts=100.0)
+    store.append_many({"accuracy": 0.7, "loss": 0.1}, ts=101.0)
+    frame = store.query_frame(["accuracy", "loss"], 0.0, 200.0)
+    assert [row["timestamp"] for row in frame] == [100.0, 101.0]
+    assert frame[1]["accuracy"] == pytest.approx(0.7)
+    assert frame[1]["loss"] == pytest.approx(0.1)
+    assert "name" in frame[0]
+
+
+def test_unknown_metric_is_empty():
+    assert MetricsTimeSeriesStore().query("missing")["ts"] == []
@@ -0,0 +1,134 @@
+import asyncio
+import aiohttp
+import pytest
+from src.trade_sync import TradeSyncEngine
+
+
+class FakeClient:
+    """In-memory stand-in for FreqtradeClient's trade endpoints"""
+
+    def __init__(self):
+        self.closed = []
+        self.open = []
+        self.offsets = []
+
+    def close_trade(self, trade_id, profit, ts, pair="BTC/USDT"):
+        self.open = [t for t in self.open if t["trade_id"] != trade_id]
+        self.closed.append({"trade_id": trade_id, "pair": pair, "is_open": False,
+                            "profit_ratio": profit, "profit_abs": profit * 100,
+                            "close_timestamp": ts, "open_timestamp": ts - 1000})
+        self.closed.sort(key=lambda t: t["trade_id"])
+
+    async def get_trades(self, limit=500, offset=0):
+        self.offsets.append(offset)
+        return {"trades": self.closed[offset:offset + limit], "total_trades": len(self.closed)}
+
+    async def get_status(self):
+        return list(self.open)
+
+    async def get_trade(self, trade_id):
+        for trade in self.closed + self.open:
+            if trade["trade_id"] == trade_id:
+                return trade
+        raise aiohttp.ClientResponseError(None, (), status=404, message="Trade not found")
+
+
+@pytest.fixture
+def engine_factory(tmp_path):
+    engines = []
+
+    def make(client, **kwargs):
+        engine = TradeSyncEngine({"bot": client}, db_path=str(tmp_path / "trades.db"), **kwargs)
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        engine.close()
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_pages_from_high_water(engine_factory):
+    client = FakeClient()
+    for i in range(1, 8):
+        client.close_trade(i, 0.01 * (i % 3 - 1), 1000 * i)
+    reported = []
+    engine = engine_factory(client, page_size=3, overlap=1, on_closed_trade=reported.append)
+
+    await engine.sync_all()
+    assert client.offsets == [0, 3, 6]
+    assert len(reported) == 7
+    assert engine.get_sync_state("bot")["synced_closed"] == 7
+
+    client.offsets.clear()
+    client.close_trade(8, 0.02, 9000)
+    await engine.sync_all()
+    assert client.offsets == [6]  # overlap of one trade, not a full re-read
+    assert [t["trade_id"] for t in reported[7:]] == [8]
+    assert engine.profit_summary()["trade_count"] == 8
+    assert engine.recent_trades(limit=1)[0]["trade_id"] == 8
+
+
+@pytest.mark.asyncio
+async def test_open_trade_closed_behind_overlap_is_refreshed(engine_factory):
+    client = FakeClient()
+    client.open.append({"trade_id": 1, "pair": "ETH/USDT", "is_open": True, "open_timestamp": 500})
+    for i in range(2, 6):
+        client.close_trade(i, 0.01, 1000 * i)
+    engine = engine_factory(client, overlap=0)
+    await engine.sync_all()
+    assert [t["trade_id"] for t in engine.open_trades()] == [1]
+
+    client.close_trade(1, -0.05, 9000, pair="ETH/USDT")  # sorts before every synced trade
+    await engine.sync_all()
+    assert engine.open_trades() == []
+    summary = engine.profit_summary(bot="bot")
+    assert summary["trade_count"] == 5
+    assert summary["losing_trades"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_bot_reported(engine_factory):
+    class Broken(FakeClient):
+        async def get_trades(self, limit=500, offset=0):
+            raise RuntimeError("down")
+
+    engine = engine_factory(Broken())
+    assert (await engine.sync_all()) == {"bot": {"error": "down"}}
+
+
+@pytest.mark.asyncio
+async def test_deleted_trades_leave_the_mirror_and_reads_skip_the_write_lock(engine_factory):
+    client = FakeClient()
+    client.open = [{"trade_id": 1, "pair": "BTC/USDT", "is_open": True},
+                   {"trade_id": 2, "pair": "ETH/USDT", "is_open": True}]
+    engine = engine_factory(client)
+    await engine.sync_all()
+    client.open = [client.open[1]]
+    assert (await engine.sync_all())["bot"] == {"upserted": 1}
+    with engine._lock:
+        # A sync holding the writer must not block readers
+        assert [t["trade_id"] for t in engine.open_trades("bot")] == [2]
+
+
+@pytest.mark.asyncio
+async def test_other_workers_follow_closed_trades_from_the_mirror(engine_factory):
+    client = FakeClient()
+    for i in range(1, 5):
+        client.close_trade(i, 0.01, 1000 * i)
+    client.open.append({"trade_id": 5, "pair": "ETH/USDT", "is_open": True, "open_timestamp": 500})
+    leader = engine_factory(client, page_size=2)
+    await leader.sync_all()
+
+    follower = engine_factory({}, page_size=2)
+    seen = []
+    follower.follow(lambda trade, replay: seen.append((trade["trade_id"], replay)), interval=0.01)
+    await asyncio.sleep(0.05)
+    client.close_trade(6, 0.02, 9000)
+    client.close_trade(5, -0.01, 800)  # closes late but sorts before every replayed trade
+    await leader.sync_all()
+    await leader.sync_all()  # re-reading the overlap must not deliver trades twice
+    await asyncio.sleep(0.05)
+    await follower.unfollow()
+    assert seen[:4] == [(1, True), (2, True), (3, True), (4, True)]
+    assert sorted(seen[4:]) == [(5, False), (6, False)]